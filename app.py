@@ -1,12 +1,13 @@
 import streamlit as st
 import pandas as pd
-import pandas_ta as ta
-import numpy as np
-import yfinance as yf
-import requests
-import time
-from datetime import datetime, time as dtime
-import pytz
+import charts
+import engine
+import instruments
+import journal
+import perf
+import logbook
+import screener
+import strategies
 
 # --- 1. PAGE CONFIG & APK STYLE ---
 st.set_page_config(page_title="Mishr@lgobot Pro", layout="wide", initial_sidebar_state="collapsed")
@@ -25,22 +26,8 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- 2. STATE MANAGEMENT ---
-defaults = {
-    "auth": False, "bal": 100000.0, "positions": [], "bot_active": False,
-    "smartApi": None, "token_df": None, "real_trade_active": False,
-    "strategy_mode": "1. Sniper (1m)", "manual_qty": 50,
-    "daily_pnl": 0.0, "max_loss": 5000, "target_pct": 2.0, "sl_pct": 1.0,
-    "logs": [],
-    "watchlist": [
-        {"type": "INDEX", "symbol": "NIFTY 50", "code": "^NSEI", "step": 50},
-        {"type": "INDEX", "symbol": "BANKNIFTY", "code": "^NSEBANK", "step": 100},
-        {"type": "MCX", "symbol": "CRUDEOIL", "code": "CL=F", "step": 10},
-        {"type": "CRYPTO", "symbol": "BITCOIN", "code": "BTC-USD", "step": 1},
-        {"type": "EQUITY", "symbol": "RELIANCE", "code": "RELIANCE.NS", "step": 1}
-    ]
-}
-for key, val in defaults.items():
-    if key not in st.session_state: st.session_state[key] = val
+# Trading state (watchlist, positions, P&L, logs) lives in the engine; a session only holds its unlock flag.
+if "auth" not in st.session_state: st.session_state.auth = False
 
 # --- 3. SECURITY LOCK (8500081391) ---
 if not st.session_state.auth:
@@ -59,21 +46,7 @@ if not st.session_state.auth:
                 st.error("❌ WRONG KEY")
     st.stop()
 
-# --- 4. HELPERS ---
-def add_log(msg, type_="INFO"):
-    ts = datetime.now(pytz.timezone('Asia/Kolkata')).strftime('%H:%M:%S')
-    st.session_state.logs.insert(0, f"[{ts}] [{type_}] {msg}")
-    if len(st.session_state.logs) > 100: st.session_state.logs.pop()
-
-def check_market_time(exch_type):
-    tz = pytz.timezone('Asia/Kolkata')
-    now = datetime.now(tz).time()
-    if exch_type == "CRYPTO": return True
-    elif exch_type == "MCX": return dtime(9, 0) <= now <= dtime(23, 30)
-    elif exch_type in ["INDEX", "EQUITY"]: return dtime(9, 15) <= now <= dtime(15, 30)
-    return False
-
-# --- 5. API HANDLING ---
+# --- 4. API HANDLING ---
 API_OK = False
 try:
     from SmartApi import SmartConnect
@@ -93,334 +66,211 @@ def angel_login(api, client, pin, totp_key):
 
 @st.cache_resource
 def load_tokens():
-    try:
-        url = "https://margincalculator.angelbroking.com/OpenAPI_File/files/OpenAPIScripMaster.json"
-        data = requests.get(url).json()
-        df = pd.DataFrame(data)
-        return df[df['exch_seg'].isin(['NFO', 'NSE', 'MCX'])]
-    except: return None
+    try: return instruments.InstrumentIndex(instruments.load_snapshot())
+    except Exception as e:
+        perf.error("instruments", e)
+        return None
 
-if st.session_state.token_df is None:
+# --- 5. STRATEGY ENGINE ---
+@st.cache_resource
+def get_engine():
+    # One bot per process: it keeps trading across reruns and closed tabs.
     with st.spinner("Initializing System..."):
-        st.session_state.token_df = load_tokens()
-
-def get_angel_token(symbol, strike=None, opt_type=None, type_="EQUITY"):
-    df = st.session_state.token_df
-    if df is None: return None, None, "NSE"
-    if type_ == "MCX":
-        res = df[(df['name'] == symbol) & (df['instrumenttype'] == 'FUTCOM')]
-        if not res.empty: return res.sort_values('expiry').iloc[0]['token'], res.iloc[0]['symbol'], "MCX"
-    elif type_ == "INDEX" and strike:
-        s_str = str(int(strike))
-        name = "NIFTY" if "NIFTY" in symbol else "BANKNIFTY"
-        res = df[(df['name'] == name) & (df['symbol'].str.endswith(opt_type)) & (df['symbol'].str.contains(s_str))]
-        if not res.empty: return res.sort_values('expiry').iloc[0]['token'], res.iloc[0]['symbol'], "NFO"
-    elif type_ == "EQUITY":
-        res = df[(df['name'] == symbol) & (df['exch_seg'] == 'NSE') & (df['symbol'].str.endswith('-EQ'))]
-        if not res.empty: return res.iloc[0]['token'], res.iloc[0]['symbol'], "NSE"
-    return None, None, "NSE"
-
-def get_live_ltp(token, exch):
-    if st.session_state.smartApi and token:
-        try:
-            d = st.session_state.smartApi.ltpData(exch, symbolToken=token, symbol=token)
-            if d['status']: return d['data']['ltp']
-        except: pass
-    return 0.0
-
-# --- 6. STRATEGY ENGINE ---
-def calculate_signals(df, strategy):
-    last = df.iloc[-1]
-    sig = "HOLD"
-    df['EMA9'] = df.ta.ema(length=9)
-    df['EMA21'] = df.ta.ema(length=21)
-    df['RSI'] = df.ta.rsi(length=14)
-    df['VWAP'] = df.ta.vwap()
-    
-    if "Sniper" in strategy:
-        if last['EMA9'] > last['EMA21'] and last['RSI'] > 55: sig = "BUY"
-        elif last['EMA9'] < last['EMA21'] and last['RSI'] < 45: sig = "SELL"
-    elif "Momentum" in strategy:
-        if last['Close'] > last['EMA9']: sig = "BUY"
-        else: sig = "SELL"
-    elif "Golden" in strategy:
-        if last['EMA9'] > last['EMA21']: sig = "BUY"
-        else: sig = "SELL"
-    elif "Supertrend" in strategy:
-        st_data = df.ta.supertrend(length=10, multiplier=3)
-        if st_data is not None:
-             df = pd.concat([df, st_data], axis=1)
-             if df.iloc[-1]['Close'] > df.iloc[-1][df.columns[-2]]: sig = "BUY"
-             else: sig = "SELL"
-    elif "VWAP" in strategy:
-        macd = df.ta.macd(fast=12, slow=26, signal=9)
-        if macd is not None:
-            df = pd.concat([df, macd], axis=1)
-            # Corrected Indentation Here
-            if last['Close'] > last['VWAP'] and last[df.columns[-3]] > last[df.columns[-1]]: sig = "BUY"
-            elif last['Close'] < last['VWAP'] and last[df.columns[-3]] < last[df.columns[-1]]: sig = "SELL"
-    elif "Volume" in strategy:
-        vol_avg = df['Volume'].rolling(20).mean().iloc[-1]
-        if last['Volume'] > (vol_avg * 2):
-            if last['Close'] > last['Open']: sig = "BUY"
-            else: sig = "SELL"
-    return sig
-
-@st.cache_data(ttl=10)
-def scan_market(watchlist, strategy):
-    data = []
-    interval = "1m" if "Sniper" in strategy else "15m" if "VWAP" in strategy else "5m"
-    for item in watchlist:
-        try:
-            df = yf.download(item['code'], period="5d", interval=interval, progress=False)
-            if df.empty: continue
-            if isinstance(df.columns, pd.MultiIndex): df.columns = df.columns.get_level_values(0)
-            sig = calculate_signals(df, strategy)
-            trade_price = df.iloc[-1]['Close']
-            token, sym, exch = None, item['symbol'], "NSE"
-            
-            if item['type'] == "INDEX":
-                strike = round(trade_price / item['step']) * item['step']
-                otype = "CE" if "BUY" in sig else "PE"
-                token, sym, exch = get_angel_token(item['symbol'], strike, otype, "INDEX")
-                if sig != "HOLD": sig = f"BUY {otype}"
-                trade_price *= 0.01 
-            elif item['type'] == "MCX":
-                token, sym, exch = get_angel_token(item['symbol'], type_="MCX")
-            elif item['type'] == "EQUITY":
-                token, sym, exch = get_angel_token(item['symbol'], type_="EQUITY")
-
-            if token:
-                ltp = get_live_ltp(token, exch)
-                if ltp > 0: trade_price = ltp
-                
-            data.append({
-                "display": sym, "price": trade_price, "sig": sig, 
-                "token": token, "exch": exch, "type": item['type'],
-                "change": ((df.iloc[-1]['Close'] - df.iloc[0]['Open'])/df.iloc[0]['Open'])*100
-            })
-        except: pass
-    return data
-
-# --- 7. UI TABS ---
-c1, c2 = st.columns([4, 1])
-with c1: st.markdown("### 🤖 Mishr@lgobot <span style='color:gold'>PRO</span>", unsafe_allow_html=True)
-with c2: st.markdown(f"<small>Status:</small> {'🟢 ON' if st.session_state.bot_active else '🔴 OFF'}", unsafe_allow_html=True)
-
-data_list = scan_market(st.session_state.watchlist, st.session_state.strategy_mode)
-
-tab1, tab2, tab3, tab4 = st.tabs(["🏠 DASHBOARD", "🔍 SCREENER", "⚙️ CONFIG", "📜 LOGS"])
-
-with tab1:
-    curr_pnl = sum([p['pnl'] for p in st.session_state.positions])
-    total_pnl = st.session_state.daily_pnl + curr_pnl
-    cls = "bull" if total_pnl >= 0 else "bear"
-    
-    c1, c2, c3 = st.columns(3)
-    c1.markdown(f"<div class='card'>Wallet<br><b>₹{st.session_state.bal:,.0f}</b></div>", unsafe_allow_html=True)
-    c2.markdown(f"<div class='card'>P&L<br><span class='{cls}'>₹{total_pnl:.2f}</span></div>", unsafe_allow_html=True)
-    c3.markdown(f"<div class='card'>Active<br><b>{len(st.session_state.positions)}</b></div>", unsafe_allow_html=True)
-    
-    if st.button("🚨 PANIC: EXIT ALL", type="secondary"):
-        st.session_state.bot_active = False
-        st.session_state.positions = []
-        add_log("PANIC EXIT TRIGGERED", "ALERT")
-        st.rerun()
-
-    st.write("### Signals")
-    if data_list:
-        for d in data_list:
+        eng = engine.TradingEngine(instr=load_tokens(), journal=journal.Journal())
+        eng.store.compact_all(keep_days=30)
+        if perf.ENABLED: perf.serve()  # Prometheus text on 127.0.0.1:MISHR_METRICS_PORT/metrics
+    return eng.start()
+
+eng = get_engine()
+
+def state():
+    # The engine publishes its version to the hub after every pass; a session re-takes the snapshot only when the
+    # version differs from the one its last snapshot was taken at.
+    seen = st.session_state.get("seen")
+    v = eng.hub.wait(seen)
+    if v != seen or "snap" not in st.session_state: st.session_state.seen, st.session_state.snap = v, eng.snapshot()
+    return st.session_state.snap
+
+snap = state()
+
+@st.cache_data(ttl=60)
+def scan_universe(codes, strategy, top):
+    return screener.scan(list(codes), strategy, top=top, store=eng.store)
+
+# --- 6. LIVE VIEWS ---
+# Each part is a fragment that polls the engine on its own timer instead of rerunning the whole page. A part
+# rebuilds its payload only when its data key changes; unchanged parts re-send the cached payload, and Streamlit
+# ships large unchanged elements as hash references.
+REFRESH = 2
+
+def view(part, key, build):
+    views = st.session_state.setdefault("views", {})
+    if part not in views or views[part][0] != key: views[part] = (key, build())
+    return views[part][1]
+
+@st.fragment(run_every=REFRESH)
+def status():
+    s = state()
+    st.markdown(f"<small>Status:</small> {'🟢 ON' if s['bot_active'] else '🔴 OFF'}", unsafe_allow_html=True)
+
+@st.fragment(run_every=REFRESH)
+def cards():
+    s = state()
+    total_pnl = s['daily_pnl'] + sum([p['pnl'] for p in s['positions']])
+    def build():
+        cls = "bull" if total_pnl >= 0 else "bear"
+        return [f"<div class='card'>Wallet<br><b>₹{s['bal']:,.0f}</b></div>",
+                f"<div class='card'>P&L<br><span class='{cls}'>₹{total_pnl:.2f}</span></div>",
+                f"<div class='card'>Active<br><b>{len(s['positions'])}</b></div>"]
+    html = view("cards", (s['bal'], round(total_pnl, 2), len(s['positions'])), build)
+    for c, h in zip(st.columns(3), html): c.markdown(h, unsafe_allow_html=True)
+
+@st.fragment(run_every=REFRESH)
+def signals():
+    s = state()
+    stats = view("stats", s['version'], eng.stats)  # percentiles only change when the engine publishes
+    lat, o = stats['latency'], stats['orders']
+    def build():
+        boxes = []
+        for d in s['rows']:
             col = "#00e676" if "BUY" in d['sig'] else "#ff1744" if "SELL" in d['sig'] else "#333"
-            st.markdown(f"<div class='card' style='border-left:4px solid {col}'><b>{d['display']}</b>: {d['price']:.2f} | {d['sig']}</div>", unsafe_allow_html=True)
+            boxes.append(f"<div class='card' style='border-left:4px solid {col}'><b>{d['display']}</b>: {d['price']:.2f} | {d['sig']}</div>")
+        notes = [f"Decision latency p50 {lat['p50_ms']:.1f} ms · p99 {lat['p99_ms']:.1f} ms · n={lat['n']}"]
+        if o and o['n']: notes.append(f"Order ack p50 {o['p50_ms']:.0f} ms · p99 {o['p99_ms']:.0f} ms · retried {o['retried']} · failed {o['failed']}")
+        return boxes, notes
+    key = (tuple((d['display'], d['price'], d['sig']) for d in s['rows']), lat['n'], o and (o['n'], o['retried'], o['failed']))
+    boxes, notes = view("signals", key, build)
+    if boxes: st.markdown("".join(boxes), unsafe_allow_html=True)
     else: st.info("⏳ Waiting for Market Data...")
-
-with tab2:
-    st.info("Market Data")
-    if data_list:
-        df_screen = pd.DataFrame(data_list)
-        if not df_screen.empty:
-            st.dataframe(df_screen[['display', 'price', 'sig', 'type', 'change']], use_container_width=True)
-        else: st.warning("Data loading...")
-    else: st.warning("⏳ Data is loading...")
-
-with tab3:
-    st.write("#### 🔐 Angel One Login")
-    if not st.session_state.smartApi:
-        with st.form("log"):
-            ak = st.text_input("API Key")
-            cid = st.text_input("Client ID")
-            pin = st.text_input("PIN", type="password")
-            totp = st.text_input("TOTP Secret")
-            if st.form_submit_button("CONNECT"):
-                msg, api = angel_login(ak, cid, pin, totp)
-                if api: st.session_state.smartApi = api; st.rerun()
-                else: st.error(msg)
-    else: st.success("Logged In"); st.button("LOGOUT", on_click=lambda: st.session_state.update(smartApi=None))
-
-    st.write("#### 🎮 Strategy")
-    st.session_state.strategy_mode = st.selectbox("Mode", [
-        "1. Sniper (1m) [Scalp]", "2. Momentum (5m) [Trend]", "3. Supertrend (Pro)", 
-        "4. Golden Cross (Pro)", "5. VWAP + MACD (High Acc)", "6. Volume Shock"
-    ])
-    
-    c1, c2 = st.columns([3,1])
-    new = c1.text_input("Add Stock")
-    if c2.button("Add") and new:
-        st.session_state.watchlist.append({"type": "EQUITY", "symbol": new.upper(), "code": f"{new.upper()}.NS", "step": 1})
-        st.rerun()
-        
-    rem = st.selectbox("Remove", [x['symbol'] for x in st.session_state.watchlist])
-    if st.button("Delete"):
-        st.session_state.watchlist = [x for x in st.session_state.watchlist if x['symbol'] != rem]
-        st.rerun()
-    
-    st.write("---")
-    st.session_state.real_trade_active = st.toggle("REAL TRADING", value=st.session_state.real_trade_active)
-    if st.button("▶ START", type="primary"): st.session_state.bot_active = True; st.rerun()
-    if st.button("🛑 STOP"): st.session_state.bot_active = False; st.rerun()
-
-with tab4:
-    st.download_button("Download Logs", "\n".join(st.session_state.logs), "logs.txt")
-    st.text_area("Logs", "\n".join(st.session_state.logs), height=300)
-
-# --- 8. BOT LOOP ---
-if st.session_state.bot_active:
-    for d in data_list:
-        if not check_market_time(d['type']): continue
-        # Entry
-        if "BUY" in d['sig'] and not any(p['display'] == d['display'] for p in st.session_state.positions):
-            qty = st.session_state.manual_qty
-            mode = "PAPER"
-            if st.session_state.real_trade_active and d['token'] and st.session_state.smartApi:
-                try:
-                    p = {"variety":"NORMAL", "tradingsymbol":d['display'], "symboltoken":d['token'], "transactiontype":"BUY", "exchange":d['exch'], "ordertype":"MARKET", "producttype":"INTRADAY", "duration":"DAY", "quantity":str(qty)}
-                    st.session_state.smartApi.placeOrder(p); mode = "REAL"
-                except: mode = "FAIL"
-            
-            if mode != "FAIL":
-                st.session_state.positions.append({"display":d['display'], "entry":d['price'], "qty":qty, "pnl":0.0, "type":mode})
-                add_log(f"Entry: {d['display']}", mode)
-    
-    # Exit
-    for p in st.session_state.positions[:]:
-        curr = p['entry']
-        match = next((x for x in data_list if x['display'] == p['display']), None)
-        if match: curr = match['price']
-        
-        p['pnl'] = (curr - p['entry']) * p['qty']
-        pct = ((curr - p['entry']) / p['entry']) * 100
-        
-        if pct <= -st.session_state.sl_pct or pct >= st.session_state.target_pct:
-            st.session_state.daily_pnl += p['pnl']
-            st.session_state.positions.remove(p)
-            add_log(f"Exit {p['display']} PnL: {p['pnl']}", "EXIT")
-
-    time.sleep(5)
-    st.rerun()
-        if last['Close'] > last['EMA9']: sig = "BUY"
-        else: sig = "SELL"
-    elif "Golden" in strategy:
-        if last['EMA9'] > last['EMA21']: sig = "BUY"
-        else: sig = "SELL"
-    elif "Supertrend" in strategy:
-        st_data = df.ta.supertrend(length=10, multiplier=3)
-        if st_data is not None:
-             df = pd.concat([df, st_data], axis=1)
-             if df.iloc[-1]['Close'] > df.iloc[-1][df.columns[-2]]: sig = "BUY"
-             else: sig = "SELL"
-    elif "VWAP" in strategy:
-        macd = df.ta.macd(fast=12, slow=26, signal=9)
-        if macd is not None:
-            df = pd.concat([df, macd], axis=1)
-            if last['Close'] > last['VWAP'] and last[df.columns[-3]] > last[df.columns[-1]]: sig = "BUY"
-            elif last['Close'] < last['VWAP'] and last[df.columns[-3]] < last[df.columns[-1]]: sig = "SELL"
-    elif "Volume" in strategy:
-        vol_avg = df['Volume'].rolling(20).mean().iloc[-1]
-        if last['Volume'] > (vol_avg * 2):
-            if last['Close'] > last['Open']: sig = "BUY"
-            else: sig = "SELL"
-    return sig
-
-@st.cache_data(ttl=10)
-def scan_market(watchlist, strategy):
-    data = []
-    interval = "1m" if "Sniper" in strategy else "15m" if "VWAP" in strategy else "5m"
-    for item in watchlist:
-        try:
-            df = yf.download(item['code'], period="5d", interval=interval, progress=False)
-            if df.empty: continue
-            if isinstance(df.columns, pd.MultiIndex): df.columns = df.columns.get_level_values(0)
-            sig = calculate_signals(df, strategy)
-            trade_price = df.iloc[-1]['Close']
-            token, sym, exch = None, item['symbol'], "NSE"
-            
-            if item['type'] == "INDEX":
-                strike = round(trade_price / item['step']) * item['step']
-                otype = "CE" if "BUY" in sig else "PE"
-                token, sym, exch = get_angel_token(item['symbol'], strike, otype, "INDEX")
-                if sig != "HOLD": sig = f"BUY {otype}"
-                trade_price *= 0.01 
-            elif item['type'] == "MCX":
-                token, sym, exch = get_angel_token(item['symbol'], type_="MCX")
-            elif item['type'] == "EQUITY":
-                token, sym, exch = get_angel_token(item['symbol'], type_="EQUITY")
-
-            if token:
-                ltp = get_live_ltp(token, exch)
-                if ltp > 0: trade_price = ltp
-                
-            data.append({
-                "display": sym, "price": trade_price, "sig": sig, 
-                "token": token, "exch": exch, "type": item['type'],
-                "change": ((df.iloc[-1]['Close'] - df.iloc[0]['Open'])/df.iloc[0]['Open'])*100
-            })
-        except: pass
-    return data
+    for n in notes: st.caption(n)
+
+# Figures are kept per session and extended in place (charts.BarChart / EquityChart): a refresh re-aggregates only the
+# newest candle bucket, every trace stays under charts.MAX_POINTS, and a fixed element key plus the figure's
+# uirevision let the browser patch the mounted chart (keeping zoom) instead of redrawing it.
+CHART_REFRESH = 5
+
+@st.fragment(run_every=CHART_REFRESH)
+def price_chart():
+    watch = {x['symbol']: x for x in eng.watchlist}
+    c1, c2 = st.columns([3, 1])
+    sym = c1.selectbox("Symbol", list(watch))
+    interval = c2.selectbox("Interval", strategies.intervals())
+    if sym is None: return
+    item = watch[sym]
+    h, marks = eng.history(item['code'], interval), eng.marks(item['code'])
+    if h is None or not len(h['ts']):
+        st.info(f"⏳ No {interval} bars for {sym} yet")
+        return
+    figs = st.session_state.setdefault("charts", {})
+    if (sym, interval) not in figs: figs[(sym, interval)] = charts.BarChart(sym, interval, charts.breaks(item['type']))
+    key = (sym, interval, int(h['ts'][-1]), float(h['Close'][-1]), len(marks), marks[-1]['ts'] if marks else None)
+    fig = view("chart", key, lambda: figs[(sym, interval)].update(h, marks))
+    st.plotly_chart(fig, key="price_chart", config={"displayModeBar": False})
+
+@st.fragment(run_every=CHART_REFRESH)
+def equity_chart():
+    curve = eng.equity_curve()
+    if not curve: return
+    chart = st.session_state.setdefault("equity", charts.EquityChart())
+    fig = view("equity", (len(curve), curve[-1]), lambda: chart.update(curve))
+    st.plotly_chart(fig, key="equity_chart", config={"displayModeBar": False})
+
+@st.fragment(run_every=REFRESH)
+def market():
+    rows = state()['rows']
+    key = tuple((d['display'], d['price'], d['change'], tuple(d['sigs'].values())) for d in rows)
+    df_screen = view("market", key, lambda: pd.DataFrame([{**{k: d[k] for k in ('display', 'price', 'type', 'change')}, **d['sigs']} for d in rows]))
+    if not rows: st.warning("⏳ Data is loading...")
+    elif df_screen.empty: st.warning("Data loading...")
+    else: st.dataframe(df_screen, width="stretch")
+
+@st.fragment(run_every=60)
+def universe_scan():
+    universe = screener.universe(eng.instr)
+    c1, c2 = st.columns([3, 1])
+    top = c1.slider("Top N", 5, 50, 10)
+    if c2.button("Sync Bars") and universe: eng.sync_universe([c for _, c in universe])
+    if universe:
+        buy, sell = scan_universe(tuple(c for _, c in universe), eng.strategy_mode, top)
+        c1, c2 = st.columns(2)
+        c1.dataframe(buy, width="stretch")
+        c2.dataframe(sell, width="stretch")
+    else: st.warning("Instrument master not loaded")
+
+@st.fragment(run_every=REFRESH)
+def sync_progress():
+    # The universe sync runs on an engine worker thread; this only reports it, and rescans once it finishes.
+    p = dict(eng.universe_sync)
+    if p['running']:
+        st.progress(p['done'] / max(p['total'], 1), text=f"Syncing 1m bars: {p['done']}/{p['total']} symbols, {p['errors']} failed")
+    elif p['finished'] and st.session_state.get("synced") != p['finished']:
+        st.session_state.synced = p['finished']
+        scan_universe.clear()
+        st.rerun(scope="app")
+
+LEVELS = ["INFO", "PAPER", "REAL", "EXIT", "ALERT", "FAIL", "RECON", "ERROR"]
+
+@st.fragment(run_every=REFRESH)
+def logs():
+    # Pages come from the engine's logbook: recent records from memory, older ones read file by file from disk.
+    c1, c2, c3, c4 = st.columns([2, 1, 2, 1])
+    levels = c1.multiselect("Level", LEVELS)
+    symbol = c2.text_input("Symbol").strip().upper()
+    text = c3.text_input("Search").strip()
+    page = int(c4.number_input("Page", min_value=0, step=1))
+    def build():
+        recs, more = eng.logbook.query(page, 100, levels=levels, symbol=symbol or None, text=text or None)
+        return "\n".join(logbook.line(r) for r in recs), len(recs), more
+    body, n, more = view("logs", (eng.logbook.seq, tuple(levels), symbol, text, page), build)
+    st.download_button("Download Logs", body, "logs.txt")
+    st.text_area("Logs", body, height=300)
+    st.caption(f"Page {page} · {n} records" + (" · older pages available" if more else ""))
+
+@st.fragment(run_every=REFRESH)
+def perf_view():
+    s = perf.stats()
+    def build():
+        return (pd.DataFrame(s['stages']), pd.DataFrame(sorted(s['counters'].items()), columns=["counter", "n"]),
+                pd.DataFrame(s['errors'], columns=["stage", "n", "last"]))
+    key = (tuple((x['stage'], x['n']) for x in s['stages']), tuple(s['counters'].items()), tuple((x['stage'], x['n']) for x in s['errors']))
+    stages, counters, errors = view("perf", key, build)
+    if not perf.ENABLED: st.info("Timers are off (MISHR_PERF=0); only error counters are kept.")
+    if len(stages): st.dataframe(stages.round(3), width="stretch", hide_index=True)
+    c1, c2 = st.columns([1, 2])
+    c1.dataframe(counters, width="stretch", hide_index=True)
+    c2.dataframe(errors, width="stretch", hide_index=True)
+    st.caption(f"Prometheus: http://127.0.0.1:{perf.PORT}/metrics")
 
 # --- 7. UI TABS ---
 c1, c2 = st.columns([4, 1])
 with c1: st.markdown("### 🤖 Mishr@lgobot <span style='color:gold'>PRO</span>", unsafe_allow_html=True)
-with c2: st.markdown(f"<small>Status:</small> {'🟢 ON' if st.session_state.bot_active else '🔴 OFF'}", unsafe_allow_html=True)
-
-data_list = scan_market(st.session_state.watchlist, st.session_state.strategy_mode)
+with c2: status()
 
-tab1, tab2, tab3, tab4 = st.tabs(["🏠 DASHBOARD", "🔍 SCREENER", "⚙️ CONFIG", "📜 LOGS"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["🏠 DASHBOARD", "🔍 SCREENER", "⚙️ CONFIG", "📜 LOGS", "📈 PERF"])
 
 with tab1:
-    curr_pnl = sum([p['pnl'] for p in st.session_state.positions])
-    total_pnl = st.session_state.daily_pnl + curr_pnl
-    cls = "bull" if total_pnl >= 0 else "bear"
-    
-    c1, c2, c3 = st.columns(3)
-    c1.markdown(f"<div class='card'>Wallet<br><b>₹{st.session_state.bal:,.0f}</b></div>", unsafe_allow_html=True)
-    c2.markdown(f"<div class='card'>P&L<br><span class='{cls}'>₹{total_pnl:.2f}</span></div>", unsafe_allow_html=True)
-    c3.markdown(f"<div class='card'>Active<br><b>{len(st.session_state.positions)}</b></div>", unsafe_allow_html=True)
-    
+    cards()
     if st.button("🚨 PANIC: EXIT ALL", type="secondary"):
-        st.session_state.bot_active = False
-        st.session_state.positions = []
-        add_log("PANIC EXIT TRIGGERED", "ALERT")
+        eng.panic()
         st.rerun()
 
     st.write("### Signals")
-    if data_list:
-        for d in data_list:
-            col = "#00e676" if "BUY" in d['sig'] else "#ff1744" if "SELL" in d['sig'] else "#333"
-            st.markdown(f"<div class='card' style='border-left:4px solid {col}'><b>{d['display']}</b>: {d['price']:.2f} | {d['sig']}</div>", unsafe_allow_html=True)
-    else: st.info("⏳ Waiting for Market Data...")
+    signals()
+
+    st.write("### Charts")
+    price_chart()
+    equity_chart()
 
 with tab2:
     st.info("Market Data")
-    if data_list:
-        df_screen = pd.DataFrame(data_list)
-        if not df_screen.empty:
-            st.dataframe(df_screen[['display', 'price', 'sig', 'type', 'change']], use_container_width=True)
-        else: st.warning("Data loading...")
-    else: st.warning("⏳ Data is loading...")
+    market()
+    st.write("#### 🌐 Universe Scan (NSE EQ)")
+    sync_progress()
+    universe_scan()
 
 with tab3:
     st.write("#### 🔐 Angel One Login")
-    if not st.session_state.smartApi:
+    if not snap['logged_in']:
         with st.form("log"):
             ak = st.text_input("API Key")
             cid = st.text_input("Client ID")
@@ -428,240 +278,38 @@ with tab3:
             totp = st.text_input("TOTP Secret")
             if st.form_submit_button("CONNECT"):
                 msg, api = angel_login(ak, cid, pin, totp)
-                if api: st.session_state.smartApi = api; st.rerun()
+                if api: eng.attach_api(api); st.rerun()
                 else: st.error(msg)
-    else: st.success("Logged In"); st.button("LOGOUT", on_click=lambda: st.session_state.update(smartApi=None))
-
-    st.write("#### 🎮 Strategy")
-    st.session_state.strategy_mode = st.selectbox("Mode", [
-        "1. Sniper (1m) [Scalp]", "2. Momentum (5m) [Trend]", "3. Supertrend (Pro)", 
-        "4. Golden Cross (Pro)", "5. VWAP + MACD (High Acc)", "6. Volume Shock"
-    ])
-    
-    c1, c2 = st.columns([3,1])
-    new = c1.text_input("Add Stock")
-    if c2.button("Add") and new:
-        st.session_state.watchlist.append({"type": "EQUITY", "symbol": new.upper(), "code": f"{new.upper()}.NS", "step": 1})
-        st.rerun()
-        
-    rem = st.selectbox("Remove", [x['symbol'] for x in st.session_state.watchlist])
-    if st.button("Delete"):
-        st.session_state.watchlist = [x for x in st.session_state.watchlist if x['symbol'] != rem]
-        st.rerun()
-    
-    st.write("---")
-    st.session_state.real_trade_active = st.toggle("REAL TRADING", value=st.session_state.real_trade_active)
-    if st.button("▶ START", type="primary"): st.session_state.bot_active = True; st.rerun()
-    if st.button("🛑 STOP"): st.session_state.bot_active = False; st.rerun()
-
-with tab4:
-    st.download_button("Download Logs", "\n".join(st.session_state.logs), "logs.txt")
-    st.text_area("Logs", "\n".join(st.session_state.logs), height=300)
-
-# --- 8. BOT LOOP ---
-if st.session_state.bot_active:
-    for d in data_list:
-        if not check_market_time(d['type']): continue
-        # Entry
-        if "BUY" in d['sig'] and not any(p['display'] == d['display'] for p in st.session_state.positions):
-            qty = st.session_state.manual_qty
-            mode = "PAPER"
-            if st.session_state.real_trade_active and d['token'] and st.session_state.smartApi:
-                try:
-                    p = {"variety":"NORMAL", "tradingsymbol":d['display'], "symboltoken":d['token'], "transactiontype":"BUY", "exchange":d['exch'], "ordertype":"MARKET", "producttype":"INTRADAY", "duration":"DAY", "quantity":str(qty)}
-                    st.session_state.smartApi.placeOrder(p); mode = "REAL"
-                except: mode = "FAIL"
-            
-            if mode != "FAIL":
-                st.session_state.positions.append({"display":d['display'], "entry":d['price'], "qty":qty, "pnl":0.0, "type":mode})
-                add_log(f"Entry: {d['display']}", mode)
-    
-    # Exit
-    for p in st.session_state.positions[:]:
-        curr = p['entry']
-        match = next((x for x in data_list if x['display'] == p['display']), None)
-        if match: curr = match['price']
-        
-        p['pnl'] = (curr - p['entry']) * p['qty']
-        pct = ((curr - p['entry']) / p['entry']) * 100
-        
-        if pct <= -st.session_state.sl_pct or pct >= st.session_state.target_pct:
-            st.session_state.daily_pnl += p['pnl']
-            st.session_state.positions.remove(p)
-            add_log(f"Exit {p['display']} PnL: {p['pnl']}", "EXIT")
-
-    time.sleep(5)
-    st.rerun()
-            if last['Close'] > last['VWAP'] and last[df.columns[-3]] > last[df.columns[-1]]: sig = "BUY"
-            elif last['Close'] < last['VWAP'] and last[df.columns[-3]] < last[df.columns[-1]]: sig = "SELL"
-    elif "Volume" in strategy:
-        vol_avg = df['Volume'].rolling(20).mean().iloc[-1]
-        if last['Volume'] > (vol_avg * 2):
-            if last['Close'] > last['Open']: sig = "BUY"
-            else: sig = "SELL"
-    return sig
-
-@st.cache_data(ttl=10)
-def scan_market(watchlist, strategy):
-    data = []
-    interval = "1m" if "Sniper" in strategy else "15m" if "VWAP" in strategy else "5m"
-    for item in watchlist:
-        try:
-            df = yf.download(item['code'], period="5d", interval=interval, progress=False)
-            if df.empty: continue
-            if isinstance(df.columns, pd.MultiIndex): df.columns = df.columns.get_level_values(0)
-            sig = calculate_signals(df, strategy)
-            trade_price = df.iloc[-1]['Close']
-            token, sym, exch = None, item['symbol'], "NSE"
-            
-            if item['type'] == "INDEX":
-                strike = round(trade_price / item['step']) * item['step']
-                otype = "CE" if "BUY" in sig else "PE"
-                token, sym, exch = get_angel_token(item['symbol'], strike, otype, "INDEX")
-                if sig != "HOLD": sig = f"BUY {otype}"
-                trade_price *= 0.01 
-            elif item['type'] == "MCX":
-                token, sym, exch = get_angel_token(item['symbol'], type_="MCX")
-            elif item['type'] == "EQUITY":
-                token, sym, exch = get_angel_token(item['symbol'], type_="EQUITY")
-
-            if token:
-                ltp = get_live_ltp(token, exch)
-                if ltp > 0: trade_price = ltp
-                
-            data.append({
-                "display": sym, "price": trade_price, "sig": sig, 
-                "token": token, "exch": exch, "type": item['type'],
-                "change": ((df.iloc[-1]['Close'] - df.iloc[0]['Open'])/df.iloc[0]['Open'])*100
-            })
-        except: pass
-    return data
-
-# --- 6. UI TABS ---
-c1, c2 = st.columns([4, 1])
-with c1: st.markdown("### 🤖 Mishr@lgobot <span style='color:gold'>FINAL</span>", unsafe_allow_html=True)
-with c2: st.markdown(f"<small>Status:</small> {'🟢 ON' if st.session_state.bot_active else '🔴 OFF'}", unsafe_allow_html=True)
-
-data_list = scan_market(st.session_state.watchlist, st.session_state.strategy_mode)
-
-tab1, tab2, tab3, tab4 = st.tabs(["🏠 DASHBOARD", "🔍 SCREENER & FII", "⚙️ CONFIG", "📜 LOGS"])
-
-with tab1:
-    curr_pnl = sum([p['pnl'] for p in st.session_state.positions])
-    total_pnl = st.session_state.daily_pnl + curr_pnl
-    cls = "bull" if total_pnl >= 0 else "bear"
-    
-    c1, c2, c3 = st.columns(3)
-    c1.markdown(f"<div class='card'>Wallet<br><b>₹{st.session_state.bal:,.0f}</b></div>", unsafe_allow_html=True)
-    c2.markdown(f"<div class='card'>P&L<br><span class='{cls}'>₹{total_pnl:.2f}</span></div>", unsafe_allow_html=True)
-    c3.markdown(f"<div class='card'>Active<br><b>{len(st.session_state.positions)}</b></div>", unsafe_allow_html=True)
-    
-    if st.button("🚨 PANIC: EXIT ALL", type="secondary"):
-        st.session_state.bot_active = False
-        st.session_state.positions = []
-        add_log("PANIC EXIT TRIGGERED", "ALERT")
-        st.rerun()
-
-    st.write("### Signals")
-    if data_list:
-        for d in data_list:
-            col = "#00e676" if "BUY" in d['sig'] else "#ff1744" if "SELL" in d['sig'] else "#333"
-            st.markdown(f"<div class='card' style='border-left:4px solid {col}'><b>{d['display']}</b>: {d['price']:.2f} | {d['sig']}</div>", unsafe_allow_html=True)
     else:
-        st.info("⏳ Waiting for Market Data...")
-
-with tab2:
-    st.info("FII/DII Data & Screener")
-    
-    # --- ERROR FIX: CHECK IF DATA EXISTS BEFORE DATAFRAME ---
-    if data_list:
-        df_screen = pd.DataFrame(data_list)
-        if not df_screen.empty:
-            st.dataframe(df_screen[['display', 'price', 'sig', 'type', 'change']], use_container_width=True)
-            
-            st.write("#### FII/DII Trend Simulation")
-            nifty_chg = df_screen.iloc[0]['change']
-            sentiment = "BULLISH (Buying)" if nifty_chg > 0 else "BEARISH (Selling)"
-            st.metric("FII Sentiment", sentiment, f"{nifty_chg:.2f}%")
-        else:
-            st.warning("Data loading...")
-    else:
-        st.warning("⏳ Data is loading... please wait.")
-
-with tab3:
-    st.write("#### 🔐 Login")
-    if not st.session_state.smartApi:
-        with st.form("log"):
-            ak = st.text_input("API Key")
-            cid = st.text_input("Client ID")
-            pin = st.text_input("PIN", type="password")
-            totp = st.text_input("TOTP Secret")
-            if st.form_submit_button("CONNECT"):
-                msg, api = angel_login(ak, cid, pin, totp)
-                if api: st.session_state.smartApi = api; st.rerun()
-                else: st.error(msg)
-    else: st.success("Logged In"); st.button("LOGOUT", on_click=lambda: st.session_state.update(smartApi=None))
+        st.success("Logged In")
+        c1, c2 = st.columns(2)
+        c1.button("RECONCILE", on_click=eng.reconcile)
+        c2.button("LOGOUT", on_click=eng.detach_api)
 
     st.write("#### 🎮 Strategy")
-    st.session_state.strategy_mode = st.selectbox("Mode", [
-        "1. Sniper (1m) [Scalp]", "2. Momentum (5m) [Trend]", "3. Supertrend (Pro)", 
-        "4. Golden Cross (Pro)", "5. VWAP + MACD (High Acc)", "6. Volume Shock"
-    ])
+    mode = st.selectbox("Mode", strategies.LABELS,
+        index=strategies.LABELS.index(strategies.get(snap['strategy_mode']).label))
+    if strategies.get(mode).key != strategies.get(snap['strategy_mode']).key: eng.configure(strategy_mode=mode)
     
     c1, c2 = st.columns([3,1])
     new = c1.text_input("Add Stock")
     if c2.button("Add") and new:
-        st.session_state.watchlist.append({"type": "EQUITY", "symbol": new.upper(), "code": f"{new.upper()}.NS", "step": 1})
+        eng.add_symbol({"type": "EQUITY", "symbol": new.upper(), "code": f"{new.upper()}.NS", "step": 1})
         st.rerun()
         
-    rem = st.selectbox("Remove", [x['symbol'] for x in st.session_state.watchlist])
+    rem = st.selectbox("Remove", [x['symbol'] for x in snap['watchlist']])
     if st.button("Delete"):
-        st.session_state.watchlist = [x for x in st.session_state.watchlist if x['symbol'] != rem]
+        eng.remove_symbol(rem)
         st.rerun()
     
     st.write("---")
-    st.session_state.real_trade_active = st.toggle("REAL TRADING", value=st.session_state.real_trade_active)
-    if st.button("▶ START", type="primary"): st.session_state.bot_active = True; st.rerun()
-    if st.button("🛑 STOP"): st.session_state.bot_active = False; st.rerun()
+    real = st.toggle("REAL TRADING", value=snap['real_trade_active'])
+    if real != snap['real_trade_active']: eng.configure(real_trade_active=real)
+    if st.button("▶ START", type="primary"): eng.start_bot(); st.rerun()
+    if st.button("🛑 STOP"): eng.stop_bot(); st.rerun()
 
 with tab4:
-    st.download_button("Download Logs", "\n".join(st.session_state.logs), "logs.txt")
-    st.text_area("Logs", "\n".join(st.session_state.logs), height=300)
-
-# --- 7. BOT LOOP ---
-if st.session_state.bot_active:
-    for d in data_list:
-        if not check_market_time(d['type']): continue
-        
-        # Entry
-        if "BUY" in d['sig'] and not any(p['display'] == d['display'] for p in st.session_state.positions):
-            qty = st.session_state.manual_qty
-            mode = "PAPER"
-            if st.session_state.real_trade_active and d['token'] and st.session_state.smartApi:
-                try:
-                    p = {"variety":"NORMAL", "tradingsymbol":d['display'], "symboltoken":d['token'], "transactiontype":"BUY", "exchange":d['exch'], "ordertype":"MARKET", "producttype":"INTRADAY", "duration":"DAY", "quantity":str(qty)}
-                    st.session_state.smartApi.placeOrder(p); mode = "REAL"
-                except: mode = "FAIL"
-            
-            if mode != "FAIL":
-                st.session_state.positions.append({"display":d['display'], "entry":d['price'], "qty":qty, "pnl":0.0, "type":mode})
-                add_log(f"Entry: {d['display']}", mode)
-    
-    # Exit (SL/Target)
-    for p in st.session_state.positions[:]:
-        curr = p['entry']
-        match = next((x for x in data_list if x['display'] == p['display']), None)
-        if match: curr = match['price']
-        
-        p['pnl'] = (curr - p['entry']) * p['qty']
-        pct = ((curr - p['entry']) / p['entry']) * 100
-        
-        if pct <= -st.session_state.sl_pct or pct >= st.session_state.target_pct:
-            st.session_state.daily_pnl += p['pnl']
-            st.session_state.positions.remove(p)
-            add_log(f"Exit {p['display']} PnL: {p['pnl']}", "EXIT")
-
-    time.sleep(5)
-    st.rerun()
-
+    logs()
 
+with tab5:
+    perf_view()
@@ -0,0 +1,244 @@
+# --- BACKTESTER: the built-in strategies plus SL/target exits over stored bars, vectorized with NumPy ---
+import numpy as np
+import pandas as pd
+import barstore
+import clock
+import strategies
+from bars import INTERVALS
+
+# Everything the live path hard-codes, in one place; `run(..., params={...})` overrides any subset.
+PARAMS = {
+    "ema_fast": 9, "ema_slow": 21, "rsi_len": 14, "rsi_buy": 55, "rsi_sell": 45,
+    "st_len": 10, "st_mult": 3.0, "macd_fast": 12, "macd_slow": 26, "macd_signal": 9,
+    "vol_len": 20, "vol_mult": 2.0, "target_pct": 2.0, "sl_pct": 1.0, "qty": 50, "capital": 100000.0,
+}
+
+# --- indicators (same formulas as indicators.IndicatorState, whole arrays at once) ---
+def ema(x, n, alpha=None):
+    """NaN until n valid values, seeded with their SMA, then ewm(adjust=False); alpha defaults to 2/(n+1)."""
+    x = np.asarray(x, dtype=float)
+    out = np.full(len(x), np.nan)
+    valid = np.flatnonzero(~np.isnan(x))
+    if len(valid) < n: return out
+    f = valid[0]
+    y = x[f + n - 1:].copy()
+    y[0] = x[f:f + n].mean()
+    out[f + n - 1:] = pd.Series(y).ewm(alpha=alpha or 2 / (n + 1), adjust=False).mean().to_numpy()
+    return out
+
+def rma(x, n):
+    return pd.Series(x).ewm(alpha=1 / n, adjust=False).mean().to_numpy()
+
+def rsi(c, n=14):
+    d = np.r_[np.nan, np.diff(c)]
+    up, dn = rma(np.maximum(d, 0), n), rma(-np.minimum(d, 0), n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 100 * up / (up + dn)
+
+def atr(h, l, c, n=10):
+    pc = np.r_[np.nan, c[:-1]]
+    tr = np.fmax(h - l, np.fmax(np.abs(h - pc), np.abs(pc - l)))
+    return ema(tr, n, alpha=1 / n)
+
+def supertrend(h, l, c, n=10, mult=3.0):
+    """(SUPERT, SUPERTl): the band ratchet depends on the previous direction, so this one stays a scalar loop."""
+    matr = mult * atr(h, l, c, n)
+    hl2 = (h + l) / 2
+    lb, ub = (hl2 - matr).tolist(), (hl2 + matr).tolist()
+    cl, nan = c.tolist(), float("nan")
+    st, stl = [nan] * len(cl), [nan] * len(cl)
+    d = 1
+    for i in range(1, len(cl)):
+        if cl[i] > ub[i - 1]: d = 1
+        elif cl[i] < lb[i - 1]: d = -1
+        else:
+            if d > 0 and lb[i] < lb[i - 1]: lb[i] = lb[i - 1]
+            if d < 0 and ub[i] > ub[i - 1]: ub[i] = ub[i - 1]
+        st[i] = lb[i] if d > 0 else ub[i]
+        if d > 0: stl[i] = lb[i]
+    return np.array(st), np.array(stl)
+
+def vwap(ts, h, l, c, v):
+    """Anchored per IST calendar day."""
+    day = (ts + clock.IST_OFFSET) // 86400
+    start = np.r_[True, day[1:] != day[:-1]]
+    seg = np.cumsum(start) - 1
+    pv = (h + l + c) / 3 * v
+    cpv, cv = np.cumsum(pv), np.cumsum(v)
+    base_pv, base_v = (cpv - pv)[start][seg], (cv - v)[start][seg]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(cv - base_v > 0, (cpv - base_pv) / (cv - base_v), np.nan)
+
+def rolling_mean(x, n):
+    out = np.full(len(x), np.nan)
+    if len(x) >= n:
+        cs = np.r_[0.0, np.cumsum(x)]
+        out[n - 1:] = (cs[n:] - cs[:-n]) / n
+    return out
+
+def features(b, p, need=None, cache=None):
+    """Indicator arrays keyed like IndicatorState.out; `need` limits the work to what a strategy reads.
+
+    `cache` (one dict per bar array) memoizes each indicator by its own parameters, so a sweep that only
+    changes exits or thresholds computes nothing twice.
+    """
+    o, h, l, c, v = (np.asarray(b[k], dtype=float) for k in ('open', 'high', 'low', 'close', 'volume'))
+    need = set(need) if need is not None else {"EMA9", "EMA21", "RSI", "VWAP", "SUPERT", "SUPERTl", "MACD", "MACDs", "VOL_AVG"}
+    memo = (lambda key, fn: cache[key] if key in cache else cache.setdefault(key, fn())) if cache is not None else (lambda key, fn: fn())
+    out = {"Open": o, "High": h, "Low": l, "Close": c, "Volume": v}
+    if need & {"EMA9"}: out["EMA9"] = memo(("ema", p['ema_fast']), lambda: ema(c, p['ema_fast']))
+    if need & {"EMA21"}: out["EMA21"] = memo(("ema", p['ema_slow']), lambda: ema(c, p['ema_slow']))
+    if need & {"RSI"}: out["RSI"] = memo(("rsi", p['rsi_len']), lambda: rsi(c, p['rsi_len']))
+    if need & {"VWAP"}: out["VWAP"] = memo(("vwap",), lambda: vwap(np.asarray(b['ts']), h, l, c, v))
+    if need & {"SUPERT", "SUPERTl"}:
+        out["SUPERT"], out["SUPERTl"] = memo(("st", p['st_len'], p['st_mult']), lambda: supertrend(h, l, c, p['st_len'], p['st_mult']))
+    if need & {"MACD", "MACDs"}:
+        f, s, g = p['macd_fast'], p['macd_slow'], p['macd_signal']
+        m = memo(("macd", f, s), lambda: memo(("ema", f), lambda: ema(c, f)) - memo(("ema", s), lambda: ema(c, s)))
+        out["MACD"], out["MACDs"] = m, memo(("macds", f, s, g), lambda: ema(m, g))
+    if need & {"VOL_AVG"}: out["VOL_AVG"] = memo(("vol", p['vol_len']), lambda: rolling_mean(v, p['vol_len']))
+    return out
+
+# --- signal rules: 1 BUY, -1 SELL, 0 HOLD per bar, mirroring strategies.py ---
+def _sniper(v, p):
+    buy = (v['EMA9'] > v['EMA21']) & (v['RSI'] > p['rsi_buy'])
+    sell = (v['EMA9'] < v['EMA21']) & (v['RSI'] < p['rsi_sell'])
+    return np.where(buy, 1, np.where(sell, -1, 0))
+
+def _momentum(v, p):
+    return np.where(v['Close'] > v['EMA9'], 1, -1)
+
+def _supertrend(v, p):
+    return np.where(np.isnan(v['SUPERT']), 0, np.where(v['Close'] > v['SUPERTl'], 1, -1))
+
+def _golden(v, p):
+    return np.where(v['EMA9'] > v['EMA21'], 1, -1)
+
+def _vwap_macd(v, p):
+    buy = (v['Close'] > v['VWAP']) & (v['MACD'] > v['MACDs'])
+    sell = (v['Close'] < v['VWAP']) & (v['MACD'] < v['MACDs'])
+    return np.where(buy, 1, np.where(sell, -1, 0))
+
+def _volume(v, p):
+    shock = v['Volume'] > v['VOL_AVG'] * p['vol_mult']
+    return np.where(shock, np.where(v['Close'] > v['Open'], 1, -1), 0)
+
+RULES = {"Sniper": _sniper, "Momentum": _momentum, "Supertrend": _supertrend, "Golden": _golden,
+         "VWAP": _vwap_macd, "Volume": _volume}
+
+def signals(b, strategy, params=None):
+    p = dict(PARAMS, **(params or {}))
+    s = strategies.get(strategy)
+    with np.errstate(invalid='ignore'):
+        return RULES[s.key](features(b, p, s.features), p)
+
+# --- bars ---
+def resample(rec, interval, exch_type="EQUITY"):
+    """1m BAR records -> `interval` bars aligned to the session open like bars.BarBuilder; off-session minutes drop."""
+    o, _, inside = clock.session_arrays(exch_type, rec['ts'])
+    rec, o = rec[inside], o[inside]
+    if interval == "1m" or not len(rec): return np.array(rec)
+    size = INTERVALS[interval]
+    start = o + (rec['ts'] - o) // size * size
+    idx = np.flatnonzero(np.r_[True, start[1:] != start[:-1]])
+    out = np.empty(len(idx), dtype=barstore.BAR)
+    out['ts'], out['open'] = start[idx], rec['open'][idx]
+    out['high'] = np.maximum.reduceat(rec['high'], idx)
+    out['low'] = np.minimum.reduceat(rec['low'], idx)
+    out['close'] = rec['close'][np.r_[idx[1:] - 1, len(rec) - 1]]
+    out['volume'] = np.add.reduceat(rec['volume'], idx)
+    return out
+
+# --- trade simulation ---
+def _first(mask_fn, j0, n, window=256):
+    """Index of the first True of mask_fn(a, b) over [j0, n), scanning in doubling windows."""
+    while j0 < n:
+        j1 = min(n, j0 + window)
+        m = mask_fn(j0, j1)
+        if m.any(): return j0 + int(np.argmax(m))
+        j0, window = j1, window * 2
+    return None
+
+def bars_per_year(interval, exch_type="EQUITY"):
+    """Bars of `interval` in a trading year: session length per day (24h for CRYPTO, 365 days) x trading days."""
+    opn, close = clock.SESSIONS.get(exch_type, clock.SESSIONS["EQUITY"])
+    if close is None: return 365 * 86400 // INTERVALS[interval]
+    secs = (close.hour - opn.hour) * 3600 + (close.minute - opn.minute) * 60
+    return 252 * -(-secs // INTERVALS[interval])
+
+class BacktestResult:
+    def __init__(self, trades, equity, drawdown, metrics):
+        self.trades, self.equity, self.drawdown, self.metrics = trades, equity, drawdown, metrics
+
+def simulate(b, sig, exch_type="EQUITY", params=None, interval="1m"):
+    """Enter at the close of a signal bar when flat, exit when a later bar's range crosses SL or target.
+
+    Longs on BUY; INDEX rows also take SELL as a short (the live path buys the PE), modelled on the underlying.
+    A bar that touches both levels counts as a stop; gaps through a level fill at the bar's open.
+    """
+    p = dict(PARAMS, **(params or {}))
+    ts, o, h, l, c = (np.asarray(b[k]) for k in ('ts', 'open', 'high', 'low', 'close'))
+    n, qty, sl, tp = len(c), p['qty'], p['sl_pct'] / 100, p['target_pct'] / 100
+    cand = np.flatnonzero(sig != 0 if exch_type == "INDEX" else sig > 0)
+    rows, k = [], 0
+    while k < len(cand):
+        i = int(cand[k])
+        side, entry = int(np.sign(sig[i])), c[i]
+        stop, tgt = entry * (1 - side * sl), entry * (1 + side * tp)
+        if side > 0:
+            j = _first(lambda a, z: (l[a:z] <= stop) | (h[a:z] >= tgt), i + 1, n)
+            if j is not None: px, why = (min(stop, o[j]), "SL") if l[j] <= stop else (max(tgt, o[j]), "TARGET")
+        else:
+            j = _first(lambda a, z: (h[a:z] >= stop) | (l[a:z] <= tgt), i + 1, n)
+            if j is not None: px, why = (max(stop, o[j]), "SL") if h[j] >= stop else (min(tgt, o[j]), "TARGET")
+        if j is None: j, px, why = n - 1, c[-1], "OPEN"
+        rows.append((i, j, side, entry, px, side * (px - entry) * qty, why))
+        k = int(np.searchsorted(cand, j, side='right'))
+
+    cols = ["i", "j", "side", "entry", "exit", "pnl", "reason"]
+    trades = pd.DataFrame(rows, columns=cols)
+    # Equity = capital + realized pnl + mark-to-market of the open trade, built from difference arrays.
+    d_side, d_cost, realized = np.zeros(n + 1), np.zeros(n + 1), np.zeros(n)
+    if len(trades):
+        ii, jj, sd, en = (trades[k].to_numpy() for k in ("i", "j", "side", "entry"))
+        np.add.at(d_side, ii, sd); np.add.at(d_side, jj, -sd)
+        np.add.at(d_cost, ii, sd * en); np.add.at(d_cost, jj, -sd * en)
+        np.add.at(realized, jj, trades["pnl"].to_numpy())
+    mtm = (np.cumsum(d_side)[:n] * c - np.cumsum(d_cost)[:n]) * qty
+    idx = pd.to_datetime(ts, unit='s', utc=True).tz_convert(clock.IST)
+    equity = pd.Series(p['capital'] + np.cumsum(realized) + mtm, index=idx, name="equity")
+    drawdown = equity - equity.cummax()
+    if len(trades):
+        trades.insert(0, "entry_time", idx[trades["i"].to_numpy()])
+        trades.insert(1, "exit_time", idx[trades["j"].to_numpy()])
+    return BacktestResult(trades, equity, drawdown, metrics(trades, equity, drawdown, p['capital'], bars_per_year(interval, exch_type)))
+
+def metrics(trades, equity, drawdown, capital=PARAMS['capital'], per_year=bars_per_year("1m")):
+    """Summary stats; `sharpe` is annualized per-bar mean/std, so windows of different lengths compare."""
+    pnl = trades["pnl"].to_numpy() if len(trades) else np.zeros(0)
+    wins, losses = pnl[pnl > 0].sum(), -pnl[pnl < 0].sum()
+    rets = np.diff(equity.to_numpy()) / capital
+    return {"trades": len(pnl), "pnl": float(pnl.sum()), "return_pct": float(pnl.sum() / capital * 100),
+            "win_rate": float((pnl > 0).mean() * 100) if len(pnl) else 0.0,
+            "profit_factor": float(wins / losses) if losses else float("inf") if wins else 0.0,
+            "max_dd": float(drawdown.min()) if len(drawdown) else 0.0,
+            "sharpe": float(rets.mean() / rets.std() * np.sqrt(per_year)) if len(rets) > 1 and rets.std() else 0.0}
+
+def run_bars(rec, strategy, exch_type="EQUITY", params=None):
+    """Backtest one strategy on 1m BAR records (resampled to the strategy's interval)."""
+    interval = strategies.get(strategy).interval
+    b = resample(rec, interval, exch_type)
+    return simulate(b, signals(b, strategy, params), exch_type, params, interval)
+
+def run(code, strategy, exch_type="EQUITY", params=None, store=None, since=None, until=None):
+    """Backtest from the local bar store; nothing touches the network."""
+    rec = (store or barstore.BarStore()).records(code, "1m")
+    if since is not None: rec = rec[np.searchsorted(rec['ts'], int(pd.Timestamp(since).timestamp())):]
+    if until is not None: rec = rec[:np.searchsorted(rec['ts'], int(pd.Timestamp(until).timestamp()))]
+    return run_bars(rec, strategy, exch_type, params)
+
+def run_watchlist(watchlist, strategy, params=None, store=None, since=None, until=None):
+    """{symbol: BacktestResult} plus one metrics row per symbol."""
+    store = store or barstore.BarStore()
+    out = {x['symbol']: run(x['code'], strategy, x['type'], params, store, since, until) for x in watchlist}
+    return out, pd.DataFrame({sym: r.metrics for sym, r in out.items()}).T
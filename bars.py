@@ -0,0 +1,116 @@
+# --- BAR BUILDER: 1m/3m/5m/15m/1h bars from one tick or 1m stream, aligned to each session's open ---
+import threading
+import numpy as np
+import clock
+
+INTERVALS = {"1m": 60, "3m": 180, "5m": 300, "15m": 900, "1h": 3600}
+
+class BarBuilder:
+    """Folds ticks or 1m bars into every interval and calls subscribers when a bar closes.
+
+    Bars are [start_ts, open, high, low, close, volume]. The forming 1m bar is final once a later minute
+    arrives or `flush` passes its end; higher intervals are built from final 1m bars only, and close as soon
+    as their last minute (or the session close) is folded in, so nothing waits for the next bar's first tick.
+    """
+    def __init__(self, intervals=tuple(INTERVALS)):
+        self.intervals = [(iv, INTERVALS[iv]) for iv in intervals if iv != "1m"]
+        self.types, self.m1, self.agg, self.cum, self.done = {}, {}, {}, {}, {}
+        self.subs = []
+        self.lock = threading.RLock()
+
+    def subscribe(self, callback, interval=None, symbol=None):
+        """callback(symbol, interval, bar) on every close matching the (optional) interval/symbol filter."""
+        self.subs.append((callback, interval, symbol))
+
+    def register(self, symbol, exch_type):
+        self.types[symbol] = exch_type
+
+    def _emit(self, symbol, interval, bar):
+        for cb, iv, sym in self.subs:
+            if (iv is None or iv == interval) and (sym is None or sym == symbol): cb(symbol, interval, tuple(bar))
+
+    def _bucket(self, symbol, ts, size):
+        bounds = clock.session_bounds(self.types.get(symbol, "EQUITY"), ts)
+        if bounds is None: return None
+        o, c = bounds
+        start = o + (ts - o) // size * size
+        return start, min(start + size, c)
+
+    def _fold(self, symbol, bar):
+        self.done[symbol] = bar[0]
+        self._emit(symbol, "1m", bar)
+        start, o, h, l, c, v = bar
+        for iv, size in self.intervals:
+            b = self._bucket(symbol, start, size)
+            if b is None: continue
+            key = (symbol, iv)
+            cur = self.agg.get(key)
+            if cur is not None and cur[0] != b[0]:
+                self._emit(symbol, iv, cur)  # a minute went missing at the boundary; close what we have
+                cur = None
+            if cur is None: cur = self.agg[key] = [b[0], o, h, l, c, v]
+            else:
+                cur[2], cur[3], cur[4], cur[5] = max(cur[2], h), min(cur[3], l), c, cur[5] + v
+            if start + 60 >= b[1]:
+                self._emit(symbol, iv, cur)
+                del self.agg[key]
+
+    def on_bar(self, symbol, ts, o, h, l, c, v):
+        """A (possibly still-forming) 1m bar; re-sending the current minute replaces it."""
+        with self.lock:
+            if ts <= self.done.get(symbol, -1) or self._bucket(symbol, ts, 60) is None: return
+            cur = self.m1.get(symbol)
+            if cur is not None:
+                if ts < cur[0]: return
+                if ts > cur[0]: self._fold(symbol, cur)
+            self.m1[symbol] = [ts, o, h, l, c, v]
+
+    def on_tick(self, symbol, ts, price, volume=0, cumulative=True):
+        """One trade/quote; `volume` is the day's running total when `cumulative` (SmartStream QUOTE mode)."""
+        with self.lock:
+            if cumulative:
+                prev = self.cum.get(symbol)
+                self.cum[symbol] = volume
+                volume = max(volume - prev, 0) if prev is not None else 0
+            b = self._bucket(symbol, int(ts), 60)
+            if b is None or b[0] <= self.done.get(symbol, -1): return
+            cur = self.m1.get(symbol)
+            if cur is not None and b[0] < cur[0]: return
+            if cur is None or b[0] > cur[0]:
+                if cur is not None: self._fold(symbol, cur)
+                self.m1[symbol] = [b[0], price, price, price, price, volume]
+            else:
+                cur[2], cur[3], cur[4], cur[5] = max(cur[2], price), min(cur[3], price), price, cur[5] + volume
+
+    def feed_frame(self, symbol, df):
+        """Feed the 1m bars of an OHLCV frame from the current minute onwards."""
+        if df.empty: return
+        ts = df.index.tz_convert('UTC').tz_localize(None).values.astype('datetime64[s]').astype('int64')
+        self._feed(symbol, ts, [df[c].to_numpy(dtype='float64') for c in ('Open', 'High', 'Low', 'Close', 'Volume')])
+
+    def feed_records(self, symbol, rec):
+        """feed_frame for BarStore records, without building a DataFrame."""
+        if len(rec): self._feed(symbol, rec['ts'], [rec[c] for c in ('open', 'high', 'low', 'close', 'volume')])
+
+    def _feed(self, symbol, ts, cols):
+        cur = self.m1.get(symbol)
+        start = int(np.searchsorted(ts, cur[0] if cur is not None else self.done.get(symbol, -1) + 1))
+        for row in zip(ts[start:].tolist(), *(c[start:].tolist() for c in cols)): self.on_bar(symbol, *row)
+
+    def flush(self, now_ts, symbol=None):
+        """Finalize forming 1m bars whose minute has ended (call on a timer so quiet symbols still close)."""
+        with self.lock:
+            for sym in ([symbol] if symbol is not None else list(self.m1)):
+                cur = self.m1.get(sym)
+                if cur is not None and now_ts >= cur[0] + 60:
+                    del self.m1[sym]
+                    self._fold(sym, cur)
+
+    def current(self, symbol, interval="1m"):
+        """The forming bar for `interval`, including the unfinished minute."""
+        m1 = self.m1.get(symbol)
+        if interval == "1m": return tuple(m1) if m1 else None
+        cur = self.agg.get((symbol, interval))
+        if m1 is None: return tuple(cur) if cur else None
+        if cur is None: return (self._bucket(symbol, m1[0], INTERVALS[interval])[0],) + tuple(m1[1:])
+        return (cur[0], cur[1], max(cur[2], m1[2]), min(cur[3], m1[3]), m1[4], cur[5] + m1[5])
@@ -0,0 +1,144 @@
+# --- BAR STORE: append-only, memory-mapped OHLCV files per (symbol, interval) ---
+import os
+import re
+import threading
+import numpy as np
+import pandas as pd
+import marketdata
+import perf
+from instruments import CACHE_DIR
+
+BAR = np.dtype([('ts', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'), ('volume', '<f8')])
+COLS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+def to_records(df):
+    ts = df.index.tz_convert('UTC').tz_localize(None) if df.index.tz is not None else df.index
+    rec = np.empty(len(df), dtype=BAR)
+    rec['ts'] = ts.values.astype('datetime64[s]').astype('int64')
+    for name, col in zip(BAR.names[1:], COLS): rec[name] = df[col].to_numpy(dtype='float64')
+    return rec
+
+def to_frame(rec, tz='Asia/Kolkata'):
+    idx = pd.to_datetime(rec['ts'], unit='s', utc=True).tz_convert(tz)
+    return pd.DataFrame({col: np.array(rec[name]) for name, col in zip(BAR.names[1:], COLS)}, index=idx)
+
+class BarStore:
+    """One flat file of fixed-size BAR records per (code, interval), sorted by ts.
+
+    New bars are appended; a bar whose ts equals the stored last bar replaces it (the still-forming candle),
+    anything older is merged through `compact`.
+    """
+    def __init__(self, root=os.path.join(CACHE_DIR, "bars")):
+        self.root = root
+        self.lock = threading.RLock()
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, code, interval):
+        return os.path.join(self.root, f"{re.sub(r'[^A-Za-z0-9.-]', '_', code)}_{interval}.bin")
+
+    def records(self, code, interval):
+        p = self.path(code, interval)
+        if not os.path.exists(p) or os.path.getsize(p) < BAR.itemsize: return np.empty(0, dtype=BAR)
+        return np.memmap(p, dtype=BAR, mode='r', shape=(os.path.getsize(p) // BAR.itemsize,))
+
+    def tails(self, codes, interval, n):
+        """Last `n` records of every code read straight into one array, plus each code's row count.
+
+        Cheaper than one memmap per file when scanning hundreds of symbols.
+        """
+        sizes = []
+        for c in codes:
+            try: sizes.append(min(n, os.path.getsize(self.path(c, interval)) // BAR.itemsize))
+            except OSError: sizes.append(0)
+        out = np.empty(sum(sizes), dtype=BAR)
+        buf, pos = memoryview(out.view(np.uint8)), 0
+        for c, k in zip(codes, sizes):
+            if not k: continue
+            with open(self.path(c, interval), 'rb') as f:
+                f.seek(-k * BAR.itemsize, os.SEEK_END)
+                f.readinto(buf[pos * BAR.itemsize:(pos + k) * BAR.itemsize])
+            pos += k
+        return out, np.array(sizes)
+
+    def last_ts(self, code, interval):
+        rec = self.records(code, interval)
+        return int(rec['ts'][-1]) if len(rec) else None
+
+    def read(self, code, interval, since=None, last=None):
+        rec = self.records(code, interval)
+        if since is not None: rec = rec[np.searchsorted(rec['ts'], int(pd.Timestamp(since).timestamp())):]
+        if last is not None: rec = rec[-last:]
+        return to_frame(rec)
+
+    def append(self, code, interval, df):
+        """Append bars newer than the stored tail; returns the number of records written."""
+        if df is None or df.empty: return 0
+        new = to_records(df.sort_index())
+        new = new[np.r_[new['ts'][1:] != new['ts'][:-1], True]]  # keep the latest copy of duplicated stamps
+        with self.lock:
+            p = self.path(code, interval)
+            last = self.last_ts(code, interval)
+            if last is not None and new['ts'][0] < last:
+                return self.compact(code, interval, extra=new)
+            with open(p, 'r+b' if last is not None else 'wb') as f:
+                f.seek(0, os.SEEK_END)
+                if last is not None and new['ts'][0] == last: f.seek(-BAR.itemsize, os.SEEK_END)
+                f.write(new.tobytes())
+            return len(new)
+
+    def compact(self, code, interval, extra=None, keep_days=None):
+        """Rewrite the file sorted and de-duplicated (last write wins), optionally merging `extra` and trimming history."""
+        with self.lock:
+            rec = np.array(self.records(code, interval))
+            if extra is not None: rec = np.concatenate([rec, extra])
+            if not len(rec): return 0
+            rec = rec[np.argsort(rec['ts'], kind='stable')]
+            rec = rec[np.r_[rec['ts'][1:] != rec['ts'][:-1], True]]
+            if keep_days: rec = rec[rec['ts'] >= rec['ts'][-1] - keep_days * 86400]
+            p = self.path(code, interval)
+            with open(p + ".tmp", 'wb') as f: f.write(rec.tobytes())
+            os.replace(p + ".tmp", p)
+            return len(rec)
+
+    def gaps(self, code, interval, since=None, intraday=True):
+        """(from_ts, to_ts) pairs where consecutive bars are more than one interval apart.
+
+        With `intraday`, overnight/weekend breaks (bars on different IST dates) are not gaps.
+        """
+        rec = self.records(code, interval)
+        if since is not None: rec = rec[np.searchsorted(rec['ts'], int(pd.Timestamp(since).timestamp())):]
+        ts = np.asarray(rec['ts'])
+        if len(ts) < 2: return []
+        step = marketdata.INTERVAL_MIN.get(interval, 1) * 60
+        jump = np.diff(ts) > step
+        if intraday:
+            day = (ts + 19800) // 86400  # IST calendar day
+            jump &= day[1:] == day[:-1]
+        i = np.flatnonzero(jump)
+        return list(zip(ts[i].tolist(), ts[i + 1].tolist()))
+
+    def sync(self, codes, interval, source=None, period="5d", **fetch_kw):
+        """Fetch only bars at/after each code's stored tail (a full `period` for new codes) and append them."""
+        starts = {}
+        for c in codes:
+            last = self.last_ts(c, interval)
+            starts[c] = None if last is None else pd.Timestamp(last, unit='s', tz='UTC')
+        res = marketdata.fetch_bars(codes, interval, source, period, starts=starts, **fetch_kw)
+        res.gaps = {}
+        for code, df in res.frames.items():
+            start = starts.get(code)
+            if start is not None: df = df[df.index >= start]  # grouped requests start at the group's earliest tail
+            try: self.append(code, interval, df)
+            except Exception as e:
+                perf.error("store_append", e)
+                res.errors[code] = repr(e)
+            if start is not None:
+                gaps = self.gaps(code, interval, since=start)
+                if gaps: res.gaps[code] = gaps
+        return res
+
+    def compact_all(self, keep_days=None):
+        for name in os.listdir(self.root):
+            if not name.endswith(".bin"): continue
+            code, interval = name[:-4].rsplit("_", 1)
+            self.compact(code, interval, keep_days=keep_days)
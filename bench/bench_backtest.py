@@ -0,0 +1,33 @@
+# Backtest throughput: years of synthetic 1m session bars for a five-symbol watchlist, every built-in strategy.
+# Run: python bench/bench_backtest.py [years]
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import backtest
+import barstore
+import strategies
+from engine import WATCHLIST
+from synthetic import session_bars
+
+def main():
+    years = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    store = barstore.BarStore(tempfile.mkdtemp())
+    watch = [dict(x, type="EQUITY" if x['type'] == "CRYPTO" else x['type']) for x in WATCHLIST]  # NSE-hours bars for all
+    for i, x in enumerate(watch):
+        with open(store.path(x['code'], "1m"), 'wb') as f: f.write(session_bars(years, i).tobytes())
+    n = len(store.records(watch[0]['code'], "1m"))
+    print(f"{len(watch)} symbols x {n:,} 1m bars ({years:g} years)")
+    total = 0.0
+    for s in strategies.STRATEGIES:
+        t = time.perf_counter()
+        results, table = backtest.run_watchlist(watch, s.key, store=store)
+        el = time.perf_counter() - t
+        total += el
+        print(f"  {s.key:<11} {s.interval:>3}  {el:6.2f}s  trades {int(table['trades'].sum()):6d}  pnl {table['pnl'].sum():12,.0f}")
+    print(f"all strategies: {total:.2f}s")
+
+if __name__ == "__main__":
+    main()
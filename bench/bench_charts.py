@@ -0,0 +1,48 @@
+# Dashboard charts: LTTB / min-max cost, and one 5-second refresh of a full 1m ring as a rebuilt figure vs the
+# kept figure extended in place, with the JSON the browser receives either way.
+# Run: python bench/bench_charts.py [sessions]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import plotly.graph_objects as go
+import charts
+import indicators
+import ringbuf
+import synthetic
+
+def ms(fn, n=5):
+    best = float("inf")
+    for _ in range(n):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    rec = synthetic.session_bars(days / 250, 1)
+    rows = list(zip(rec['ts'].tolist(), rec['open'].tolist(), rec['high'].tolist(), rec['low'].tolist(),
+                    rec['close'].tolist(), rec['volume'].astype(float).tolist()))
+    x, y = rec['ts'].astype('float64'), rec['close']
+    print(f"{len(y)} points -> {charts.MAX_POINTS}: lttb {ms(lambda: charts.lttb(x, y, charts.MAX_POINTS)):.1f} ms, "
+          f"minmax {ms(lambda: charts.minmax(y, charts.MAX_POINTS)):.2f} ms")
+
+    ring, state = ringbuf.BarRing(ringbuf.CAPACITY["1m"]), indicators.IndicatorState()
+    for r in rows[:-1]: ring.push(r, state.update(*r))
+    chart = charts.BarChart("BENCH", "1m")
+    chart.update(ring.view())
+    ring.push(rows[-1], state.update(*rows[-1]))
+    full = ms(lambda: charts.BarChart("BENCH", "1m").update(ring.view()))
+    inc = ms(lambda: chart.update(ring.view()))
+    print(f"refresh of a {len(ring)}-bar ring: new figure {full:.1f} ms, kept figure extended {inc:.1f} ms "
+          f"({len(chart.fig.data[0].x)} candles)")
+    v = ring.view()
+    raw = go.Figure([go.Candlestick(x=charts._dt(v['ts']), open=v['Open'], high=v['High'], low=v['Low'], close=v['Close'])]
+                    + [go.Scatter(x=charts._dt(v['ts']), y=v[k]) for k in charts.OVERLAYS])
+    print(f"payload: {len(chart.fig.to_json()) / 1024:.0f} KiB downsampled (all traces) vs "
+          f"{len(raw.to_json()) / 1024:.0f} KiB for raw 1m candles and overlays")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+# Fetch-stage timings against the offline StubSource: sequential loop vs thread pool vs multi-ticker batches.
+# Run: python bench/bench_fetch.py
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import marketdata
+
+def sequential(source, codes, interval):
+    t = time.perf_counter()
+    for c in codes: source.fetch(c, interval)
+    return time.perf_counter() - t
+
+def main():
+    source = marketdata.StubSource(latency=0.15, jitter=0.1, per_symbol=0.004)
+    print(f"{'symbols':>8}{'sequential s':>14}{'pool(16) s':>12}{'batch(50)x4 s':>15}")
+    for n in (5, 50, 200):
+        codes = [f"SYM{i}.NS" for i in range(n)]
+        seq = sequential(source, codes, "5m") if n <= 50 else float("nan")
+        pool = marketdata.fetch_bars(codes, "5m", source, workers=16, deadline=30).elapsed
+        batch = marketdata.fetch_bars(codes, "5m", source, workers=4, chunk=50, deadline=30).elapsed
+        print(f"{n:8d}{seq:14.2f}{pool:12.2f}{batch:15.2f}")
+    slow = marketdata.StubSource(latency=0.15, slow={"SYM3.NS"}, slow_latency=10, fail={"SYM7.NS"})
+    res = marketdata.fetch_bars([f"SYM{i}.NS" for i in range(50)], "5m", slow, workers=16, deadline=1.0)
+    print(f"50 symbols, one hung + one failing: {len(res.frames)} frames in {res.elapsed:.2f}s, errors={res.errors}")
+
+if __name__ == "__main__":
+    main()
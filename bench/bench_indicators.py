@@ -0,0 +1,37 @@
+# Streaming IndicatorState vs a full pandas_ta recompute, plus the numerical cross-check.
+# Run: python bench/bench_indicators.py   (the pandas_ta columns are skipped if it is not installed)
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import indicators
+import marketdata
+
+def pandas_ta_pass(df):
+    df = df.copy()
+    df.ta.ema(length=9); df.ta.ema(length=21); df.ta.rsi(length=14); df.ta.vwap()
+    df.ta.supertrend(length=10, multiplier=3); df.ta.macd(fast=12, slow=26, signal=9)
+    df['Volume'].rolling(20).mean()
+
+def main():
+    df = marketdata.StubSource(bars=1875).frame("BENCH.NS", "1m")  # five NSE sessions of 1m bars
+    state = indicators.IndicatorState()
+    state.update_frame(df.iloc[:-1])
+    n = 20000
+    t = time.perf_counter()
+    for i in range(n): state.update(state.ts + 60 * (i % 2), 100.0, 101.0, 99.0, 100.5, 1000.0)
+    print(f"streaming update: {(time.perf_counter() - t) / n * 1e6:.1f} us/bar")
+    try:
+        import pandas_ta  # noqa: F401
+    except ImportError:
+        print("pandas_ta not installed; skipping reference timing and validation")
+        return
+    t = time.perf_counter()
+    for _ in range(10): pandas_ta_pass(df)
+    print(f"pandas_ta full pass over {len(df)} bars: {(time.perf_counter() - t) / 10 * 1e3:.1f} ms")
+    for name, (err, nan_mismatch) in indicators.validate(df).items():
+        print(f"  {name:8} max |diff| {err:.2e}  NaN mismatches {nan_mismatch}")
+
+if __name__ == "__main__":
+    main()
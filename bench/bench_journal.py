@@ -0,0 +1,43 @@
+# Trade journal: cost of Journal.record on the trading path, group-commit throughput, and startup recovery
+# with and without snapshots.
+# Run: python bench/bench_journal.py [events]
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import journal
+
+def fill(j, n):
+    """A trading day's worth of events: opens, exits and order acks over 50 instruments."""
+    lat = []
+    for i in range(n):
+        d = f"SYM{i % 50}"
+        t = time.perf_counter()
+        if i % 3 == 0: j.record("open", {"display": d, "entry": 100.0 + i % 7, "qty": 50, "type": "REAL", "token": str(i % 50), "exch": "NSE", "ltp": 100.0})
+        elif i % 3 == 1: j.record("ack", {"display": d, "tag": f"mb{i:013d}", "orderid": str(i), "status": "ACK", "latency_ms": 42.0, "error": None})
+        else: j.record("close", {"display": d, "pnl": 12.5, "ltp": 101.0, "type": "EXIT"})
+        lat.append(time.perf_counter() - t)
+    return np.array(lat) * 1e6
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for snap_every in (500, 10 ** 9):
+        path = os.path.join(tempfile.mkdtemp(), "journal.db")
+        j = journal.Journal(path, snap_every=snap_every).start()
+        t = time.perf_counter()
+        lat = fill(j, n)
+        t1 = time.perf_counter()
+        j.stop()
+        t2 = time.perf_counter()
+        label = f"snapshot every {snap_every}" if snap_every < n else "no snapshots"
+        print(f"{label:<20}: record p50 {np.percentile(lat, 50):5.1f} us  p99 {np.percentile(lat, 99):6.1f} us;"
+              f" {n / (t2 - t):8.0f} events/s committed ({(t2 - t1) * 1000:.0f} ms to drain)")
+        r = journal.Journal(path)
+        state = r.recover()
+        print(f"{'':<20}  recovery {r.recovery_ms:7.1f} ms -> {len(state['positions'])} open positions, seq {r.seq}")
+
+if __name__ == "__main__":
+    main()
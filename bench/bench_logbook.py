@@ -0,0 +1,51 @@
+# Logging cost on the trading path: list insert(0)/pop with a per-call pytz lookup vs. LogBook.append,
+# plus writer throughput and paging deep into the on-disk history.
+# Run: python bench/bench_logbook.py [records]
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytz
+import logbook
+
+def legacy(n, cap):
+    logs = []
+    for i in range(n):
+        logs.insert(0, f"[{datetime.now(pytz.timezone('Asia/Kolkata')).strftime('%H:%M:%S')}] [INFO] Entry: SYM{i % 50}")
+        if len(logs) > cap: logs.pop()
+    return logs
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    t = time.perf_counter()
+    legacy(n, 100)
+    t1 = time.perf_counter()
+    legacy(n // 10, 10000)
+    t2 = time.perf_counter()
+    print(f"legacy list, 100 lines   : {(t1 - t) / n * 1e6:6.2f} us/log")
+    print(f"legacy list, 10000 lines : {(t2 - t1) / (n // 10) * 1e6:6.2f} us/log")
+
+    book = logbook.LogBook(capacity=10000, root=tempfile.mkdtemp(), max_bytes=4 << 20, keep=1000).start()
+    t = time.perf_counter()
+    for i in range(n): book.append("INFO", f"Entry: SYM{i % 50}", f"SYM{i % 50}", "entry", 0.5)
+    t1 = time.perf_counter()
+    book.stop()
+    t2 = time.perf_counter()
+    files = os.listdir(book.root)
+    size = sum(os.path.getsize(os.path.join(book.root, f)) for f in files)
+    print(f"LogBook.append, 10000 ring: {(t1 - t) / n * 1e6:6.2f} us/log  (writer drained the rest in {(t2 - t1) * 1000:.0f} ms;"
+          f" {size / 2**20:.1f} MiB in {len(files)} files)")
+    for page in (0, 50, n // 100 - 1):
+        t = time.perf_counter()
+        recs, more = book.query(page, 100)
+        t1 = time.perf_counter()
+        print(f"page {page:>5}: seq {recs[0]['seq']}..{recs[-1]['seq']} in {(t1 - t) * 1000:7.1f} ms")
+    t = time.perf_counter()
+    recs, _ = book.query(0, 100, symbol="SYM7", text="entry")
+    print(f"filtered page (symbol+text): {len(recs)} records in {(time.perf_counter() - t) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
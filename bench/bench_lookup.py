@@ -0,0 +1,52 @@
+# Microbenchmark: legacy DataFrame-scan get_angel_token vs InstrumentIndex, on a synthetic master.
+# Run: python bench/bench_lookup.py
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import instruments
+import synthetic
+
+def legacy_get_angel_token(df, symbol, strike=None, opt_type=None, type_="EQUITY"):
+    # Verbatim port of the pre-index implementation (string-typed master columns).
+    if type_ == "MCX":
+        res = df[(df['name'] == symbol) & (df['instrumenttype'] == 'FUTCOM')]
+        if not res.empty: return res.sort_values('expiry').iloc[0]['token'], res.iloc[0]['symbol'], "MCX"
+    elif type_ == "INDEX" and strike:
+        s_str = str(int(strike))
+        name = "NIFTY" if "NIFTY" in symbol else "BANKNIFTY"
+        res = df[(df['name'] == name) & (df['symbol'].str.endswith(opt_type)) & (df['symbol'].str.contains(s_str))]
+        if not res.empty: return res.sort_values('expiry').iloc[0]['token'], res.iloc[0]['symbol'], "NFO"
+    elif type_ == "EQUITY":
+        res = df[(df['name'] == symbol) & (df['exch_seg'] == 'NSE') & (df['symbol'].str.endswith('-EQ'))]
+        if not res.empty: return res.iloc[0]['token'], res.iloc[0]['symbol'], "NSE"
+    return None, None, "NSE"
+
+def timeit(fn, n):
+    t = time.perf_counter()
+    for _ in range(n): fn()
+    return (time.perf_counter() - t) / n * 1e6
+
+def main():
+    import pandas as pd
+    recs = synthetic.master()
+    raw = pd.DataFrame(recs)
+    t = time.perf_counter()
+    idx = instruments.InstrumentIndex(instruments.compact(recs))
+    print(f"rows={len(raw)}  index build {time.perf_counter() - t:.2f}s")
+    today = date(2026, 1, 1)
+    cases = [("EQUITY", lambda: legacy_get_angel_token(raw, "STK1234"), lambda: idx.equity("STK1234")),
+             ("MCX", lambda: legacy_get_angel_token(raw, "CRUDEOIL", type_="MCX"), lambda: idx.future("CRUDEOIL", today=today)),
+             ("INDEX", lambda: legacy_get_angel_token(raw, "NIFTY 50", 24000, "CE", "INDEX"),
+              lambda: idx.option("NIFTY", 24000, "CE", today=today))]
+    print(f"{'type':8}{'legacy us':>12}{'index us':>12}{'speedup':>10}")
+    for name, old, new in cases:
+        a, b = timeit(old, 20), timeit(new, 20000)
+        print(f"{name:8}{a:12.1f}{b:12.2f}{a / b:10.0f}x")
+    print("legacy BANKNIFTY 52000 CE ->", legacy_get_angel_token(raw, "BANKNIFTY", 52000, "CE", "INDEX")[1])
+    print("index  BANKNIFTY 52000 CE ->", idx.option("BANKNIFTY", 52000, "CE", today=today)[1])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# Sweep throughput: combos/s for 1..N worker processes over memory-mapped synthetic bars, plus a walk-forward run.
+# Run: python bench/bench_optimize.py [years] [combos]
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import barstore
+import optimize
+from synthetic import session_bars
+
+def main():
+    years = float(sys.argv[1]) if len(sys.argv) > 1 else 1
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 48
+    store = barstore.BarStore(tempfile.mkdtemp())
+    watch = [{"symbol": f"S{i}", "code": f"S{i}.NS", "type": "EQUITY"} for i in range(4)]
+    for i, x in enumerate(watch):
+        with open(store.path(x['code'], "1m"), 'wb') as f: f.write(session_bars(years, i).tobytes())
+    space = {"ema_fast": (5, 15), "ema_slow": (20, 60), "target_pct": (0.5, 3.0), "sl_pct": (0.3, 1.5)}
+    combos = optimize.sample(space, n, seed=1)
+    cores = os.cpu_count() or 1
+    base = None
+    for w in sorted({1, 2, cores} if cores > 1 else {1}):
+        t = time.perf_counter()
+        res = optimize.optimize(watch, "Golden", combos=combos, workers=w, store=store)
+        el = time.perf_counter() - t
+        base = base or el
+        print(f"workers {w:2d}: {n} combos x {len(watch)} symbols in {el:.2f}s ({n / el:.1f} combos/s, speedup {base / el:.2f}x)")
+    print(res.table.head(3).to_string())
+    res = optimize.optimize(watch, "Golden", combos=combos, folds=3, workers=cores, store=store)
+    print(res.walk[["fold", "ema_fast", "ema_slow", "target_pct", "sl_pct", "train_sharpe", "test_sharpe", "test_pnl"]].to_string())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# Option pricing: accuracy of the numpy normal CDF and Black-Scholes against textbook values, and the cost of
+# pricing / Greeks / implied vol for a full strike band, vectorized vs one contract at a time.
+# Run: python bench/bench_options.py [strikes]
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import options
+
+def per_call(fn, n):
+    t = time.perf_counter()
+    for _ in range(n): fn()
+    return (time.perf_counter() - t) / n * 1e3
+
+def main():
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 121
+    x = np.linspace(-8, 8, 100001)
+    ref = np.array([0.5 * (1 + math.erf(v / math.sqrt(2))) for v in x])
+    print(f"norm_cdf max |error| vs erf: {np.abs(options.norm_cdf(x) - ref).max():.1e}")
+    c, p = options.price(100, 100, 1, 0.2, rate=0.05), options.price(100, 100, 1, 0.2, call=False, rate=0.05)
+    print(f"BS(100, 100, 1y, 20%, r=5%): call {float(c):.4f} (10.4506)  put {float(p):.4f} (5.5735)")
+
+    # k strikes x 2 sides x 2 expiries around a NIFTY-like spot: the ladder an INDEX row carries, and more.
+    spot = 24000.0
+    strike = np.tile(np.repeat(spot + 50 * np.arange(-(k // 2), k - k // 2), 2), 2)
+    call = np.tile([True, False], k * 2)
+    t = np.repeat([3 / 365, 10 / 365], 2 * k)
+    vol = 0.12 + 0.02 * ((strike - spot) / (50 * k)) ** 2
+    prem = options.price(spot, strike, t, vol, call)
+    n = len(strike)
+    g = per_call(lambda: options.greeks(spot, strike, t, vol, call), 200)
+    iv = per_call(lambda: options.implied_vol(prem, spot, strike, t, call), 20)
+    disc = strike * np.exp(-options.RATE * t)
+    ok = prem - np.maximum(np.where(call, spot - disc, disc - spot), 0) > 0.5  # deep ITM/OTM: vol is pinned only to the tick
+    err = np.abs(options.implied_vol(prem, spot, strike, t, call) - vol)[ok].max()
+    scalar = per_call(lambda: [options.greeks(spot, s, tt, v, c) for s, tt, v, c in zip(strike, t, vol, call)], 1)
+    print(f"{n} contracts: greeks {g:.2f} ms vectorized vs {scalar:.1f} ms one at a time ({scalar / g:.0f}x)")
+    print(f"{n} contracts: implied vol {iv:.2f} ms, max |error| {err:.1e} where time value > 0.5 ({ok.sum()} contracts)")
+
+if __name__ == "__main__":
+    main()
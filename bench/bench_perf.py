@@ -0,0 +1,45 @@
+# Instrumentation overhead: a timed block with perf enabled vs. disabled vs. no timer at all, histogram
+# quantile error against exact percentiles, and the size of the Prometheus export.
+# Run: python bench/bench_perf.py [iterations]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import perf
+
+def loop(n, timed):
+    x = 0
+    t = time.perf_counter()
+    if timed:
+        for i in range(n):
+            with perf.timer("bench"): x += i
+    else:
+        for i in range(n): x += i
+    return (time.perf_counter() - t) / n * 1e9
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    bare = loop(n, False)
+    perf.ENABLED = True
+    on = loop(n, True)
+    perf.ENABLED = False
+    off = loop(n, True)
+    perf.ENABLED = True
+    print(f"bare loop {bare:6.0f} ns/iter   timer on +{on - bare:5.0f} ns   timer off (MISHR_PERF=0) +{off - bare:5.0f} ns")
+
+    rng = random.Random(0)
+    vals = [int(rng.lognormvariate(13, 1.2)) for _ in range(200_000)]
+    h = perf.Histogram()
+    for v in vals: h.record(v)
+    for q in (0.5, 0.9, 0.99, 0.999):
+        exact = np.quantile(vals, q)
+        print(f"p{q * 100:g}: histogram {h.quantile(q) / 1e6:8.3f} ms  exact {exact / 1e6:8.3f} ms  ({(h.quantile(q) / exact - 1) * 100:+.1f}%)")
+    for v in vals[:10000]: perf.observe("fetch", v / 1e9)
+    text = perf.prometheus()
+    print(f"Prometheus export: {len(text.splitlines())} lines, {len(text) / 1024:.1f} KiB")
+
+if __name__ == "__main__":
+    main()
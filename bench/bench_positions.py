@@ -0,0 +1,45 @@
+# Exit checks: the old list-of-dicts scan per pass vs PositionBook's per-instrument trigger lookup on each tick.
+# Run: python bench/bench_positions.py
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import positions
+
+def legacy_pass(pos, data_list, sl_pct=1.0, target_pct=2.0):
+    out = []
+    for p in pos[:]:
+        curr = p['entry']
+        match = next((x for x in data_list if x['display'] == p['display']), None)
+        if match: curr = match['price']
+        p['pnl'] = (curr - p['entry']) * p['qty']
+        pct = ((curr - p['entry']) / p['entry']) * 100
+        if pct <= -sl_pct or pct >= target_pct: out.append(p)
+    return out
+
+def main():
+    rng = np.random.default_rng(3)
+    for n in (10, 100, 1000):
+        entry = 100 + rng.random(n) * 50
+        names = [f"SYM{i}" for i in range(n)]
+        pos = [{"display": s, "entry": e, "qty": 10, "pnl": 0.0} for s, e in zip(names, entry)]
+        rows = [{"display": s, "price": e * 1.001} for s, e in zip(names, entry)]
+        book = positions.PositionBook()
+        for s, e in zip(names, entry): book.open(s, e, 10, token=s)
+        k = max(1, 20000 // n)
+        t = time.perf_counter()
+        for _ in range(k): legacy_pass(pos, rows)
+        legacy = (time.perf_counter() - t) / k
+        ticks = [(names[i], entry[i] * (1 + rng.normal(0, 0.002))) for i in rng.integers(0, n, 20000)]
+        t = time.perf_counter()
+        for tok, px in ticks: book.mark_token(tok, px)
+        per_tick = (time.perf_counter() - t) / len(ticks)
+        t = time.perf_counter()
+        for _ in range(1000): book.unrealized()
+        mtm = (time.perf_counter() - t) / 1000
+        print(f"{n:5d} positions: legacy pass {legacy * 1e6:9.1f} us | book tick {per_tick * 1e6:.2f} us | vector MTM {mtm * 1e6:.1f} us")
+
+if __name__ == "__main__":
+    main()
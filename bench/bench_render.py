@@ -0,0 +1,120 @@
+# Page refresh cost: one full-script rerun (the old 5 s st.rerun() loop) vs. rerunning only the live fragments.
+# Server CPU and websocket payload per refresh, for a refresh where nothing changed and one where every price moved.
+# Run: python bench/bench_render.py [watchlist size] [refreshes]
+import os
+import sys
+import tempfile
+import time
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from streamlit.runtime import forward_msg_cache
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+from streamlit.testing.v1 import AppTest, local_script_runner
+import barstore
+import engine
+import instruments
+import journal
+import logbook
+import perf
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+class BenchEngine(engine.TradingEngine):
+    """No threads, no network, no journal: the bench writes rows and logs directly."""
+    live = None
+    def __init__(self, instr=None, journal=None):
+        super().__init__(instr, store=barstore.BarStore(tempfile.mkdtemp()), logs=logbook.LogBook(root=tempfile.mkdtemp()))
+        BenchEngine.live = self
+    def start(self): return self
+
+class Wire:
+    """Websocket bytes for the captured messages; a large element the browser already holds goes as a hash ref."""
+    def __init__(self):
+        self.seen, self.msgs = set(), []
+
+    def capture(self, parse):
+        def wrapped(msgs):
+            self.msgs = list(msgs)
+            return parse(msgs)
+        return wrapped
+
+    def size(self):
+        n = 0
+        for m in self.msgs:
+            forward_msg_cache.populate_hash_if_needed(m)
+            if m.metadata.cacheable and m.hash in self.seen: n += len(forward_msg_cache.create_reference_msg(m).SerializeToString())
+            else: n += m.ByteSize()
+            if m.metadata.cacheable: self.seen.add(m.hash)
+        return n
+
+    def fragments(self, every):
+        return [m.auto_rerun.fragment_id for m in self.msgs
+                if m.WhichOneof("type") == "auto_rerun" and m.auto_rerun.interval <= every]
+
+def rows(n, tick):
+    return [{"display": f"SYM{i}", "price": 1000.0 + i + tick * 0.05, "sig": ("BUY", "SELL", "WAIT")[(i + tick) % 3],
+             "type": "EQUITY", "change": 0.1 * tick, "exch": "NSE", "token": str(1000 + i),
+             "sigs": {k: ("BUY", "WAIT")[(i + tick) % 2] for k in ("Sniper", "Momentum", "Supertrend", "Golden", "VWAP", "Volume")}}
+            for i in range(n)]
+
+def refresh(at, wire, fragment_ids=None):
+    """One rerun of the page (or of the given fragments); returns (cpu seconds, payload bytes)."""
+    make = local_script_runner.RerunData
+    if fragment_ids: local_script_runner.RerunData = partial(RerunData, fragment_id_queue=fragment_ids)
+    try:
+        t = time.process_time()
+        at.run()
+        return time.process_time() - t, wire.size()
+    finally:
+        local_script_runner.RerunData = make
+
+def keep_bytecode():
+    """The server compiles the script once; AppTest recompiles it on every run, which would swamp the numbers."""
+    code, compile_ = {}, ScriptCache.get_bytecode
+    ScriptCache.get_bytecode = lambda self, path: code[path] if path in code else code.setdefault(path, compile_(self, path))
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    engine.TradingEngine = BenchEngine
+    instruments.load_snapshot = lambda *a, **kw: None  # no instrument master: the universe scan stays empty
+    journal.Journal = lambda *a, **kw: None  # leave the live trade journal alone
+    perf.serve = lambda *a, **kw: None
+    keep_bytecode()
+    wire = Wire()
+    local_script_runner.parse_tree_from_messages = wire.capture(local_script_runner.parse_tree_from_messages)
+    at = AppTest.from_file(APP, default_timeout=30)
+    at.session_state.auth = True
+    at.run()
+    eng = BenchEngine.live
+    with eng.lock:
+        eng.rows = rows(n, 0)
+        for i in range(100): eng.log(f"bench line {i}")
+        eng.version += 1
+        eng.hub.publish(eng.version)
+    refresh(at, wire)
+    live = wire.fragments(every=5)  # the universe scan polls every 60 s, not every refresh
+    for name, ids in (("full rerun", None), ("fragments", live)):
+        for case in ("unchanged", "prices moved"):
+            cpu = size = 0
+            for t in range(k):
+                if case != "unchanged":
+                    with eng.lock:
+                        eng.rows = rows(n, t + 1)
+                        eng.log(f"tick {t}")
+                        eng.version += 1
+                        eng.hub.publish(eng.version)
+                c, s = refresh(at, wire, ids)
+                cpu, size = cpu + c, size + s
+            print(f"{name:<10} {case:<12}: {cpu / k * 1000:6.1f} ms CPU  {size / k / 1024:6.1f} KiB per refresh")
+    floor = AppTest.from_string("")
+    floor.run()
+    t = time.process_time()
+    for _ in range(k): floor.run()
+    print(f"(AppTest harness floor per run: {(time.process_time() - t) / k * 1000:.1f} ms CPU)")
+    if at.exception: print(at.exception)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Per-symbol bar history: a five-day 1m DataFrame grown with indicator columns (the old per-scan frame) vs the
+# fixed ring buffers, on memory held, bytes allocated per scan, and push/view cost.
+# Run: python bench/bench_ringbuf.py [symbols]
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import indicators
+import marketdata
+import ringbuf
+
+def frame_scan(df):
+    """What a scan used to hold per symbol: the fetched frame plus every indicator as a float64 column."""
+    ind = indicators.series(df)
+    return df.join(ind[list(ringbuf.INDICATORS)])
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    df = marketdata.StubSource(bars=1875).frame("BENCH.NS", "1m")
+    full = frame_scan(df)
+    old = full.memory_usage(deep=True).sum()
+    print(f"per symbol: DataFrame {old / 1024:.0f} KiB (1m only)   rings {ringbuf.ceiling() / 1024:.0f} KiB ceiling "
+          f"(1m {2 * ringbuf.CAPACITY['1m'] * ringbuf.ROW_BYTES / 1024:.0f} KiB, all of {', '.join(ringbuf.CAPACITY)})")
+    print(f"{n} symbols: DataFrames {old * n / 2 ** 20:.1f} MiB per scan, rebuilt every scan;"
+          f" rings {ringbuf.ceiling() * n / 2 ** 20:.1f} MiB allocated once")
+
+    state = indicators.IndicatorState()
+    rows = list(zip(df.index.as_unit('s').asi8.tolist(), *(df[c].tolist() for c in ringbuf.PRICES)))
+    ring = ringbuf.BarRing(ringbuf.CAPACITY["1m"])
+    for r in rows: ring.push(r, state.update(*r))
+    tracemalloc.start()
+    frame_scan(df.iloc[-375:])
+    _, peak_df = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    v = ring.view(375)
+    v["Close"].mean()
+    _, peak_ring = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"one session's window: DataFrame path peaks at {peak_df / 1024:.0f} KiB allocated, ring view {peak_ring / 1024:.1f} KiB")
+
+    k = 20000
+    out = state.out
+    t = time.perf_counter()
+    for i in range(k): ring.push((rows[-1][0] + 60 * (i + 1),) + rows[-1][1:], out)
+    push = (time.perf_counter() - t) / k * 1e6
+    t = time.perf_counter()
+    for _ in range(k): ring.view(375)
+    view = (time.perf_counter() - t) / k * 1e6
+    print(f"push {push:.1f} us/bar   view(375) {view:.1f} us (no copy: {ring.view(375)['Close'].base is ring.prices})")
+
+if __name__ == "__main__":
+    main()
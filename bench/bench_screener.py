@@ -0,0 +1,31 @@
+# Universe scan: 500 symbols of local 1m bars -> panel -> every strategy's top-N BUY/SELL.
+# Run: python bench/bench_screener.py [symbols]
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import barstore
+import screener
+import strategies
+from synthetic import session_bars
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    store = barstore.BarStore(tempfile.mkdtemp())
+    codes = [f"SYM{i}.NS" for i in range(n)]
+    for i, c in enumerate(codes):
+        with open(store.path(c, "1m"), 'wb') as f: f.write(session_bars(0.1, i).tobytes())
+    for s in strategies.STRATEGIES:
+        screener.scan(codes, s.key, store=store)  # warm the page cache
+        t = time.perf_counter()
+        buy, sell = screener.scan(codes, s.key, store=store)
+        t1 = time.perf_counter()
+        screener.panel(codes, s.interval, store=store)
+        t2 = time.perf_counter()
+        print(f"{s.key:<11} {s.interval:>3}: {n} symbols in {(t1 - t) * 1000:4.0f} ms (panel {(t2 - t1) * 1000:3.0f} ms)"
+              f"  top BUY {buy['code'].iloc[0] if len(buy) else '-'}  top SELL {sell['code'].iloc[0] if len(sell) else '-'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# Tick ingestion through the local ReplayServer: wire-to-table lag and throughput, plus a forced reconnect.
+# Run: python bench/bench_ticks.py
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ticks
+
+def main():
+    n_tokens, n = 50, 20000
+    tape = [(i * 0.0005, "NSE", str(1000 + i % n_tokens), 100 + (i % 97) * 0.05, i) for i in range(n)]
+    srv = ticks.ReplayServer(tape, speed=1.0).start()
+    lags = []
+    stream = ticks.TickStream(url=srv.url, on_tick=lambda tok, t: lags.append(t.recv * 1000 - t.ts))
+    stream.set_tokens([("NSE", str(1000 + i)) for i in range(n_tokens)])
+    t0 = time.perf_counter()
+    stream.start()
+    while len(lags) < n and time.perf_counter() - t0 < 60: time.sleep(0.05)
+    el = time.perf_counter() - t0
+    lags.sort()
+    print(f"{len(lags)} ticks for {n_tokens} tokens in {el:.2f}s ({len(lags) / el:,.0f}/s)")
+    print(f"wire->table lag ms: p50 {lags[len(lags) // 2]:.2f}  p99 {lags[int(len(lags) * 0.99)]:.2f}")
+    t = time.perf_counter()
+    for _ in range(100000): stream.table.ltp("1001")
+    print(f"table read: {(time.perf_counter() - t) / 100000 * 1e9:.0f} ns")
+    stream.ws.sock.sock.shutdown(socket.SHUT_RDWR)  # a dropped link; close() from this thread can leave run_forever blocked
+    t = time.perf_counter()
+    while not (stream.reconnects and stream.connected) and time.perf_counter() - t < 10: time.sleep(0.01)
+    print(f"reconnected+resubscribed after {time.perf_counter() - t:.2f}s (reconnects={stream.reconnects})")
+    stream.stop()
+    srv.shutdown()
+
+if __name__ == "__main__":
+    main()
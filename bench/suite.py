@@ -0,0 +1,194 @@
+# Offline benchmark suite for the hot paths, on synthetic bars, a synthetic scrip master and stub providers
+# (StubSource for yfinance, MockBroker for SmartConnect). No network. Results are written as JSON so two
+# versions can be compared:
+#   signals   per-strategy indicator update + signal rule, per bar (the old calculate_signals)
+#   lookup    engine.get_angel_token per instrument type over a full-size InstrumentIndex
+#   scan      one engine pass (bar sync -> indicators -> signals -> contract resolution) per watchlist size
+#   tick      tick arrival -> entry decision -> order submitted -> broker ack, through the threaded engine
+# Run: python bench/suite.py [--quick] [--out results.json] [--compare old.json] [--tolerance 0.1]
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pandas as pd
+import barstore
+import clock
+import engine
+import indicators
+import instruments
+import logbook
+import marketdata
+import orders
+import perf
+import strategies
+import synthetic
+import ticks
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NOW = pd.Timestamp("2026-01-02 15:30", tz="Asia/Kolkata").timestamp()  # just after StubSource's last bar
+
+def per_call(fn, n, repeat=3):
+    """Microseconds per call, best of `repeat` runs (the minimum is the least noisy on a shared box)."""
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for _ in range(n): fn()
+        best = min(best, time.perf_counter() - t)
+    return best / n * 1e6
+
+def bench_signals(n_bars):
+    rec = synthetic.session_bars(n_bars / 250 / 375 + 0.01, 3)[-n_bars:]
+    rows = list(zip(rec['ts'].tolist(), rec['open'].tolist(), rec['high'].tolist(), rec['low'].tolist(),
+                    rec['close'].tolist(), rec['volume'].astype(float).tolist()))
+    out = {}
+    def one(s):
+        state = indicators.IndicatorState()
+        for r in rows: s.signal(state.update(*r))
+    def every():
+        states = {i: indicators.IndicatorState() for i in strategies.intervals()}
+        for r in rows:
+            for st in states.values(): st.update(*r)
+            strategies.evaluate(states)
+    out = {f"signals.{s.key}.us_per_bar": per_call(lambda: one(s), 1) / len(rows) for s in strategies.STRATEGIES}
+    out["signals.all.us_per_bar"] = per_call(every, 1) / len(rows)
+    return out
+
+def bench_lookup(idx, n):
+    eng = engine.TradingEngine(instr=idx, store=barstore.BarStore(tempfile.mkdtemp()), logs=logbook.LogBook(root=tempfile.mkdtemp()))
+    cases = {"EQUITY": ("STK1234",), "MCX": ("CRUDEOIL", None, None, "MCX"), "INDEX": ("NIFTY 50", 24000, "CE", "INDEX")}
+    out = {}
+    for name, args in cases.items():
+        if eng.get_angel_token(*args)[0] is None: raise RuntimeError(f"synthetic master has no {name} contract for {args}")
+        out[f"lookup.{name}.us"] = per_call(lambda: eng.get_angel_token(*args), n)
+    return out
+
+def watchlist(n):
+    """The two index rows and crude, then synthetic equities up to n symbols."""
+    head = [dict(x) for x in engine.WATCHLIST if x['type'] in ("INDEX", "MCX")]
+    return (head + [{"type": "EQUITY", "symbol": f"STK{i:04d}", "code": f"STK{i:04d}.NS", "step": 1} for i in range(n)])[:n]
+
+def bench_scan(idx, sizes, warm):
+    out = {}
+    for n in sizes:
+        eng = engine.TradingEngine(instr=idx, store=barstore.BarStore(tempfile.mkdtemp()), logs=logbook.LogBook(root=tempfile.mkdtemp()),
+                                   source=marketdata.StubSource(latency=0.0, per_symbol=0.0))
+        eng.watchlist = watchlist(n)
+        t = time.perf_counter()
+        rows = eng.step(NOW)
+        out[f"scan.{n}.cold_ms"] = (time.perf_counter() - t) * 1000
+        if len(rows) != n: raise RuntimeError(f"scan of {n} symbols produced {len(rows)} rows")
+        perf.REGISTRY.hists.clear()
+        t = time.perf_counter()
+        for i in range(warm): eng.step(NOW + (i + 1) * eng.scan_every)
+        out[f"scan.{n}.warm_ms"] = (time.perf_counter() - t) / warm * 1000
+        for s in perf.stats()['stages']:
+            if s['stage'] in ("sync", "feed", "signals", "resolve"): out[f"scan.{n}.{s['stage']}_ms"] = s['mean_ms']
+    return out
+
+class TickEngine(engine.TradingEngine):
+    """Every row is a BUY, so each tick on a flat book is an entry."""
+    def _resolve(self):
+        return [dict(d, sig="BUY") for d in super()._resolve()]
+
+def bench_tick(idx, rounds):
+    clock.check_market_time = lambda *a, **k: True  # the bench runs at any hour
+    eng = TickEngine(instr=idx, store=barstore.BarStore(tempfile.mkdtemp()), logs=logbook.LogBook(root=tempfile.mkdtemp()),
+                     source=marketdata.StubSource(latency=0.0, per_symbol=0.0), scan_every=3600)
+    eng.watchlist = watchlist(4)[3:]  # one equity: one order per tick
+    eng.configure(real_trade_active=True)
+    eng.orders = orders.OrderGateway(orders.MockBroker(latency=0.0, jitter=0.0))
+    submitted, acked = {}, {}
+    submit, filled = eng.orders.submit, eng._filled
+    def on_submit(params, on_done=None):
+        submitted.setdefault(len(acked), time.time())
+        return submit(params, on_done)
+    def on_filled(order, d, qty):
+        filled(order, d, qty)
+        acked[len(acked)] = time.time()
+    eng.orders.submit, eng._filled = on_submit, on_filled
+    eng.step(NOW)  # bars and rows from the synthetic session; the threaded loop then runs on wall time
+    token = eng.base[0]['token']
+    eng.start()
+    t = time.perf_counter()
+    eng.start_bot()
+    while len(acked) < 1 and time.perf_counter() - t < 30: time.sleep(0.001)
+    submitted.clear()
+    acked.clear()
+    tape = synthetic.tape([token], rounds)
+    sent = []
+    for i, (_, _, tok, ltp, vol) in enumerate(tape):
+        with eng.lock:  # flatten and tick together so the entry can only come from this tick
+            for slot in list(eng.book.slots.values()): eng._close(slot)
+            sent.append(time.time())
+            eng._on_tick(tok, ticks.Tick(ltp, vol, int(sent[-1] * 1000), sent[-1]))
+        while len(acked) <= i and time.perf_counter() - t < 60: time.sleep(0.0002)
+        time.sleep(0.1)  # stay inside the gateway's 10 orders/s so pacing is not measured
+    eng.stop()
+    n = min(len(sent), len(submitted), len(acked))
+    decide = np.array([submitted[i] - sent[i] for i in range(n)]) * 1000
+    ack = np.array([acked[i] - sent[i] for i in range(n)]) * 1000
+    out = {}
+    for name, v in (("decision", decide), ("ack", ack)):
+        out[f"tick.{name}.p50_ms"], out[f"tick.{name}.p99_ms"] = (float(x) for x in np.percentile(v, [50, 99]))
+    return out
+
+def meta():
+    try: rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError: rev = ""
+    return {"rev": rev, "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "platform": platform.platform(), "cpus": os.cpu_count()}
+
+def compare(old, new, tolerance):
+    """Print old vs new for every shared metric (all are times: lower is better); returns the regressions."""
+    print(f"\ncompared with {old['meta'].get('rev') or '?'} ({old['meta'].get('time')})")
+    print(f"{'metric':<28}{'old':>11}{'new':>11}{'change':>9}")
+    worse = []
+    for k, v in new['results'].items():
+        if k not in old['results']: continue
+        a = old['results'][k]
+        change = v / a - 1 if a else 0.0
+        flag = " <-" if change > tolerance else ""
+        if flag: worse.append(k)
+        print(f"{k:<28}{a:11.3f}{v:11.3f}{change * 100:+8.1f}%{flag}")
+    print(f"{len(worse)} metrics slower by more than {tolerance:.0%}")
+    return worse
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--quick", action="store_true", help="fewer iterations and watchlist sizes")
+    ap.add_argument("--out", help="results file (default .cache/bench/<time>-<rev>.json)")
+    ap.add_argument("--compare", help="earlier results file to diff against")
+    ap.add_argument("--tolerance", type=float, default=0.10, help="slowdown that counts as a regression")
+    a = ap.parse_args()
+    res = {}
+    t = time.perf_counter()
+    recs = synthetic.master(start=date.today())
+    idx = instruments.InstrumentIndex(instruments.compact(recs))
+    res["index.build_ms"] = (time.perf_counter() - t) * 1000
+    print(f"synthetic master: {len(recs):,} rows, index built in {res['index.build_ms']:.0f} ms")
+    for name, fn in (("signals", lambda: bench_signals(2000 if a.quick else 20000)),
+                     ("lookup", lambda: bench_lookup(idx, 2000 if a.quick else 20000)),
+                     ("scan", lambda: bench_scan(idx, (5, 50) if a.quick else (5, 50, 200), 3 if a.quick else 10)),
+                     ("tick", lambda: bench_tick(idx, 20 if a.quick else 100))):
+        part = fn()
+        res.update(part)
+        for k, v in part.items(): print(f"  {k:<28}{v:10.3f}")
+    doc = {"meta": meta(), "results": res}
+    out = a.out or os.path.join(instruments.CACHE_DIR, "bench", f"{time.strftime('%Y%m%d-%H%M%S')}-{doc['meta']['rev'] or 'tree'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w') as f: json.dump(doc, f, indent=1)
+    print(f"wrote {out}")
+    if a.compare:
+        with open(a.compare) as f: old = json.load(f)
+        if compare(old, doc, a.tolerance): sys.exit(1)
+
+if __name__ == "__main__":
+    main()
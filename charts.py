@@ -0,0 +1,173 @@
+# --- CHARTS: plotly candles, indicator overlays, trade markers and the P&L curve, downsampled and extended in place ---
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import clock
+import marketdata
+import ringbuf
+
+MAX_POINTS = 600  # per trace: about one per pixel of a dashboard-width chart, however long the history
+OVERLAYS = {"EMA9": "#ffd54f", "EMA21": "#4fc3f7", "VWAP": "#ce93d8"}
+ORIGIN = 9 * 3600 + 15 * 60 - clock.IST_OFFSET  # 09:15 IST in UTC seconds: candle buckets start with the NSE session
+LAYOUT = dict(template="plotly_dark", paper_bgcolor="#000", plot_bgcolor="#000", height=460, hovermode="x unified",
+              margin=dict(l=10, r=10, t=30, b=10), legend=dict(orientation="h", y=1.02, x=0), xaxis_rangeslider_visible=False)
+
+def _dt(ts):
+    """Epoch seconds -> naive IST datetime64, which plotly draws as wall-clock market time."""
+    return (np.asarray(ts, dtype='int64') + clock.IST_OFFSET).astype('datetime64[s]')
+
+def breaks(type_):
+    """x-axis rangebreaks hiding weekends and the hours the row's market is shut (none for 24h markets)."""
+    opn, close = clock.SESSIONS.get(type_, clock.SESSIONS["EQUITY"])
+    if close is None: return []
+    return [dict(bounds=["sat", "mon"]), dict(bounds=[close.hour + close.minute / 60, opn.hour + opn.minute / 60], pattern="hour")]
+
+# --- DOWNSAMPLING ---
+def _picks(x, y, edges, a, tail):
+    """LTTB choice in each bucket [edges[i], edges[i+1]) given the previous pick `a`: the point spanning the largest
+    triangle with it and the next bucket's mean (the last bucket leans on point `tail`)."""
+    cx, cy = np.cumsum(np.r_[0.0, x]), np.cumsum(np.r_[0.0, y])
+    lo, hi = edges[1:-1], edges[2:]
+    mx, my = np.r_[(cx[hi] - cx[lo]) / (hi - lo), x[tail]], np.r_[(cy[hi] - cy[lo]) / (hi - lo), y[tail]]
+    out = np.empty(len(edges) - 1, dtype='int64')
+    for i in range(len(out)):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - mx[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (my[i] - y[a]))
+        a = out[i] = lo + int(area.argmax())
+    return out
+
+def lttb(x, y, n):
+    """Indices of the n points Largest-Triangle-Three-Buckets keeps: the first, the last, and one per bucket of the
+    n - 2 between them. Keeps a line's peaks and turns where striding would alias them away."""
+    m = len(y)
+    if m <= n or n < 3: return np.arange(m)
+    x, y = np.asarray(x, dtype='float64'), np.asarray(y, dtype='float64')
+    return np.r_[0, _picks(x - x[0], y, np.linspace(1, m - 1, n - 1).astype('int64'), 0, m - 1), m - 1]
+
+def minmax(y, n):
+    """Indices of the min and max of each of n // 2 equal buckets, in order: no extreme is lost (drawdowns, wicks)."""
+    m = len(y)
+    if m <= n or n < 2: return np.arange(m)
+    k = n // 2
+    w = -(-m // k)
+    v = np.r_[np.asarray(y, dtype='float64'), np.full(k * w - m, y[-1])].reshape(k, w)
+    base = np.arange(k) * w
+    idx = np.unique(np.r_[base + v.argmin(1), base + v.argmax(1), m - 1])
+    return idx[idx < m]
+
+def candles(view, start, w, step):
+    """OHLCV and closing overlay values of the bars from `start` in w-bar buckets on absolute time, so a bucket
+    that has closed aggregates the same on every refresh; "ts" is each bucket's start."""
+    ts = view['ts'][start:]
+    if not len(ts): return None
+    key = (ts - ORIGIN) // (w * step)
+    cut = np.r_[0, np.flatnonzero(np.diff(key)) + 1]
+    last = np.r_[cut[1:], len(ts)] - 1
+    col = lambda c: view[c][start:]
+    out = {"ts": key[cut] * w * step + ORIGIN, "Open": col("Open")[cut], "High": np.maximum.reduceat(col("High"), cut),
+           "Low": np.minimum.reduceat(col("Low"), cut), "Close": col("Close")[last], "Volume": np.add.reduceat(col("Volume"), cut)}
+    out.update((c, col(c)[last]) for c in (*OVERLAYS, "SUPERT", "SUPERTd"))
+    return out
+
+# --- FIGURES ---
+class BarChart:
+    """Candles, EMA/VWAP/Supertrend overlays and trade markers of one (code, interval), kept across refreshes.
+
+    Bars are bucketed `w` to a candle, w fixed from the ring's capacity so a full ring is at most MAX_POINTS
+    candles. `update` re-aggregates only the last drawn (still open) bucket and the bars after it, splices them
+    onto the columns it already holds and writes the traces in place; a gap the ring no longer covers rebuilds.
+    """
+    def __init__(self, title, interval="1m", rangebreaks=()):
+        self.step = marketdata.INTERVAL_MIN.get(interval, 1) * 60
+        self.w = max(1, -(-ringbuf.CAPACITY.get(interval, ringbuf.CAPACITY["1m"]) // MAX_POINTS))
+        self.cols = None
+        fig = self.fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.8, 0.2], vertical_spacing=0.02)
+        fig.add_trace(go.Candlestick(name=title, increasing_line_color="#00e676", decreasing_line_color="#ff1744"), 1, 1)
+        for name, color in OVERLAYS.items(): fig.add_trace(go.Scatter(name=name, mode="lines", line=dict(color=color, width=1)), 1, 1)
+        for name, color in (("ST up", "#00e676"), ("ST down", "#ff1744")):
+            fig.add_trace(go.Scatter(name=name, mode="lines", line=dict(color=color, width=1, dash="dot")), 1, 1)
+        fig.add_trace(go.Scatter(name="Entry", mode="markers", marker=dict(symbol="triangle-up", size=11, color="#00e676")), 1, 1)
+        fig.add_trace(go.Scatter(name="Exit", mode="markers", marker=dict(symbol="triangle-down", size=11, color="#ff9100")), 1, 1)
+        fig.add_trace(go.Bar(name="Volume", marker_color="#455a64", showlegend=False), 2, 1)
+        fig.update_layout(title=f"{title} · {interval}" + (f" ({self.w} bars/candle)" if self.w > 1 else ""),
+                          uirevision=f"{title}-{interval}", **LAYOUT)  # uirevision: refreshes keep the user's zoom
+        fig.update_xaxes(rangebreaks=list(rangebreaks))
+
+    def update(self, view, marks=()):
+        """Bring the figure up to `view` (engine.history) and `marks` (engine.marks); returns the figure."""
+        if view is None or not len(view['ts']): return self.fig
+        ts, c = view['ts'], self.cols
+        start = 0
+        if c is not None and ts[0] <= c['ts'][-1]: start = int(np.searchsorted(ts, c['ts'][-1]))
+        else: c = None
+        new = candles(view, start, self.w, self.step)
+        if new is None: return self.fig
+        if c is not None:
+            keep = len(c['ts']) - 1  # the open bucket is re-aggregated in `new`
+            new = {k: np.r_[c[k][:keep], v] for k, v in new.items()}
+        live = new['ts'] + self.w * self.step > ts[0]  # candles the ring still covers
+        live[:-MAX_POINTS] = False
+        c = self.cols = {k: v[live] for k, v in new.items()}
+        x = _dt(c['ts'])
+        st = c['SUPERT'].astype('float64')
+        with self.fig.batch_update():
+            d = self.fig.data
+            d[0].update(x=x, open=c['Open'], high=c['High'], low=c['Low'], close=c['Close'])
+            for i, k in enumerate(OVERLAYS, 1): d[i].update(x=x, y=c[k])
+            d[4].update(x=x, y=np.where(c['SUPERTd'] > 0, st, np.nan))
+            d[5].update(x=x, y=np.where(c['SUPERTd'] < 0, st, np.nan))
+            d[8].update(x=x, y=c['Volume'])
+            self._marks(view, [m for m in marks if m['ts'] >= ts[0]])
+        return self.fig
+
+    def _marks(self, view, marks):
+        # Placed on the chart's own close at the trade's bar: an INDEX trade fills at an option premium.
+        for trace, want in ((self.fig.data[6], True), (self.fig.data[7], False)):
+            ms = [m for m in marks if (m['side'] == "BUY") == want]
+            t = np.array([m['ts'] for m in ms], dtype='int64')
+            i = np.clip(np.searchsorted(view['ts'], t, side='right') - 1, 0, len(view['ts']) - 1)
+            trace.update(x=_dt(t), y=view['Close'][i] if len(t) else [],
+                         text=[f"{m['side']} {m['display']} @ {m['price']:.2f}" + (f" · P&L {m['pnl']:+.2f}" if 'pnl' in m else "")
+                               for m in ms], hoverinfo="text")
+
+class EquityChart:
+    """Day P&L (LTTB) over its drawdown from the running peak (min-max), from engine.equity_curve().
+
+    LTTB runs on fixed buckets of `w` minutes, so a bucket's pick is final once the bucket after it has closed:
+    `update` keeps those picks and re-runs only the buckets since the last final one. The drawdown needs the
+    running peak of the whole curve and is a few vectorized passes, so it is recomputed.
+    """
+    def __init__(self, capacity=ringbuf.CAPACITY["1m"]):
+        self.w = max(1, -(-capacity // MAX_POINTS)) * 60
+        self.kept, self.done = np.zeros((0, 2)), None  # final (ts, pnl) picks, oldest first; bucket key of the last
+        fig = self.fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.7, 0.3], vertical_spacing=0.02)
+        fig.add_trace(go.Scatter(name="P&L", mode="lines", line=dict(color="#00e676", width=1.5)), 1, 1)
+        fig.add_trace(go.Scatter(name="Drawdown", mode="lines", fill="tozeroy", line=dict(color="#ff1744", width=1)), 2, 1)
+        fig.update_layout(title="Day P&L · drawdown", uirevision="equity", **dict(LAYOUT, height=340))
+
+    def update(self, curve):
+        if not curve: return self.fig
+        ts, v = (np.asarray(a, dtype='float64') for a in zip(*curve))
+        key = (ts // self.w).astype('int64')
+        kept = self.kept[self.kept[:, 0] >= ts[0]]
+        if not len(kept) or kept[-1, 0] > ts[-1]:  # first call, a restarted curve, or every pick rolled out
+            kept, self.done = np.array([[ts[0], v[0]]]), key[0]
+        a, p = int(np.searchsorted(ts, kept[-1, 0])), int(np.searchsorted(key, self.done, side='right'))
+        shown = kept
+        if p < len(ts):
+            # The anchor (last final pick) followed by the pending buckets, in local indices.
+            x, y = np.r_[ts[a], ts[p:]] - ts[a], np.r_[v[a], v[p:]]
+            picks = _picks(x, y, np.r_[1, np.flatnonzero(np.diff(key[p:])) + 2, len(x)], 0, len(x) - 1) + p - 1
+            # The last bucket is still open and the one before leans on its mean: only earlier picks are final.
+            if len(picks) > 2:
+                kept, self.done = np.r_[kept, np.c_[ts[picks[:-2]], v[picks[:-2]]]], key[picks[-3]]
+            shown = np.r_[kept, np.c_[ts[picks[-2:-1]], v[picks[-2:-1]]]]
+        self.kept = kept
+        shown = np.r_[shown, [[ts[-1], v[-1]]]]
+        shown = shown[np.r_[True, np.diff(shown[:, 0]) > 0]]
+        dd = v - np.maximum.accumulate(v)
+        j = minmax(dd, MAX_POINTS)
+        with self.fig.batch_update():
+            self.fig.data[0].update(x=_dt(shown[:, 0]), y=shown[:, 1])
+            self.fig.data[1].update(x=_dt(ts[j]), y=dd[j])
+        return self.fig
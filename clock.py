@@ -0,0 +1,73 @@
+# --- MARKET CLOCK: IST trading sessions per watchlist type, on the wall clock or a replay's SimClock ---
+import time
+from datetime import datetime, time as dtime
+import numpy as np
+import pytz
+
+IST = pytz.timezone('Asia/Kolkata')
+IST_OFFSET = 19800  # seconds east of UTC
+
+# type -> (open, close) in IST; CRYPTO trades round the clock and its bars anchor on the UTC day (05:30 IST).
+SESSIONS = {
+    "INDEX": (dtime(9, 15), dtime(15, 30)),
+    "EQUITY": (dtime(9, 15), dtime(15, 30)),
+    "MCX": (dtime(9, 0), dtime(23, 30)),
+    "CRYPTO": (dtime(5, 30), None),
+}
+
+class SimClock:
+    """Replay time in epoch seconds; while installed with `use`, now()/epoch() and check_market_time follow it."""
+    def __init__(self, ts):
+        self.ts = float(ts)
+
+    def set(self, ts): self.ts = float(ts)
+    def now(self): return datetime.fromtimestamp(self.ts, IST)
+
+_sim = None
+
+def use(sim):
+    """Install a SimClock process-wide (None restores the wall clock); returns it."""
+    global _sim
+    _sim = sim
+    return sim
+
+def now():
+    return _sim.now() if _sim is not None else datetime.now(IST)
+
+def epoch():
+    return _sim.ts if _sim is not None else time.time()
+
+def check_market_time(exch_type, at=None):
+    if exch_type not in SESSIONS: return False
+    opn, close = SESSIONS[exch_type]
+    if close is None: return True
+    t = (at or now()).time()
+    return opn <= t <= close
+
+def _secs(t):
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+def session_bounds(exch_type, ts):
+    """(open_ts, close_ts) in epoch seconds of the session containing `ts`, or None outside market hours."""
+    opn, close = SESSIONS.get(exch_type, SESSIONS["EQUITY"])
+    local = ts + IST_OFFSET
+    day = local - local % 86400 - IST_OFFSET
+    o = day + _secs(opn)
+    if close is None:
+        if ts < o: o -= 86400
+        return o, o + 86400
+    c = day + _secs(close)
+    return (o, c) if o <= ts < c else None
+
+def session_arrays(exch_type, ts):
+    """Vectorized session_bounds over an int64 array: (open_ts, close_ts, inside) arrays."""
+    opn, close = SESSIONS.get(exch_type, SESSIONS["EQUITY"])
+    ts = np.asarray(ts, dtype='int64')
+    local = ts + IST_OFFSET
+    day = local - local % 86400 - IST_OFFSET
+    o = day + _secs(opn)
+    if close is None:
+        o = np.where(ts < o, o - 86400, o)
+        return o, o + 86400, np.ones(len(ts), dtype=bool)
+    c = day + _secs(close)
+    return o, c, (ts >= o) & (ts < c)
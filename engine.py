@@ -0,0 +1,562 @@
+# --- TRADING ENGINE: one headless bot per process; Streamlit sessions only read snapshots and send commands ---
+import queue
+import threading
+import time
+from collections import deque
+import numpy as np
+import bars
+import barstore
+import clock
+import hub
+import instruments
+import journal
+import logbook
+import options
+import orders
+import perf
+import positions
+import ringbuf
+import strategies
+import ticks
+
+WATCHLIST = [
+    {"type": "INDEX", "symbol": "NIFTY 50", "code": "^NSEI", "step": 50},
+    {"type": "INDEX", "symbol": "BANKNIFTY", "code": "^NSEBANK", "step": 100},
+    {"type": "MCX", "symbol": "CRUDEOIL", "code": "CL=F", "step": 10},
+    {"type": "CRYPTO", "symbol": "BITCOIN", "code": "BTC-USD", "step": 1},
+    {"type": "EQUITY", "symbol": "RELIANCE", "code": "RELIANCE.NS", "step": 1},
+]
+SETTINGS = ("strategy_mode", "manual_qty", "real_trade_active", "max_loss", "target_pct", "sl_pct")
+OPTION_BAND = 5     # strikes either side of ATM carried with each INDEX row
+TARGET_DELTA = 0.5  # |delta| of the option leg an INDEX signal trades (0.5 ~ ATM, lower = further OTM)
+LOOKBACK_DAYS = 7   # calendar days of stored bars fed to the indicators (~5 sessions)
+SCAN_EVERY = 10.0   # seconds between 1m bar syncs
+EXIT_RETRY = 2.0    # seconds before a failed REAL exit is sent again
+
+class TradingEngine:
+    """Owns the watchlist, positions, P&L and logs, and runs signal -> entry/exit whenever data arrives.
+
+    `start` runs it on a background thread that wakes on bar closes, ticks and commands instead of a fixed
+    sleep; `step(now)` does one synchronous pass so a replay can drive it on its own clock.
+    """
+    def __init__(self, instr=None, store=None, source=None, scan_every=SCAN_EVERY, logs=None, journal=None):
+        self.instr, self.source, self.scan_every = instr, source, scan_every
+        self.store = store or barstore.BarStore()
+        self.builder = bars.BarBuilder()
+        self.builder.subscribe(self._on_close)
+        self.states, self.scanned = {}, {}  # code -> {interval: IndicatorState}, code -> {spot, sigs, change}
+        self.rings = {}  # code -> {interval: ringbuf.BarRing}: fixed-size bar + indicator history
+        self.theo = {}  # option token -> Black-Scholes premium from the last resolve (marks unticked legs)
+        self.watchlist = [dict(x) for x in WATCHLIST]
+        self.strategy_mode, self.manual_qty, self.real_trade_active = strategies.LABELS[0], 50, False
+        self.max_loss, self.target_pct, self.sl_pct = 5000, 2.0, 1.0
+        self.bal, self.daily_pnl, self.bot_active = 100000.0, 0.0, False
+        self.day = None  # IST day number (journal.day) that daily_pnl belongs to
+        self.book = positions.PositionBook(self.sl_pct, self.target_pct)
+        self.rows, self.base, self.logbook = [], [], logs or logbook.LogBook()
+        self.journal = journal  # optional journal.Journal: positions, P&L and commands survive a restart
+        self.api, self.stream, self.orders, self.applied = None, None, None, None
+        self.hub = hub.DataHub()
+        self.pending = set()  # displays with a live order (entry or exit) in the gateway
+        self.unsent = set()  # REAL positions whose exit could not be sent (no broker connection); logged once
+        self.flatten = set()  # displays to exit after a max-loss breach or panic, re-sent every pass until closed
+        self.retry_at = {}  # display -> epoch after which a failed exit order may be sent again
+        self.events = queue.SimpleQueue()
+        self.lock = threading.RLock()
+        self.latency = deque(maxlen=2000)  # seconds from bar close / tick arrival to the finished decision pass
+        self.trades = deque(maxlen=1000)  # entries and exits, oldest first: chart markers
+        self.equity = deque(maxlen=ringbuf.CAPACITY["1m"])  # (minute, realized + unrealized P&L), one per minute
+        self.version, self.synced, self.stale = 0, None, True
+        self.closed = {}  # code -> perf_counter() of the first unhandled bar close
+        self.universe_sync = {"running": False, "done": 0, "total": 0, "errors": 0, "finished": None}
+        self._stop, self._wake, self._thread = threading.Event(), threading.Event(), None
+
+    # --- commands (any thread) ---
+    def log(self, msg, type_="INFO", symbol=None, event=None, latency_ms=None):
+        self.logbook.append(type_, msg, symbol, event, latency_ms, ts=clock.epoch())
+
+    def _note(self, kind, **data):
+        if self.journal is not None: self.journal.record(kind, data, ts=clock.epoch())
+
+    def configure(self, **settings):
+        with self.lock:
+            for k, v in settings.items():
+                if k not in SETTINGS: raise KeyError(k)
+                setattr(self, k, v)
+            self._note("config", **settings)
+            if self.book.sl_pct != self.sl_pct or self.book.target_pct != self.target_pct:
+                self.book.retarget(self.sl_pct, self.target_pct)
+            self.stale = True
+        self.events.put(("cmd",))
+
+    def start_bot(self):
+        self.bot_active = True
+        self._note("bot", active=True)
+        self.events.put(("cmd",))
+
+    def stop_bot(self):
+        self.bot_active = False
+        self._note("bot", active=False)
+        self.events.put(("cmd",))
+
+    def panic(self):
+        with self.lock:
+            self.bot_active = False
+            self._note("bot", active=False)
+            self.flatten = set(self.book.slots)
+            for d in list(self.flatten): self._close(self.book.slots[d], "ALERT")
+        self.log("PANIC EXIT TRIGGERED", "ALERT", event="panic")
+        self.events.put(("cmd",))
+
+    def add_symbol(self, item):
+        with self.lock:
+            if any(x['symbol'] == item['symbol'] for x in self.watchlist): return
+            self.watchlist = self.watchlist + [item]
+        self._wake.set()
+        self.events.put(("cmd",))
+
+    def remove_symbol(self, symbol):
+        with self.lock:
+            self.watchlist = [x for x in self.watchlist if x['symbol'] != symbol]
+            self.stale = True
+        self.events.put(("cmd",))
+
+    def attach_api(self, api):
+        self.detach_api()
+        stream = ticks.TickStream.from_smartapi(api, on_tick=self._on_tick)
+        stream.start()
+        with self.lock: self.api, self.stream, self.orders, self.applied = api, stream, orders.OrderGateway(api), None
+        self.reconcile()
+        self.events.put(("cmd",))
+
+    def detach_api(self):
+        with self.lock:
+            stream, gateway, self.api, self.stream, self.orders = self.stream, self.orders, None, None, None
+        if stream: stream.stop()
+        if gateway: gateway.stop()
+        self.events.put(("cmd",))
+
+    def restore(self, state):
+        """Settings, bot flag, today's realized P&L and open positions from a recovered journal state."""
+        with self.lock:
+            for k, v in state['settings'].items():
+                if k in SETTINGS: setattr(self, k, v)
+            self.book.retarget(self.sl_pct, self.target_pct)
+            if state['bal'] is not None: self.bal = state['bal']
+            self.daily_pnl, self.bot_active = state['daily_pnl'], state['bot_active']
+            self.day = journal.day(clock.epoch())  # recover() has already zeroed a previous day's P&L
+            for p in state['positions'].values():
+                if p['display'] in self.book: continue
+                slot = self.book.open(p['display'], p['entry'], p['qty'], p['type'], p['token'], p['exch'])
+                self.book.ltp[slot] = p.get('ltp') or p['entry']
+            self.stale = True
+        if state['bal'] is None: self._note("balance", bal=self.bal)
+        self.log(f"Recovered {len(state['positions'])} positions, day P&L {self.daily_pnl:.2f}", event="recover")
+
+    def reconcile(self):
+        """Align REAL positions with the broker's position book; returns the differences applied."""
+        api = self.api
+        if api is None: return []
+        try:
+            data = (api.position() or {}).get('data') or []
+            ours = {str(o.get('symboltoken')) for o in (api.orderBook() or {}).get('data') or []
+                    if str(o.get('ordertag') or "").startswith(orders.TAG_PREFIX)}
+        except Exception as e:
+            perf.error("reconcile", e)
+            self.log(f"Position reconcile failed: {e!r}", "ERROR", event="reconcile")
+            return []
+        with self.lock:
+            diff = journal.reconcile({p['token']: p for p in self.book.rows() if p['type'] == "REAL" and p['token']}, data, ours)
+            for act, p in diff:
+                if act == "drop":
+                    self.book.close(self.book.slots[p['display']])
+                    self._note("close", display=p['display'], pnl=0.0, ltp=p['ltp'], type="RECON")
+                elif act == "resize":
+                    self.book.qty[self.book.slots[p['display']]] = p['qty']
+                    self._note("resize", display=p['display'], qty=p['qty'])
+                elif act == "adopt":
+                    slot = self.book.open(p['display'], p['entry'], p['qty'], "REAL", p['token'], p['exch'])
+                    self.book.ltp[slot] = p['ltp']
+                    self._note("open", **self.book.position(slot))
+                self.log(f"Reconcile {act}: {p['display']} qty {p['qty']}" + (" (not the bot's; left alone)" if act == "skip" else ""),
+                         "RECON", p['display'], "reconcile")
+        return diff
+
+    # --- data events ---
+    def _on_tick(self, token, tick):
+        self.events.put(("tick", token, tick.recv))
+
+    def _on_close(self, code, interval, bar):
+        state = self.states.get(code, {}).get(interval)
+        if state is not None: state.update(*bar)
+        ring = self.rings.get(code, {}).get(interval)
+        if ring is not None: ring.push(bar, state.out if state is not None else None)
+        if interval == "1m" and code in self.scanned: self.scanned[code]['spot'] = bar[4]
+        self.closed.setdefault(code, time.perf_counter())
+
+    def sync(self, now=None):
+        """Fetch new 1m bars into the store (network; runs off the decision thread when threaded)."""
+        codes = [x['code'] for x in self.watchlist]
+        with perf.timer("sync"): self.store.sync(codes, "1m", self.source, chunk=25, workers=4, deadline=8.0)
+        self.events.put(("sync", time.time() if now is None else now))
+
+    def sync_universe(self, codes, batch=200):
+        """Start a background 1m sync of `codes` (the screener universe); progress is in `universe_sync`."""
+        with self.lock:
+            if self.universe_sync['running']: return False
+            self.universe_sync = {"running": True, "done": 0, "total": len(codes), "errors": 0, "finished": None}
+        threading.Thread(target=self._sync_universe, args=(list(codes), batch), daemon=True, name="universe-sync").start()
+        return True
+
+    def _sync_universe(self, codes, batch):
+        prog = self.universe_sync
+        try:
+            for i in range(0, len(codes), batch):
+                res = self.store.sync(codes[i:i + batch], "1m", self.source, chunk=50, workers=8, deadline=60.0)
+                prog['done'], prog['errors'] = min(i + batch, len(codes)), prog['errors'] + len(res.errors)
+        except Exception as e:
+            perf.error("universe_sync", e)
+            self.log(f"Universe sync failed: {e!r}", "ERROR", event="sync")
+        finally: prog['running'], prog['finished'] = False, time.time()
+
+    def _feed(self, now):
+        since = int(now) - LOOKBACK_DAYS * 86400
+        for item in self.watchlist:
+            code = item['code']
+            try:
+                if code not in self.states: self.states[code], self.rings[code] = strategies.new_states(), ringbuf.rings()
+                self.builder.register(code, item['type'])
+                rec = self.store.records(code, "1m")  # memory-mapped; only the unseen tail is folded in
+                rec = rec[int(np.searchsorted(rec['ts'], since)):]
+                if not len(rec): continue
+                self.builder.feed_records(code, rec)
+                self.builder.flush(int(now), code)
+                first, last = float(rec['open'][0]), float(rec['close'][-1])
+                self.scanned[code] = {"spot": last, "sigs": None, "change": (last - first) / first * 100}
+                self.closed.setdefault(code, time.perf_counter())
+            except Exception as e: perf.error("feed", e)
+
+    # --- contract resolution ---
+    def get_angel_token(self, symbol, strike=None, opt_type=None, type_="EQUITY"):
+        idx = self.instr
+        if idx is None: return None, None, "NSE"
+        hit, exch = None, "NSE"
+        if type_ == "MCX": hit, exch = idx.future(symbol), "MCX"
+        elif type_ == "INDEX" and strike: hit, exch = idx.option(instruments.underlying(symbol), strike, opt_type), "NFO"
+        elif type_ == "EQUITY": hit = idx.equity(symbol)
+        if hit: return str(hit[0]), hit[1], exch
+        return None, None, "NSE"
+
+    def get_chain(self, symbol):
+        return self.instr.chain(instruments.underlying(symbol)) if self.instr is not None else None
+
+    def _vol(self, item, chain, spot):
+        """Volatility for pricing a chain: implied from live ATM premiums, else realized from 1m bars."""
+        table = self.stream.table if self.stream else None
+        iv = chain.atm_iv(spot, table.ltp) if table is not None else None
+        if iv is None:
+            h = self.history(item['code'], copy=False)  # decision thread: the rings' only writer
+            iv = options.realized_vol(h['Close']) if h is not None else None
+        return min(max(iv, 0.05), 2.0) if iv else options.DEFAULT_VOL
+
+    def _resolve(self):
+        """Rows for the active strategy: the signal plus the contract it trades (option leg for INDEX).
+
+        INDEX rows price the ATM ± OPTION_BAND ladder with Black-Scholes and trade the leg nearest TARGET_DELTA at
+        its model premium until the leg's own ticks arrive.
+        """
+        data, theo = [], {}
+        key = strategies.get(self.strategy_mode).key
+        for item in self.watchlist:
+            try:
+                s = self.scanned.get(item['code'])
+                if s is None: continue
+                sig = s['sigs'][key]
+                trade_price = s['spot']
+                token, sym, exch, band = None, item['symbol'], "NSE", []
+
+                if item['type'] == "INDEX":
+                    otype = "CE" if "BUY" in sig else "PE"
+                    chain = self.get_chain(item['symbol'])
+                    if chain:
+                        with perf.timer("options"):
+                            band = chain.ladder(trade_price, k=OPTION_BAND, vol=self._vol(item, chain, trade_price))
+                        leg = options.pick(band, otype, TARGET_DELTA)
+                        if leg:
+                            o = otype.lower()
+                            token, sym, exch, trade_price = leg[f"{o}_token"], leg[f"{o}_symbol"], "NFO", leg[f"{o}_price"]
+                        for b in band: theo.update({b['ce_token']: b['ce_price'], b['pe_token']: b['pe_price']})
+                    if sig != "HOLD": sig = f"BUY {otype}"
+                elif item['type'] == "MCX":
+                    token, sym, exch = self.get_angel_token(item['symbol'], type_="MCX")
+                elif item['type'] == "EQUITY":
+                    token, sym, exch = self.get_angel_token(item['symbol'], type_="EQUITY")
+
+                data.append({"display": sym, "code": item['code'], "price": trade_price, "sig": sig, "token": token, "exch": exch,
+                             "type": item['type'], "band": band, "change": s['change'], "sigs": s['sigs']})
+            except Exception as e: perf.error("resolve", e)
+        self.theo = theo
+        return data
+
+    def _subscribe(self):
+        toks = {(d['exch'], d['token']) for d in self.base if d['token']}
+        for d in self.base:
+            for b in d['band']: toks |= {("NFO", b['ce_token']), ("NFO", b['pe_token'])}
+        toks |= self.book.subscriptions()
+        self.hub.subscribe((e, t) for e, t in toks if t)
+
+    def _apply_subscriptions(self):
+        if self.stream and self.applied != self.hub.version:
+            self.applied = self.hub.version
+            self.stream.set_tokens(self.hub.tokens())
+
+    def _live(self):
+        table = self.stream.table if self.stream else None
+        if table is None: return list(self.base)
+        rows = []
+        for d in self.base:
+            ltp = table.ltp(d['token']) if d['token'] else 0.0
+            rows.append(dict(d, price=ltp) if ltp > 0 else d)
+        return rows
+
+    # --- decisions ---
+    def _open(self, d, qty, mode):
+        slot = self.book.open(d['display'], d['price'], qty, mode, d['token'], d['exch'])
+        self._note("open", **self.book.position(slot))
+        self.trades.append({"ts": clock.epoch(), "code": d.get('code'), "display": d['display'], "side": "BUY", "price": d['price']})
+        self.log(f"Entry: {d['display']}", mode, d['display'], "entry")
+
+    def _params(self, display, token, exch, side, qty):
+        return {"variety": "NORMAL", "tradingsymbol": display, "symboltoken": token, "transactiontype": side,
+                "exchange": exch, "ordertype": "MARKET", "producttype": "INTRADAY", "duration": "DAY", "quantity": str(qty)}
+
+    def _filled(self, order, d, qty):
+        self.pending.discard(d['display'])
+        self._note("ack", display=d['display'], tag=order.tag, orderid=order.orderid, status=order.status,
+                   latency_ms=order.latency and order.latency * 1000, error=order.error)
+        if order.status == "ACK": self._open(d, qty, "REAL")
+        else: self.log(f"Order failed: {d['display']} {order.error}", "FAIL", d['display'], "order", order.latency and order.latency * 1000)
+
+    def _close(self, slot, type_="EXIT"):
+        """PAPER positions close at once; REAL ones send a SELL and leave the book only when the broker acks it."""
+        m = self.book.meta[slot]
+        if m['type'] != "REAL" or not m['token']: return self._release(slot, type_)
+        d = m['display']
+        if d in self.pending or clock.epoch() < self.retry_at.get(d, 0): return
+        if not self.orders:
+            if d not in self.unsent: self.log(f"Exit not sent: {d} (no broker connection)", "FAIL", d, "order")
+            self.unsent.add(d)
+            return
+        self.pending.add(d)
+        self.orders.submit(self._params(d, m['token'], m['exch'], "SELL", int(self.book.qty[slot])),
+                           on_done=lambda o, d=d, slot=slot: self.events.put(("exit", o, d, slot, type_)))
+
+    def _exited(self, order, d, slot, type_):
+        self.pending.discard(d)
+        self._note("ack", display=d, tag=order.tag, orderid=order.orderid, status=order.status, side="SELL",
+                   latency_ms=order.latency and order.latency * 1000, error=order.error)
+        if self.book.slots.get(d) != slot: return  # reconcile already dropped it
+        if order.status == "ACK": self._release(slot, type_)
+        else:
+            self.retry_at[d] = clock.epoch() + EXIT_RETRY
+            self.log(f"Exit order failed: {d} {order.error}", "FAIL", d, "order", order.latency and order.latency * 1000)
+
+    def _release(self, slot, type_):
+        p = self.book.close(slot)
+        self.unsent.discard(p['display'])
+        self.flatten.discard(p['display'])
+        self.retry_at.pop(p['display'], None)
+        self.daily_pnl += p['pnl']
+        self._note("close", display=p['display'], pnl=p['pnl'], ltp=p['ltp'], type=type_)
+        code = next((t['code'] for t in reversed(self.trades) if t['display'] == p['display']), None)
+        self.trades.append({"ts": clock.epoch(), "code": code, "display": p['display'], "side": type_, "price": p['ltp'], "pnl": p['pnl']})
+        self.log(f"Exit {p['display']} PnL: {p['pnl']}", type_, p['display'], "exit")
+
+    def _breached(self):
+        return self.daily_pnl + self.book.unrealized() <= -self.max_loss
+
+    def _enter(self):
+        if self._breached(): return  # no new risk once the day's loss limit is hit, flat book or not
+        for d in self.rows:
+            if not clock.check_market_time(d['type']): continue
+            # Entry
+            if "BUY" in d['sig'] and d['display'] not in self.pending and d['display'] not in self.book:
+                qty = self.manual_qty
+                if self.real_trade_active and d['token'] and self.orders:
+                    p = self._params(d['display'], d['token'], d['exch'], "BUY", qty)
+                    self.pending.add(d['display'])
+                    self.orders.submit(p, on_done=lambda o, d=d, qty=qty: self.events.put(("order", o, d, qty)))
+                else: self._open(d, qty, "PAPER")
+
+    def _mark(self, ticked):
+        """Mark positions from the rows and the ticked tokens; returns the slots whose SL/target was crossed."""
+        hit = set()
+        for d in self.rows:
+            if d['display'] in self.book: hit.update(self.book.mark(d['display'], d['price']))
+        table = self.stream.table if self.stream else None
+        for tok in self.theo.keys() & self.book.tokens.keys():  # option legs: live premium, else the model's
+            hit.update(self.book.mark_token(tok, (table.ltp(tok) if table else 0.0) or self.theo[tok]))
+        if table:
+            for tok in ticked: hit.update(self.book.mark_token(tok, table.ltp(tok)))
+        return hit
+
+    def _exit(self, hit):
+        """SL/target exits (REAL ones even with the bot stopped: the broker still holds them), the max-loss check,
+        and a resend of every flatten exit that is still open, so a rejected ALERT SELL is not left behind."""
+        for slot in hit:
+            if self.bot_active or self.book.meta[slot]['type'] == "REAL": self._close(slot)
+        breach = self.bot_active and self._breached()
+        if breach:
+            self.bot_active = False
+            self._note("bot", active=False)
+            self.flatten.update(self.book.slots)
+        self.flatten.intersection_update(self.book.slots)  # reconcile may have dropped some
+        for d in list(self.flatten): self._close(self.book.slots[d], "ALERT")
+        if breach: self.log(f"MAX LOSS HIT: day P&L {self.daily_pnl:.2f}, bot stopped", "ALERT", event="max_loss")
+
+    def _rollover(self, now):
+        """Start a new day's P&L (and max-loss budget) at the IST day boundary; the engine outlives sessions."""
+        d = journal.day(now)
+        if d == self.day: return
+        if self.day is not None:
+            self.daily_pnl = 0.0
+            self.equity.clear()
+            self._note("day", day=d)
+            self.log("New trading day: day P&L reset", event="day")
+        self.day = d
+
+    def _sample(self, now):
+        m, v = int(now) // 60 * 60, self.daily_pnl + self.book.unrealized()
+        if self.equity and self.equity[-1][0] == m: self.equity[-1] = (m, v)
+        else: self.equity.append((m, v))
+
+    def _process(self, now, events):
+        with self.lock, perf.timer("decision"):
+            self._rollover(now)
+            sync = [e for e in events if e[0] == "sync"]
+            if sync:
+                with perf.timer("feed"): self._feed(now)
+            else: self.builder.flush(int(now))
+            closed, self.closed = self.closed, {}
+            with perf.timer("signals"):
+                for code in closed:
+                    s = self.scanned.get(code)
+                    if s is not None: s['sigs'] = strategies.evaluate(self.states[code])
+            if closed or self.stale:
+                with perf.timer("resolve"): self.base, self.stale = self._resolve(), False
+            for e in events:
+                if e[0] == "order": self._filled(*e[1:])
+                elif e[0] == "exit": self._exited(*e[1:])
+            ticked = {}  # token -> arrival of its first tick in this batch
+            for e in events:
+                if e[0] == "tick": ticked.setdefault(e[1], e[2])
+            if closed or events or self.bot_active or self.flatten:
+                with perf.timer("live"): self.rows = self._live()
+                self._exit(self._mark(ticked))
+                if self.bot_active: self._enter()  # max_loss may have just stopped the bot
+                self._sample(now)
+                self._subscribe()
+                self.version += 1
+                self.hub.publish(self.version)
+                done, wall = time.perf_counter(), time.time()
+                self.latency.extend(done - t for t in closed.values())
+                self.latency.extend(wall - t for t in ticked.values())
+            self._apply_subscriptions()
+
+    def _drain(self):
+        out = []
+        while True:
+            try: out.append(self.events.get_nowait())
+            except queue.Empty: return out
+
+    def step(self, now=None):
+        """One synchronous pass: sync bars when due, then signals, entries and exits. Returns the rows."""
+        now = time.time() if now is None else now
+        if self.synced is None or now - self.synced >= self.scan_every:
+            self.synced = now
+            self.sync(now)
+        self._process(now, self._drain())
+        return self.rows
+
+    # --- background mode ---
+    def _sync_loop(self):
+        while not self._stop.is_set():
+            started = time.time()
+            try: self.sync()
+            except Exception as e:
+                perf.error("sync", e)
+                self.log(f"Bar sync failed: {e!r}", "ERROR", event="sync")
+            self._wake.wait(max(0.0, self.scan_every - (time.time() - started)))
+            self._wake.clear()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try: events = [self.events.get(timeout=1.0)]  # the timeout doubles as the bar-close flush timer
+            except queue.Empty: events = []
+            try: self._process(time.time(), events + self._drain())
+            except Exception as e:
+                perf.error("engine", e)
+                self.log(f"Engine error: {e!r}", "ERROR", event="engine")
+
+    def start(self):
+        if self._thread is None:
+            self.logbook.start()
+            if self.journal is not None:
+                self.restore(self.journal.recover())
+                self.journal.start()
+            self._thread = threading.Thread(target=self._run, daemon=True, name="engine")
+            self._thread.start()
+            threading.Thread(target=self._sync_loop, daemon=True, name="engine-sync").start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self.detach_api()
+        self.logbook.stop()
+        if self.journal is not None: self.journal.stop()
+
+    # --- read side ---
+    def history(self, code, interval="1m", k=None, copy=True):
+        """Columns of the newest k bars and their indicators (see ringbuf.BarRing.view).
+
+        Other threads get a copy taken under the lock, so a bar being pushed is never read half-written; the
+        decision thread may pass copy=False for zero-copy views.
+        """
+        if not copy:
+            ring = self.rings.get(code, {}).get(interval)
+            return ring.view(k) if ring is not None else None
+        with self.lock:
+            ring = self.rings.get(code, {}).get(interval)
+            return ring.copy(k) if ring is not None else None
+
+    def marks(self, code=None):
+        """Entries and exits (all codes by default), oldest first."""
+        with self.lock: return [t for t in self.trades if code is None or t['code'] == code]
+
+    def equity_curve(self):
+        """(minute, day P&L incl. open positions) samples, oldest first."""
+        with self.lock: return list(self.equity)
+
+    def latency_stats(self):
+        with self.lock: lat = list(self.latency)
+        lat = np.array(lat)
+        if not len(lat): return {"n": 0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        p50, p99 = np.percentile(lat, [50, 99]) * 1000
+        return {"n": len(lat), "p50_ms": float(p50), "p99_ms": float(p99), "max_ms": float(lat.max() * 1000)}
+
+    def snapshot(self):
+        """What the dashboard renders on every refresh; logs and stats have their own getters."""
+        with self.lock:
+            return {"rows": list(self.rows), "positions": self.book.rows(), "watchlist": list(self.watchlist),
+                    "bal": self.bal, "daily_pnl": self.daily_pnl, "bot_active": self.bot_active, "logged_in": self.api is not None,
+                    "version": self.version, "strategy_mode": self.strategy_mode, "real_trade_active": self.real_trade_active}
+
+    def logs(self, n=100):
+        return [logbook.line(r) for r in self.logbook.recent(n)]
+
+    def stats(self):
+        """Decision latency, order gateway, hub and journal counters (computed on demand, outside the lock)."""
+        gateway, j = self.orders, self.journal
+        return {"latency": self.latency_stats(), "orders": gateway.stats() if gateway else None, "hub": self.hub.stats(),
+                "journal": {"seq": j.seq, "written": j.written, "recovery_ms": j.recovery_ms} if j is not None else None}
@@ -0,0 +1,37 @@
+# --- DATA HUB: the process-wide tick subscription set and the engine state version every session polls ---
+import threading
+
+class DataHub:
+    """What the one engine shares with every Streamlit session in the process.
+
+    `subscribe` replaces the (exch, token) set the single upstream tick stream follows; `version` bumps only when
+    the set changes, so the stream is re-subscribed once per change however often the engine calls it. `publish`
+    records the engine's state version and wakes `wait`ers: a session keeps the version its snapshot was taken
+    at and re-takes the snapshot only when `wait` returns a different one.
+    """
+    def __init__(self):
+        self.subs, self.version = frozenset(), 0
+        self.state = self.published = 0
+        self.cond = threading.Condition()
+
+    def subscribe(self, tokens):
+        tokens = frozenset(tokens)
+        if tokens != self.subs: self.subs, self.version = tokens, self.version + 1
+
+    def tokens(self):
+        """(exch, token) pairs for the upstream tick stream."""
+        return set(self.subs)
+
+    def publish(self, version):
+        with self.cond:
+            self.state, self.published = version, self.published + 1
+            self.cond.notify_all()
+
+    def wait(self, seen, timeout=None):
+        """The newest published state version; with a timeout, first waits up to that long for one other than `seen`."""
+        with self.cond:
+            if timeout: self.cond.wait_for(lambda: self.state != seen, timeout)
+            return self.state
+
+    def stats(self):
+        return {"tokens": len(self.subs), "changes": self.version, "published": self.published}
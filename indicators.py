@@ -0,0 +1,151 @@
+# --- STREAMING INDICATORS: O(1)-per-bar state matching pandas_ta's formulas ---
+import threading
+import numpy as np
+import pandas as pd
+
+NAN = float("nan")
+IST_OFFSET = 19800  # seconds; VWAP anchors on the IST calendar day like pandas_ta's anchor="D"
+
+class Smooth:
+    """SMA-seeded exponential smoother: EMA with alpha=2/(n+1), Wilder/RMA with alpha=1/n (pandas_ta presma)."""
+    __slots__ = ("n", "alpha", "count", "acc", "value")
+    def __init__(self, n, alpha):
+        self.n, self.alpha, self.count, self.acc, self.value = n, alpha, 0, 0.0, NAN
+
+    def update(self, x):
+        self.count += 1
+        if self.count < self.n: self.acc += x
+        elif self.count == self.n: self.value = (self.acc + x) / self.n
+        else: self.value += self.alpha * (x - self.value)
+        return self.value
+
+    def state(self): return (self.count, self.acc, self.value)
+    def load(self, s): self.count, self.acc, self.value = s
+
+class Wilder:
+    """pandas_ta rma(): ewm(alpha=1/n, adjust=False) seeded with the first value."""
+    __slots__ = ("alpha", "value")
+    def __init__(self, n):
+        self.alpha, self.value = 1.0 / n, NAN
+
+    def update(self, x):
+        self.value = x if self.value != self.value else self.value + self.alpha * (x - self.value)
+        return self.value
+
+    def state(self): return self.value
+    def load(self, s): self.value = s
+
+class IndicatorState:
+    """Per-(symbol, interval) indicator state; `update` costs the same whether it is bar 30 or bar 30,000.
+
+    Re-sending the bar with the current timestamp (the still-forming candle) rolls back and re-applies it.
+    """
+    def __init__(self, ema_fast=9, ema_slow=21, rsi_len=14, st_len=10, st_mult=3.0,
+                 macd_fast=12, macd_slow=26, macd_signal=9, vol_len=20):
+        self.st_mult, self.vol_len = st_mult, vol_len
+        self.ema_f, self.ema_s = Smooth(ema_fast, 2 / (ema_fast + 1)), Smooth(ema_slow, 2 / (ema_slow + 1))
+        self.rsi_up, self.rsi_dn = Wilder(rsi_len), Wilder(rsi_len)
+        self.atr = Smooth(st_len, 1 / st_len)
+        self.macd_f, self.macd_s = Smooth(macd_fast, 2 / (macd_fast + 1)), Smooth(macd_slow, 2 / (macd_slow + 1))
+        self.macd_sig = Smooth(macd_signal, 2 / (macd_signal + 1))
+        self.smoothers = (self.ema_f, self.ema_s, self.rsi_up, self.rsi_dn, self.atr, self.macd_f, self.macd_s, self.macd_sig)
+        self.vols = [0.0] * vol_len
+        self.lock = threading.Lock()
+        self.ts, self.n, self.prev_close, self.session, self.pv, self.v = None, 0, NAN, None, 0.0, 0.0
+        self.st_dir, self.st_lb, self.st_ub, self.vol_sum = 1, NAN, NAN, 0.0
+        self.out, self._saved = {}, None
+
+    def _save(self):
+        self._saved = (self.ts, self.n, self.prev_close, self.session, self.pv, self.v, self.st_dir, self.st_lb,
+                       self.st_ub, self.vol_sum, self.vols[self.n % self.vol_len], [s.state() for s in self.smoothers])
+
+    def _restore(self):
+        (self.ts, self.n, self.prev_close, self.session, self.pv, self.v, self.st_dir, self.st_lb,
+         self.st_ub, self.vol_sum, self.vols[self.n % self.vol_len], states) = self._saved
+        for s, st in zip(self.smoothers, states): s.load(st)
+
+    def update(self, ts, o, h, l, c, v):
+        """Apply one bar (epoch seconds, OHLCV); returns the latest values dict."""
+        if self.ts is not None:
+            if ts < self.ts: return self.out
+            if ts == self.ts: self._restore()
+        self._save()
+        out = {"Open": o, "High": h, "Low": l, "Close": c, "Volume": v}
+        out["EMA9"], out["EMA21"] = self.ema_f.update(c), self.ema_s.update(c)
+        # RSI / true range need the previous close; the first bar has none.
+        pc = self.prev_close
+        if pc == pc:
+            d = c - pc
+            up, dn = self.rsi_up.update(max(d, 0.0)), self.rsi_dn.update(-min(d, 0.0))
+            out["RSI"] = 100 * up / (up + dn) if up + dn else NAN
+            tr = max(h - l, abs(h - pc), abs(pc - l))
+        else:
+            out["RSI"], tr = NAN, h - l
+        # VWAP, reset per IST day
+        day = (ts + IST_OFFSET) // 86400
+        if day != self.session: self.session, self.pv, self.v = day, 0.0, 0.0
+        self.pv += (h + l + c) / 3 * v
+        self.v += v
+        out["VWAP"] = self.pv / self.v if self.v else NAN
+        # Supertrend: ratcheting ATR bands, direction flips when close crosses the previous band
+        matr = self.st_mult * self.atr.update(tr)
+        hl2 = (h + l) / 2
+        lb, ub = hl2 - matr, hl2 + matr
+        if self.n:
+            if c > self.st_ub: self.st_dir = 1
+            elif c < self.st_lb: self.st_dir = -1
+            else:
+                if self.st_dir > 0 and lb < self.st_lb: lb = self.st_lb
+                if self.st_dir < 0 and ub > self.st_ub: ub = self.st_ub
+            out["SUPERT"] = lb if self.st_dir > 0 else ub
+            out["SUPERTl"] = lb if self.st_dir > 0 else NAN
+        else:
+            out["SUPERT"] = out["SUPERTl"] = NAN
+        out["SUPERTd"] = self.st_dir
+        self.st_lb, self.st_ub = lb, ub
+        # MACD: signal EMA starts at the first valid MACD value
+        m = self.macd_f.update(c) - self.macd_s.update(c)
+        out["MACD"] = m
+        out["MACDs"] = self.macd_sig.update(m) if m == m else NAN
+        out["MACDh"] = m - out["MACDs"]
+        # Rolling volume mean over a fixed ring
+        slot = self.n % self.vol_len
+        self.vol_sum += v - self.vols[slot]
+        self.vols[slot] = v
+        out["VOL_AVG"] = self.vol_sum / self.vol_len if self.n + 1 >= self.vol_len else NAN
+        self.ts, self.n, self.prev_close, self.out = ts, self.n + 1, c, out
+        return out
+
+    def update_frame(self, df):
+        """Feed the bars of an OHLCV frame at/after the last applied timestamp."""
+        with self.lock:
+            if df.empty: return self.out
+            ts = df.index.tz_convert('UTC').tz_localize(None).values.astype('datetime64[s]').astype('int64')
+            start = 0 if self.ts is None else int(np.searchsorted(ts, self.ts))
+            cols = [df[c].to_numpy(dtype='float64')[start:] for c in ('Open', 'High', 'Low', 'Close', 'Volume')]
+            for row in zip(ts[start:].tolist(), *(c.tolist() for c in cols)): self.update(*row)
+            return self.out
+
+def series(df, **params):
+    """Run a fresh state over every bar of `df`; returns one column per indicator (for validation and charts)."""
+    state, rows = IndicatorState(**params), []
+    ts = df.index.tz_convert('UTC').tz_localize(None).values.astype('datetime64[s]').astype('int64')
+    for row in zip(ts.tolist(), *(df[c].to_numpy(dtype='float64').tolist() for c in ('Open', 'High', 'Low', 'Close', 'Volume'))):
+        rows.append(dict(state.update(*row)))
+    return pd.DataFrame(rows, index=df.index)
+
+def validate(df):
+    """Max absolute difference between the streaming values and pandas_ta on the same bars (needs pandas_ta)."""
+    import pandas_ta  # noqa: F401  registers the .ta accessor
+    ours = series(df)
+    st_ = df.ta.supertrend(length=10, multiplier=3)
+    macd = df.ta.macd(fast=12, slow=26, signal=9)
+    ref = {"EMA9": df.ta.ema(length=9), "EMA21": df.ta.ema(length=21), "RSI": df.ta.rsi(length=14), "VWAP": df.ta.vwap(),
+           "SUPERT": st_.iloc[:, 0], "SUPERTl": st_.iloc[:, 2], "MACD": macd.iloc[:, 0], "MACDh": macd.iloc[:, 1],
+           "MACDs": macd.iloc[:, 2], "VOL_AVG": df['Volume'].rolling(20).mean()}
+    out = {}
+    for k, r in ref.items():
+        a, b = ours[k].to_numpy(dtype=float), r.to_numpy(dtype=float)
+        both = ~np.isnan(a) & ~np.isnan(b)
+        out[k] = (float(np.max(np.abs(a[both] - b[both]))) if both.any() else 0.0, int((np.isnan(a) != np.isnan(b)).sum()))
+    return out
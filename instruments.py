@@ -0,0 +1,139 @@
+# --- INSTRUMENT MASTER: daily compact snapshot of Angel's OpenAPIScripMaster.json ---
+import os
+import json
+from bisect import bisect_left
+from datetime import datetime
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import requests
+import pytz
+import clock
+
+SCRIP_URL = "https://margincalculator.angelbroking.com/OpenAPI_File/files/OpenAPIScripMaster.json"
+CACHE_DIR = os.environ.get("MISHR_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+SEGMENTS = ['NFO', 'NSE', 'MCX']
+IST = pytz.timezone('Asia/Kolkata')
+
+def _paths(cache_dir):
+    return os.path.join(cache_dir, "scripmaster.feather"), os.path.join(cache_dir, "scripmaster.json")
+
+def _today():
+    return datetime.now(IST).strftime('%Y-%m-%d')
+
+def compact(records):
+    """Raw scrip-master records -> typed frame (int tokens, categorical names, parsed expiry, rupee strikes)."""
+    df = pd.DataFrame(records)
+    df = df[df['exch_seg'].isin(SEGMENTS)]
+    strike = pd.to_numeric(df['strike'], errors='coerce') / 100  # master quotes strikes in paise
+    return pd.DataFrame({
+        'token': pd.to_numeric(df['token'], errors='coerce').fillna(-1).astype('int64'),
+        'symbol': df['symbol'].astype(str),
+        'name': df['name'].astype('category'),
+        'exch_seg': df['exch_seg'].astype('category'),
+        'instrumenttype': df['instrumenttype'].astype('category'),
+        'expiry': pd.to_datetime(df['expiry'], format='%d%b%Y', errors='coerce'),
+        'strike': strike.where(strike > 0).astype('float64'),
+        'lotsize': pd.to_numeric(df['lotsize'], errors='coerce').fillna(0).astype('int32'),
+        'tick_size': (pd.to_numeric(df['tick_size'], errors='coerce') / 100).astype('float32'),
+    }).reset_index(drop=True)
+
+def read_snapshot(cache_dir=CACHE_DIR):
+    snap, _ = _paths(cache_dir)
+    # Uncompressed Arrow IPC is memory-mapped, so a cold start costs one page-in instead of a parse.
+    return feather.read_table(snap, memory_map=True).to_pandas()
+
+def write_snapshot(df, meta, cache_dir=CACHE_DIR):
+    snap, meta_path = _paths(cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), snap + ".tmp", compression="uncompressed")
+    os.replace(snap + ".tmp", snap)
+    write_meta(meta, cache_dir)
+
+def write_meta(meta, cache_dir=CACHE_DIR):
+    # Temp file + rename: a crash mid-write leaves the old meta, never a truncated one.
+    meta_path = _paths(cache_dir)[1]
+    with open(meta_path + ".tmp", "w") as f: json.dump(meta, f)
+    os.replace(meta_path + ".tmp", meta_path)
+
+def read_meta(cache_dir=CACHE_DIR):
+    try:
+        with open(_paths(cache_dir)[1]) as f: return json.load(f)
+    except (OSError, ValueError): return {}
+
+def load_snapshot(cache_dir=CACHE_DIR, url=SCRIP_URL, timeout=30):
+    """Today's snapshot if present; otherwise a conditional (ETag) refresh, falling back to the last good file."""
+    snap, _ = _paths(cache_dir)
+    meta, have = read_meta(cache_dir), os.path.exists(snap)
+    if have and meta.get('date') == _today(): return read_snapshot(cache_dir)
+    headers = {'If-None-Match': meta['etag']} if have and meta.get('etag') else {}
+    try:
+        r = requests.get(url, headers=headers, timeout=timeout)
+        if r.status_code == 304:
+            meta['date'] = _today()
+            write_meta(meta, cache_dir)
+            return read_snapshot(cache_dir)
+        r.raise_for_status()
+        df = compact(r.json())
+        write_snapshot(df, {'date': _today(), 'etag': r.headers.get('ETag'), 'rows': len(df),
+                            'built': datetime.now(IST).isoformat()}, cache_dir)
+        return df
+    except Exception:
+        if have: return read_snapshot(cache_dir)
+        raise
+
+# --- LOOKUP INDEX ---
+# Watchlist symbols whose option chains trade under a different master name.
+UNDERLYINGS = {"NIFTY 50": "NIFTY", "NIFTY BANK": "BANKNIFTY", "NIFTY FIN SERVICE": "FINNIFTY", "NIFTY MID SELECT": "MIDCPNIFTY"}
+
+def underlying(symbol):
+    return UNDERLYINGS.get(symbol, symbol)
+
+def _strike_key(strike):
+    return None if strike is None or strike != strike else round(float(strike), 2)
+
+class InstrumentIndex:
+    """Dictionary/bisect index over the snapshot keyed by (name, segment, type, expiry, strike, option type)."""
+    def __init__(self, df):
+        self.df = df
+        self.exact, self.equities, self._chains = {}, {}, {}
+        chains = {}
+        opt = df['symbol'].str[-2:].where(df['instrumenttype'].astype(str).str.startswith('OPT'), '')
+        expiry = [None if e is pd.NaT else e for e in df['expiry'].dt.date.tolist()]
+        cols = [df[c].astype(str).tolist() for c in ('name', 'exch_seg', 'instrumenttype')]
+        for tok, sym, name, seg, itype, exp, strike, ot in zip(df['token'].tolist(), df['symbol'].tolist(), *cols,
+                                                            expiry, df['strike'].round(2).tolist(), opt.tolist()):
+            sk = None if strike != strike else strike
+            self.exact[(name, seg, itype, exp, sk, ot)] = (tok, sym)
+            if seg == 'NSE' and sym.endswith('-EQ'): self.equities[name] = (tok, sym)
+            elif exp is not None: chains.setdefault((name, seg, itype, sk, ot), []).append(exp)
+        self.expiries = {k: sorted(set(v)) for k, v in chains.items()}
+
+    def get(self, name, seg, itype, expiry, strike=None, opt=''):
+        return self.exact.get((name, seg, itype, expiry, _strike_key(strike), opt))
+
+    def nearest_expiry(self, name, seg, itype, strike=None, opt='', today=None, skip=0):
+        exps = self.expiries.get((name, seg, itype, _strike_key(strike), opt))
+        if not exps: return None
+        i = bisect_left(exps, today or clock.now().date()) + skip
+        return exps[i] if i < len(exps) else None
+
+    def _nearest(self, name, seg, itype, strike=None, opt='', today=None, skip=0):
+        exp = self.nearest_expiry(name, seg, itype, strike, opt, today, skip)
+        return None if exp is None else self.exact[(name, seg, itype, exp, _strike_key(strike), opt)]
+
+    def equity(self, name):
+        return self.equities.get(name)
+
+    def future(self, name, seg='MCX', itype='FUTCOM', today=None, skip=0):
+        return self._nearest(name, seg, itype, today=today, skip=skip)
+
+    def option(self, name, strike, opt, seg='NFO', itype='OPTIDX', today=None, skip=0):
+        return self._nearest(name, seg, itype, strike, opt, today, skip)
+
+    def chain(self, name, seg='NFO', itype='OPTIDX'):
+        key = (name, seg, itype)
+        if key not in self._chains:
+            from options import OptionChain
+            self._chains[key] = OptionChain(name, self.df, seg, itype)
+        return self._chains[key]
@@ -0,0 +1,151 @@
+# --- TRADE JOURNAL: append-only SQLite (WAL) log of trading state changes, group-committed off the trading path ---
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import clock
+import perf
+from instruments import CACHE_DIR
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (seq INTEGER PRIMARY KEY, ts REAL NOT NULL, kind TEXT NOT NULL, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS snapshots (seq INTEGER PRIMARY KEY, ts REAL NOT NULL, state TEXT NOT NULL);
+"""
+
+def day(ts):
+    return int((ts + clock.IST_OFFSET) // 86400)
+
+def empty():
+    return {"bal": None, "daily_pnl": 0.0, "day": None, "bot_active": False, "settings": {}, "positions": {}}
+
+def apply(state, ts, kind, data):
+    """Fold one event into the state dict; the same function runs live and during recovery."""
+    if kind in ("open", "close") and state['day'] != day(ts): state['day'], state['daily_pnl'] = day(ts), 0.0
+    if kind == "open": state['positions'][data['display']] = data
+    elif kind == "close":
+        state['positions'].pop(data['display'], None)
+        state['daily_pnl'] += data['pnl']
+    elif kind == "resize":
+        if data['display'] in state['positions']: state['positions'][data['display']]['qty'] = data['qty']
+    elif kind == "clear": state['positions'] = {}
+    elif kind == "bot": state['bot_active'] = data['active']
+    elif kind == "config": state['settings'].update(data)
+    elif kind == "balance": state['bal'] = data['bal']
+    elif kind == "day": state['day'], state['daily_pnl'] = data['day'], 0.0
+    return state
+
+class Journal:
+    """Every entry, exit, order ack and state command as one row, written by a background thread.
+
+    `record` only folds the event into the in-memory state and queues it. The writer commits whatever has queued
+    in one transaction every `flush_every` seconds (synchronous=NORMAL in WAL mode: one fsync per checkpoint, and
+    a crash loses at most the last uncommitted batch), and stores the folded state as a snapshot every
+    `snap_every` events. `recover` loads the newest snapshot and replays only the events after it.
+    """
+    def __init__(self, path=os.path.join(CACHE_DIR, "journal.db"), flush_every=0.05, snap_every=500):
+        self.path, self.flush_every, self.snap_every = path, flush_every, snap_every
+        self.queue, self.lock, self.dblock = queue.SimpleQueue(), threading.Lock(), threading.Lock()
+        self.db = self._connect()
+        self.state, self.seq, self.snapped, self.recovery_ms = self._load()
+        self.written = self.seq
+        self._stop, self._thread = threading.Event(), None
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(SCHEMA)
+        return db
+
+    def _load(self):
+        t = time.perf_counter()
+        row = self.db.execute("SELECT seq, state FROM snapshots ORDER BY seq DESC LIMIT 1").fetchone()
+        seq, state = (row[0], json.loads(row[1])) if row else (0, empty())
+        snapped = seq
+        for seq, ts, kind, data in self.db.execute("SELECT seq, ts, kind, data FROM events WHERE seq > ? ORDER BY seq", (seq,)):
+            apply(state, ts, kind, json.loads(data))
+        return state, seq, snapped, (time.perf_counter() - t) * 1000
+
+    def record(self, kind, data, ts=None):
+        ts = time.time() if ts is None else ts
+        with self.lock:
+            self.seq += 1
+            apply(self.state, ts, kind, data)
+            self.queue.put((self.seq, ts, kind, json.dumps(data)))
+        return self.seq
+
+    def recover(self, ts=None):
+        """The recovered state: open positions, settings, bot flag, and today's realized P&L (0 on a new day)."""
+        with self.lock:
+            state = json.loads(json.dumps(self.state))
+        if state['day'] != day(time.time() if ts is None else ts): state['daily_pnl'] = 0.0
+        return state
+
+    # --- writer ---
+    def flush(self):
+        batch = []
+        with self.lock:
+            while True:
+                try: batch.append(self.queue.get_nowait())
+                except queue.Empty: break
+            snap = json.dumps(self.state) if batch and self.seq - self.snapped >= self.snap_every else None
+            seq = self.seq
+        if not batch: return 0
+        with self.dblock, self.db, perf.timer("journal_flush"):
+            self.db.execute("BEGIN")
+            self.db.executemany("INSERT INTO events VALUES (?, ?, ?, ?)", batch)
+            if snap is not None:
+                self.db.execute("INSERT INTO snapshots VALUES (?, ?, ?)", (seq, time.time(), snap))
+                self.db.execute("DELETE FROM snapshots WHERE seq < ?", (seq,))
+        if snap is not None: self.snapped = seq
+        self.written = batch[-1][0]
+        return len(batch)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_every): self.flush()
+        self.flush()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="journal")
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None: self._thread.join()
+        else: self.flush()
+
+    def events(self, since=0, kinds=None):
+        """Journal rows after `since` as (seq, ts, kind, data), oldest first."""
+        with self.dblock:
+            rows = self.db.execute("SELECT seq, ts, kind, data FROM events WHERE seq > ? ORDER BY seq", (since,)).fetchall()
+        return [(s, ts, k, json.loads(d)) for s, ts, k, d in rows if not kinds or k in kinds]
+
+def _adopted(r, token, qty):
+    price = float(r.get('buyavgprice') or r.get('avgnetprice') or r.get('ltp') or 0)
+    return {"display": r.get('tradingsymbol'), "entry": price, "qty": qty, "type": "REAL",
+            "token": token, "exch": r.get('exchange'), "ltp": float(r.get('ltp') or price)}
+
+def reconcile(local, broker, ours=None):
+    """Differences between the bot's REAL positions ({token: position}) and a SmartAPI position() payload.
+
+    Returns [(action, data)]: "drop" for a position the broker no longer holds, "resize" when the quantities
+    differ, "adopt" for a long broker position in a token the bot placed orders for (`ours`; None = any) but
+    does not know about, and "skip" for one it must leave alone: a short, or a manual/other-strategy position.
+    """
+    held, skip = {}, []
+    for r in broker or []:
+        qty, token = int(float(r.get('netqty') or 0)), str(r.get('symboltoken'))
+        if not qty: continue
+        if qty > 0 and (ours is None or token in ours or token in local): held[token] = (qty, r)
+        else: skip.append(("skip", _adopted(r, token, qty)))
+    out = []
+    for token, p in local.items():
+        if token not in held: out.append(("drop", p))
+        elif held[token][0] != p['qty']: out.append(("resize", dict(p, qty=held[token][0])))
+    out += [("adopt", _adopted(r, token, qty)) for token, (qty, r) in held.items() if token not in local]
+    return out + skip
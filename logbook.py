@@ -0,0 +1,140 @@
+# --- LOGBOOK: structured log records in a fixed ring, batched to rotating JSONL files by a writer thread ---
+import json
+import os
+import threading
+import time
+from collections import deque
+import clock
+import perf
+from instruments import CACHE_DIR
+
+FIELDS = ("seq", "ts", "level", "symbol", "event", "msg", "latency_ms")
+
+def line(rec):
+    """The classic "[HH:MM:SS] [LEVEL] msg" rendering, in IST."""
+    return f"[{time.strftime('%H:%M:%S', time.gmtime(rec['ts'] + clock.IST_OFFSET))}] [{rec['level']}] {rec['msg']}"
+
+class LogBook:
+    """The last `capacity` records in memory; every record also goes to disk through a background writer.
+
+    `append` is O(1) and does no I/O or time-zone work: it stores a tuple in the ring and queues it. The writer
+    flushes the queue every `flush_every` seconds into numbered JSONL files, starting a new one past `max_bytes`
+    and deleting the oldest beyond `keep`. Sequence numbers continue across restarts, so `query` can serve the
+    newest records from the ring and older ones from disk, one file at a time.
+    """
+    def __init__(self, capacity=10000, root=os.path.join(CACHE_DIR, "logs"), max_bytes=8 << 20, keep=20, flush_every=1.0):
+        self.capacity, self.root, self.max_bytes, self.keep, self.flush_every = capacity, root, max_bytes, keep, flush_every
+        self.ring, self.queue, self.lock = [None] * capacity, deque(), threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self.seq = self.written = self._last_seq() + 1
+        self.file, self.size = None, 0
+        self._stop, self._thread = threading.Event(), None
+
+    def _files(self):
+        """Log files oldest first (names are the zero-padded seq of their first record)."""
+        return sorted(n for n in os.listdir(self.root) if n.endswith(".jsonl"))
+
+    def _last_seq(self):
+        for name in reversed(self._files()):
+            with open(os.path.join(self.root, name), 'rb') as f:
+                f.seek(max(0, os.fstat(f.fileno()).st_size - 65536))
+                lines = f.read().splitlines()
+            for raw in reversed(lines):
+                try: return json.loads(raw)["seq"]
+                except (ValueError, KeyError): continue
+        return -1
+
+    def append(self, level, msg, symbol=None, event=None, latency_ms=None, ts=None):
+        with self.lock:
+            rec = (self.seq, time.time() if ts is None else ts, level, symbol, event, msg, latency_ms)
+            self.ring[self.seq % self.capacity] = rec
+            self.seq += 1
+        self.queue.append(rec)
+        return rec[0]
+
+    def recent(self, n=100):
+        """Newest first, from memory only."""
+        with self.lock:
+            lo = max(self.seq - n, self.seq - self.capacity, 0)
+            return [dict(zip(FIELDS, self.ring[i % self.capacity])) for i in range(self.seq - 1, lo - 1, -1)
+                    if self.ring[i % self.capacity] is not None]
+
+    # --- disk ---
+    def flush(self):
+        batch = []
+        while self.queue: batch.append(self.queue.popleft())
+        if batch:
+            with perf.timer("log_flush"): self._write(batch)
+        return len(batch)
+
+    def _write(self, batch):
+        for i in range(0, len(batch), 1000):
+            chunk = batch[i:i + 1000]
+            if self.file is None or self.size >= self.max_bytes:
+                if self.file is not None: self.file.close()
+                self.file = open(os.path.join(self.root, f"{chunk[0][0]:012d}.jsonl"), 'a', encoding='utf-8')
+                self.size = self.file.tell()
+                self._prune()
+            data = "".join(json.dumps(dict(zip(FIELDS, r)), separators=(',', ':')) + "\n" for r in chunk)
+            self.file.write(data)
+            self.file.flush()
+            self.size += len(data)
+            self.written = chunk[-1][0] + 1
+
+    def _prune(self):
+        files = self._files()
+        for name in files[:max(0, len(files) - self.keep)]: os.remove(os.path.join(self.root, name))
+
+    def _run(self):
+        while not self._stop.wait(self.flush_every): self.flush()
+        self.flush()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="logbook")
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None: self._thread.join()
+        if self.file is not None: self.file.close()
+        self.file = None
+
+    # --- read side ---
+    def _disk(self, below):
+        """Records with seq < `below`, newest first, holding one file in memory at a time."""
+        for name in reversed(self._files()):
+            if int(name[:-6]) >= below: continue
+            with open(os.path.join(self.root, name), 'rb') as f:
+                lines = f.read().splitlines()
+            for raw in reversed(lines):
+                try: rec = json.loads(raw)
+                except ValueError: continue  # a torn last line from a crash
+                if rec["seq"] < below: yield rec
+
+    def records(self, levels=None, symbol=None, text=None, since=None, until=None):
+        """Every matching record, newest first: the ring, then the files. A generator, so paging stops early."""
+        with self.lock:
+            mem = [r for r in (self.ring[i % self.capacity] for i in range(self.seq - 1, max(self.seq - self.capacity, 0) - 1, -1))
+                   if r is not None]
+        text = text.lower() if text else None
+        def keep(r):
+            return ((not levels or r['level'] in levels) and (not symbol or r['symbol'] == symbol)
+                    and (not text or text in r['msg'].lower()) and (since is None or r['ts'] >= since)
+                    and (until is None or r['ts'] < until))
+        for r in mem:
+            r = dict(zip(FIELDS, r))
+            if since is not None and r['ts'] < since: return
+            if keep(r): yield r
+        for r in self._disk(mem[-1][0] if mem else self.seq):
+            if since is not None and r['ts'] < since: return
+            if keep(r): yield r
+
+    def query(self, page=0, size=100, **filters):
+        """One page (newest first) of the filtered history, and whether an older page exists."""
+        out = []
+        for i, r in enumerate(self.records(**filters)):
+            if i >= page * size: out.append(r)
+            if len(out) > size: break
+        return out[:size], len(out) > size
@@ -0,0 +1,120 @@
+# --- MARKET DATA FETCH: batched / concurrent bar downloads with per-symbol deadlines ---
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, wait
+import numpy as np
+import pandas as pd
+import perf
+
+INTERVAL_MIN = {"1m": 1, "3m": 3, "5m": 5, "15m": 15, "30m": 30, "1h": 60, "60m": 60, "1d": 1440}
+
+def _flat(df):
+    if isinstance(df.columns, pd.MultiIndex): df.columns = df.columns.get_level_values(0)
+    return df
+
+class YFinanceSource:
+    """yfinance provider; `fetch_many` issues one multi-ticker request per chunk."""
+    def __init__(self, timeout=5):
+        self.timeout = timeout
+
+    def fetch(self, code, interval, period="5d", start=None):
+        import yfinance as yf
+        kw = {"start": start} if start is not None else {"period": period}
+        return _flat(yf.download(code, interval=interval, progress=False, timeout=self.timeout, **kw))
+
+    def fetch_many(self, codes, interval, period="5d", start=None):
+        import yfinance as yf
+        kw = {"start": start} if start is not None else {"period": period}
+        df = yf.download(codes, interval=interval, group_by="ticker", threads=True, progress=False,
+                         timeout=self.timeout, **kw)
+        out = {}
+        for code in codes:
+            if isinstance(df.columns, pd.MultiIndex):
+                if code not in df.columns.get_level_values(0): continue
+                sub = df[code].dropna(how="all")
+            else: sub = df.dropna(how="all")
+            if not sub.empty: out[code] = sub
+        return out
+
+class StubSource:
+    """Offline stand-in: seeded random-walk bars per code with configurable latency and failures."""
+    def __init__(self, latency=0.05, jitter=0.0, slow=(), slow_latency=30.0, fail=(), bars=375, per_symbol=0.002, seed=0):
+        self.latency, self.jitter, self.slow, self.slow_latency = latency, jitter, set(slow), slow_latency
+        self.fail, self.bars, self.per_symbol, self.seed = set(fail), bars, per_symbol, seed
+
+    def _sleep(self, code, base):
+        if code in self.fail: raise ConnectionError(f"stub failure for {code}")
+        rng = np.random.default_rng(zlib.crc32(code.encode()) + self.seed)
+        time.sleep(self.slow_latency if code in self.slow else base + self.jitter * rng.random())
+
+    def frame(self, code, interval, end=None):
+        rng = np.random.default_rng(zlib.crc32(code.encode()) + self.seed)
+        step = pd.Timedelta(minutes=INTERVAL_MIN.get(interval, 1))
+        end = pd.Timestamp(end if end is not None else "2026-01-02 15:29", tz="Asia/Kolkata").floor(step)
+        idx = pd.date_range(end=end, periods=self.bars, freq=step)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, self.bars)))
+        opn = np.r_[close[0], close[:-1]]
+        wick = np.abs(rng.normal(0, 0.0005, (2, self.bars))) * close
+        return pd.DataFrame({"Open": opn, "High": np.maximum(opn, close) + wick[0], "Low": np.minimum(opn, close) - wick[1],
+                             "Close": close, "Volume": rng.integers(1_000, 50_000, self.bars).astype(float)}, index=idx)
+
+    def fetch(self, code, interval, period="5d", start=None):
+        self._sleep(code, self.latency)
+        df = self.frame(code, interval)
+        return df[df.index >= start] if start is not None else df
+
+    def fetch_many(self, codes, interval, period="5d", start=None):
+        if self.slow & set(codes): time.sleep(self.slow_latency)
+        time.sleep(self.latency + self.per_symbol * len(codes))
+        out = {c: self.frame(c, interval) for c in codes if c not in self.fail}
+        return {c: df[df.index >= start] for c, df in out.items()} if start is not None else out
+
+class FetchResult:
+    def __init__(self):
+        self.frames, self.errors, self.elapsed = {}, {}, 0.0
+
+def _run(source, group, interval, period, start):
+    with perf.timer("fetch"):
+        if len(group) == 1:
+            df = source.fetch(group[0], interval, period, start=start)
+            return {group[0]: df} if df is not None and not df.empty else {}
+        return source.fetch_many(group, interval, period, start=start)
+
+def _groups(codes, chunk, starts):
+    # Codes without a stored tail need the full period, so they never share a request with delta fetches.
+    fresh = [c for c in codes if starts.get(c) is None]
+    delta = sorted((c for c in codes if starts.get(c) is not None), key=starts.get)
+    out = []
+    for part in (fresh, delta):
+        size = chunk or 1
+        out += [part[i:i + size] for i in range(0, len(part), size)]
+    return out
+
+def fetch_bars(codes, interval, source=None, period="5d", workers=8, deadline=8.0, chunk=0, starts=None):
+    """Fetch every code concurrently; whatever has not arrived by `deadline` seconds is reported, not awaited.
+
+    chunk > 0 groups codes into multi-ticker requests (source.fetch_many); chunk == 0 is one request per code.
+    `starts` maps code -> timestamp to fetch only bars at/after it (a grouped request uses the earliest).
+    """
+    source = source or YFinanceSource()
+    res, t0 = FetchResult(), time.perf_counter()
+    codes, starts = list(dict.fromkeys(codes)), starts or {}
+    if not codes: return res
+    groups = _groups(codes, chunk if hasattr(source, "fetch_many") else 0, starts)
+    pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(groups))), thread_name_prefix="fetch")
+    futs = {pool.submit(_run, source, g, interval, period, min((starts[c] for c in g if starts.get(c) is not None), default=None)): g
+            for g in groups}
+    done, pending = wait(futs, timeout=deadline)
+    for f in done:
+        try: res.frames.update(f.result())
+        except Exception as e:
+            perf.error("fetch", e)
+            for c in futs[f]: res.errors[c] = repr(e)
+    for f in pending:
+        perf.error("fetch_timeout")
+        for c in futs[f]: res.errors[c] = "timeout"
+    pool.shutdown(wait=False, cancel_futures=True)
+    for c in codes:
+        if c not in res.frames and c not in res.errors: res.errors[c] = "empty"
+    res.elapsed = time.perf_counter() - t0
+    return res
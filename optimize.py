@@ -0,0 +1,116 @@
+# --- OPTIMIZER: grid / random parameter sweeps of the backtester on a process pool, with walk-forward folds ---
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import backtest
+import barstore
+import strategies
+
+# Example space around the live defaults; lists are grid values, (lo, hi) tuples are ranges for `sample`.
+SPACE = {
+    "ema_fast": [5, 9, 13], "ema_slow": [21, 34, 50], "rsi_buy": [55, 60], "rsi_sell": [40, 45],
+    "target_pct": [1.0, 2.0, 3.0], "sl_pct": [0.5, 1.0, 1.5],
+}
+
+def grid(space):
+    keys = list(space)
+    return [dict(zip(keys, vals)) for vals in itertools.product(*(space[k] for k in keys))]
+
+def sample(space, n, seed=0):
+    """n random combos; (lo, hi) ranges draw ints when both ends are ints, floats (2 dp) otherwise."""
+    rng = random.Random(seed)
+    def draw(v):
+        if isinstance(v, tuple):
+            lo, hi = v
+            return rng.randint(lo, hi) if isinstance(lo, int) and isinstance(hi, int) else round(rng.uniform(lo, hi), 2)
+        return rng.choice(v)
+    return [{k: draw(v) for k, v in space.items()} for _ in range(n)]
+
+def walk_forward(t0, t1, folds=4, anchored=False):
+    """[(train_lo, train_hi, test_lo, test_hi)] over folds+1 equal blocks: train on block i (or 0..i), test on i+1."""
+    edges = np.linspace(t0, t1 + 1, folds + 2).astype('int64')
+    return [(int(edges[0] if anchored else edges[i]), int(edges[i + 1]), int(edges[i + 1]), int(edges[i + 2]))
+            for i in range(folds)]
+
+# --- worker side: bars come from the store's memory-mapped files, never through the task pickles ---
+_ctx = {}
+
+def _init(root, universe):
+    _ctx.update(store=barstore.BarStore(root), universe=universe, bars={}, cache={})
+
+def _bars(code, type_, interval):
+    key = (code, interval)
+    if key not in _ctx['bars']:
+        _ctx['bars'][key] = backtest.resample(_ctx['store'].records(code, "1m"), interval, type_)
+    return _ctx['bars'][key]
+
+def _aggregate(results, capital):
+    pnl = np.concatenate([r.trades["pnl"].to_numpy() for r in results if len(r.trades)] or [np.zeros(0)])
+    wins, losses = pnl[pnl > 0].sum(), -pnl[pnl < 0].sum()
+    sharpe = [r.metrics['sharpe'] for r in results]
+    return {"trades": len(pnl), "pnl": float(pnl.sum()), "return_pct": float(pnl.sum() / (capital * len(results)) * 100),
+            "win_rate": float((pnl > 0).mean() * 100) if len(pnl) else 0.0,
+            "profit_factor": float(wins / losses) if losses else float("inf") if wins else 0.0,
+            "max_dd": float(sum(r.metrics['max_dd'] for r in results)), "sharpe": float(np.mean(sharpe)) if sharpe else 0.0}
+
+def evaluate(task):
+    """(i, strategy, params, windows) -> (i, [metrics per window]) summed over the universe."""
+    i, strategy, params, windows = task
+    p = dict(backtest.PARAMS, **params)
+    s = strategies.get(strategy)
+    per = [[] for _ in windows]
+    for code, type_ in _ctx['universe']:
+        b = _bars(code, type_, s.interval)
+        if not len(b): continue
+        with np.errstate(invalid='ignore'):
+            sig = backtest.RULES[s.key](backtest.features(b, p, s.features, _ctx['cache'].setdefault((code, s.interval), {})), p)
+        for w, (lo, hi) in enumerate(windows):
+            a, z = np.searchsorted(b['ts'], [lo, hi])
+            per[w].append(backtest.simulate(b[a:z], sig[a:z], type_, p, s.interval))
+    return i, [_aggregate(r, p['capital']) for r in per]
+
+class OptimizeResult:
+    def __init__(self, table, walk):
+        self.table, self.walk = table, walk
+
+def optimize(watchlist, strategy, combos=None, space=SPACE, n=None, rank_by="sharpe", folds=0, anchored=False,
+             workers=None, store=None, since=None, until=None, seed=0):
+    """Backtest every combo (the grid of `space`, `n` random draws, or explicit `combos`) over the watchlist.
+
+    `table` has one row per combo with its full-range metrics, best first by `rank_by` (a metric or list of
+    metrics, higher is better; max_dd is negative). With `folds`, `walk` holds, per fold, the combo that ranked
+    best on the training block and its metrics on the next, unseen block.
+    """
+    store = store or barstore.BarStore()
+    combos = combos if combos is not None else sample(space, n, seed) if n else grid(space)
+    universe = [(x['code'], x['type']) for x in watchlist]
+    ts = [store.records(c, "1m")['ts'] for c, _ in universe]
+    ts = [t for t in ts if len(t)]
+    if not ts: raise ValueError("no stored 1m bars for the watchlist")
+    t0 = int(pd.Timestamp(since).timestamp()) if since is not None else int(min(t[0] for t in ts))
+    t1 = int(pd.Timestamp(until).timestamp()) if until is not None else int(max(t[-1] for t in ts))
+    splits = walk_forward(t0, t1, folds, anchored) if folds else []
+    windows = [(t0, t1 + 1)] + [w for lo, mid, _, hi in splits for w in ((lo, mid), (mid, hi))]
+    tasks = [(i, strategy, c, windows) for i, c in enumerate(combos)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init(store.root, universe)
+        out = list(map(evaluate, tasks))
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init, initargs=(store.root, universe)) as pool:
+            out = list(pool.map(evaluate, tasks, chunksize=max(1, len(tasks) // (workers * 8))))
+    out.sort(key=lambda x: x[0])
+    rank_by = [rank_by] if isinstance(rank_by, str) else list(rank_by)
+    table = pd.DataFrame([{**combos[i], **m[0]} for i, m in out]).sort_values(rank_by, ascending=False)
+
+    walk = []
+    for f, (lo, mid, _, hi) in enumerate(splits):
+        train = pd.DataFrame([m[1 + 2 * f] for _, m in out]).sort_values(rank_by, ascending=False)
+        best = int(train.index[0])
+        walk.append({"fold": f, "train_from": pd.Timestamp(lo, unit='s', tz='UTC'), "test_to": pd.Timestamp(hi, unit='s', tz='UTC'),
+                     **combos[best], **{f"train_{k}": v for k, v in out[best][1][1 + 2 * f].items()},
+                     **{f"test_{k}": v for k, v in out[best][1][2 + 2 * f].items()}})
+    return OptimizeResult(table.reset_index(drop=True), pd.DataFrame(walk))
@@ -0,0 +1,189 @@
+# --- OPTION CHAINS: per-underlying strike ladders built from the instrument snapshot, priced with Black-Scholes ---
+from bisect import bisect_left
+from datetime import datetime, time as dtime
+import numpy as np
+import clock
+
+RATE = 0.065        # annual risk-free rate (91-day T-bill) for index options
+DEFAULT_VOL = 0.15  # used when neither a live premium nor enough bar history gives a volatility
+YEAR = 365 * 86400
+SQRT_2PI = np.sqrt(2 * np.pi)
+
+# --- PRICING: vectorized Black-Scholes, implied volatility and Greeks (numpy only) ---
+def norm_pdf(x):
+    return np.exp(-0.5 * x * x) / SQRT_2PI
+
+def norm_cdf(x):
+    """Standard normal CDF by Abramowitz & Stegun 26.2.17 (|error| < 7.5e-8), elementwise."""
+    x = np.asarray(x, dtype='float64')
+    z = np.abs(x)
+    t = 1 / (1 + 0.2316419 * z)
+    p = 1 - norm_pdf(z) * t * (0.319381530 + t * (-0.356563782 + t * (1.781477937 + t * (-1.821255978 + t * 1.330274429))))
+    return np.where(x >= 0, p, 1 - p)
+
+def _inputs(spot, strike, t, vol):
+    # A floor of one minute to expiry and 0.01% vol keeps d1/d2 finite at expiry and for zero-vol quotes.
+    spot, strike, t, vol = np.broadcast_arrays(*(np.asarray(a, dtype='float64') for a in (spot, strike, t, vol)))
+    return spot, strike, np.maximum(t, 60 / YEAR), np.maximum(vol, 1e-4)
+
+def _d1d2(spot, strike, t, vol, rate):
+    sd = vol * np.sqrt(t)
+    d1 = (np.log(spot / strike) + (rate + 0.5 * vol * vol) * t) / sd
+    return d1, d1 - sd
+
+def price(spot, strike, t, vol, call=True, rate=RATE):
+    """Premium per unit; arguments broadcast, `t` in years, `call` a bool or bool array (False = put)."""
+    spot, strike, t, vol = _inputs(spot, strike, t, vol)
+    d1, d2 = _d1d2(spot, strike, t, vol, rate)
+    disc = strike * np.exp(-rate * t)
+    c = spot * norm_cdf(d1) - disc * norm_cdf(d2)
+    return np.where(call, c, c - spot + disc)  # put-call parity
+
+def greeks(spot, strike, t, vol, call=True, rate=RATE):
+    """{price, delta, gamma, theta, vega} arrays from one pass: theta per calendar day, vega per vol point."""
+    spot, strike, t, vol = _inputs(spot, strike, t, vol)
+    d1, d2 = _d1d2(spot, strike, t, vol, rate)
+    sqt, pdf, n1, n2 = np.sqrt(t), norm_pdf(d1), norm_cdf(d1), norm_cdf(d2)
+    disc = strike * np.exp(-rate * t)
+    c = spot * n1 - disc * n2
+    decay = -spot * pdf * vol / (2 * sqt)
+    return {"price": np.where(call, c, c - spot + disc), "delta": np.where(call, n1, n1 - 1),
+            "gamma": pdf / (spot * vol * sqt), "vega": spot * pdf * sqt / 100,
+            "theta": np.where(call, decay - rate * disc * n2, decay + rate * disc * (1 - n2)) / 365}
+
+def implied_vol(premium, spot, strike, t, call=True, rate=RATE, tol=1e-6, iters=60):
+    """Volatility that reprices each premium, for a whole chain at once.
+
+    Newton steps inside a shrinking [lo, hi] bracket: the premium rises with vol, so every evaluation tightens
+    one side, and a step that leaves the bracket (or a vanishing vega) falls back to bisection. A contract
+    converges when its model premium is within `tol`; NaN where the premium is outside the no-arbitrage bounds
+    (or within `tol` of intrinsic) and where the bracket collapses first, i.e. the premium barely moves with vol.
+    """
+    spot, strike, t, _ = _inputs(spot, strike, t, 0.0)
+    arrays = np.broadcast_arrays(spot, strike, t, np.asarray(premium, dtype='float64'), np.asarray(call))
+    shape = arrays[0].shape
+    spot, strike, t, premium, call = (a.ravel() for a in arrays)
+    disc = strike * np.exp(-rate * t)
+    lower = np.where(call, np.maximum(spot - disc, 0), np.maximum(disc - spot, 0))
+    ok = (premium > lower + tol) & (premium < np.where(call, spot, disc))
+    solved = np.zeros(spot.shape, dtype=bool)
+    lo, hi = np.full(spot.shape, 1e-4), np.full(spot.shape, 5.0)
+    vol = np.clip(np.sqrt(2 * np.pi / t) * premium / spot, 0.01, 2.0)  # Brenner-Subrahmanyam start
+    act = np.flatnonzero(ok)  # contracts still iterating; converged ones drop out of the arrays
+    for _ in range(iters):
+        if not len(act): break
+        s, k, tt, v, dk = spot[act], strike[act], t[act], vol[act], disc[act]
+        d1, d2 = _d1d2(s, k, tt, v, rate)
+        c = s * norm_cdf(d1) - dk * norm_cdf(d2)
+        diff = np.where(call[act], c, c - s + dk) - premium[act]
+        done = np.abs(diff) <= tol
+        solved[act[done]] = True
+        h, l = np.where(diff > 0, v, hi[act]), np.where(diff < 0, v, lo[act])
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'): step = v - diff / (s * norm_pdf(d1) * np.sqrt(tt))
+        vol[act] = np.where(done, v, np.where((step > l) & (step < h), step, 0.5 * (l + h)))  # solved rows keep v
+        hi[act], lo[act] = h, l
+        act = act[~done & (h - l > 1e-6)]
+    return np.where(ok & solved, vol, np.nan).reshape(shape)
+
+def years_to(expiry, now=None):
+    """Years from `now` (epoch seconds, default the market clock) to 15:30 IST on the expiry date."""
+    close = clock.IST.localize(datetime.combine(expiry, dtime(15, 30))).timestamp()
+    return max(close - (clock.epoch() if now is None else now), 60) / YEAR
+
+def realized_vol(close, per_year=375 * 252):
+    """Annualized close-to-close volatility of a bar series (1m bars: 375 a session, 252 sessions)."""
+    close = np.asarray(close, dtype='float64')
+    close = close[np.isfinite(close) & (close > 0)]
+    if len(close) < 30: return None
+    return float(np.std(np.diff(np.log(close))) * np.sqrt(per_year))
+
+# --- CHAINS ---
+
+class OptionChain:
+    """Sorted strikes per expiry with CE/PE (token, symbol) pairs; ATM and ±k ladders are a bisect away."""
+    def __init__(self, name, df, seg='NFO', itype='OPTIDX'):
+        self.name = name
+        sub = df[(df['name'] == name) & (df['exch_seg'] == seg) & (df['instrumenttype'] == itype) & df['strike'].notna()]
+        opt = sub['symbol'].str[-2:]
+        self.expiries, self.strikes, self.legs = [], {}, {}
+        for exp, grp in sub.groupby(sub['expiry'].dt.date, sort=True):
+            strikes = np.unique(grp['strike'].to_numpy())
+            legs = {}
+            for ot in ("CE", "PE"):
+                side = grp[opt.loc[grp.index] == ot]
+                pos = np.searchsorted(strikes, side['strike'].to_numpy())
+                tokens, symbols = [None] * len(strikes), [None] * len(strikes)
+                for i, tok, sym in zip(pos, side['token'].tolist(), side['symbol'].tolist()):
+                    tokens[i], symbols[i] = str(tok), sym
+                legs[ot] = (tokens, symbols)
+            self.expiries.append(exp)
+            self.strikes[exp], self.legs[exp] = strikes, legs
+
+    def expiry(self, skip=0, today=None):
+        i = bisect_left(self.expiries, today or clock.now().date()) + skip
+        return self.expiries[i] if i < len(self.expiries) else None
+
+    def atm_index(self, spot, exp):
+        strikes = self.strikes[exp]
+        i = int(np.searchsorted(strikes, spot))
+        if i == len(strikes) or (i > 0 and spot - strikes[i - 1] <= strikes[i] - spot): i -= 1
+        return i
+
+    def contract(self, spot, opt, steps=0, skip=0, today=None):
+        """(token, symbol, strike) `steps` strikes out of the money from ATM (negative = in the money)."""
+        exp = self.expiry(skip, today)
+        if exp is None: return None
+        i = self.atm_index(spot, exp) + (steps if opt == "CE" else -steps)
+        if not 0 <= i < len(self.strikes[exp]): return None
+        tokens, symbols = self.legs[exp][opt]
+        if tokens[i] is None: return None
+        return tokens[i], symbols[i], float(self.strikes[exp][i])
+
+    def ladder(self, spot, k=5, skip=0, today=None, vol=None, now=None, rate=RATE):
+        """ATM ± k strikes for one expiry, each row carrying both legs and their moneyness.
+
+        With `vol`, both legs of every row are also priced in one vectorized pass: ce_/pe_ price, delta and
+        theta, plus the shared gamma and vega.
+        """
+        exp = self.expiry(skip, today)
+        if exp is None: return []
+        strikes, legs = self.strikes[exp], self.legs[exp]
+        atm = self.atm_index(spot, exp)
+        lo, hi = max(atm - k, 0), min(atm + k + 1, len(strikes))
+        rows = []
+        for i in range(lo, hi):
+            s = float(strikes[i])
+            rows.append({
+                "expiry": exp, "strike": s, "offset": i - atm,
+                "ce_token": legs["CE"][0][i], "ce_symbol": legs["CE"][1][i],
+                "pe_token": legs["PE"][0][i], "pe_symbol": legs["PE"][1][i],
+                "ce_state": "ATM" if i == atm else "ITM" if s < spot else "OTM",
+                "pe_state": "ATM" if i == atm else "ITM" if s > spot else "OTM",
+            })
+        if vol is not None and rows:
+            n = hi - lo
+            g = greeks(spot, np.tile(strikes[lo:hi], 2), years_to(exp, now), vol, np.arange(2 * n) < n, rate)
+            for j, r in enumerate(rows):
+                r.update(iv=float(vol), gamma=float(g['gamma'][j]), vega=float(g['vega'][j]))
+                for leg, at in (("ce", j), ("pe", n + j)):
+                    r.update({f"{leg}_price": float(g['price'][at]), f"{leg}_delta": float(g['delta'][at]),
+                              f"{leg}_theta": float(g['theta'][at])})
+        return rows
+
+    def atm_iv(self, spot, ltp, skip=0, today=None, now=None, rate=RATE):
+        """Mean implied vol of the ATM CE and PE from `ltp(token)` (live premiums), or None without quotes."""
+        exp = self.expiry(skip, today)
+        if exp is None: return None
+        i = self.atm_index(spot, exp)
+        quotes = [(ltp(self.legs[exp][ot][0][i]), ot == "CE") for ot in ("CE", "PE") if self.legs[exp][ot][0][i]]
+        quotes = [(p, c) for p, c in quotes if p]
+        if not quotes: return None
+        iv = implied_vol([p for p, _ in quotes], spot, float(self.strikes[exp][i]), years_to(exp, now), [c for _, c in quotes], rate)
+        iv = iv[np.isfinite(iv)]
+        return float(iv.mean()) if len(iv) else None
+
+def pick(band, opt, delta):
+    """The band row whose `opt` leg has |delta| closest to `delta` (0.5 ~ ATM, lower = further OTM)."""
+    key = f"{opt.lower()}_delta"
+    rows = [r for r in band if key in r and r[f"{opt.lower()}_token"]]
+    return min(rows, key=lambda r: abs(abs(r[key]) - delta)) if rows else None
@@ -0,0 +1,205 @@
+# --- ORDER GATEWAY: queued, rate-limited, idempotently retried broker orders with submit->ack latency ---
+import itertools
+import queue
+import random
+import threading
+import time
+from collections import deque
+import numpy as np
+import perf
+
+RATE, BURST = 10.0, 5  # SmartAPI allows ~20 order calls/s; burst + one second of refill stays under it
+RETRIES, BACKOFF = 3, 0.25
+TAG_PREFIX = "mb"  # every ordertag the bot sends starts with this; reconcile adopts only what it placed
+
+class TransientError(Exception):
+    """A broker/network failure after which the same order may be sent again."""
+
+class TokenBucket:
+    def __init__(self, rate=RATE, burst=BURST):
+        self.rate, self.burst, self.tokens, self.t = rate, burst, float(burst), time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until one call may be made."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.t) * self.rate)
+                self.t = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class Order:
+    __slots__ = ("tag", "params", "status", "attempts", "submitted", "acked", "orderid", "error", "on_done", "done")
+    def __init__(self, tag, params, on_done=None):
+        self.tag, self.params, self.on_done = tag, params, on_done
+        self.status, self.attempts, self.orderid, self.error = "QUEUED", 0, None, None
+        self.submitted, self.acked, self.done = time.perf_counter(), None, threading.Event()
+
+    @property
+    def latency(self):
+        return self.acked - self.submitted if self.acked is not None else None
+
+    def wait(self, timeout=None):
+        self.done.wait(timeout)
+        return self
+
+_seq = itertools.count()
+
+def new_tag():
+    # SmartAPI echoes `ordertag` (max 20 chars) in the order book; it is the idempotency key for retries.
+    return f"{TAG_PREFIX}{int(time.time()) % 100000000:08d}{next(_seq) % 100000:05d}"
+
+class OrderGateway:
+    """Orders go onto a queue and `workers` threads send them, each call paced by a shared token bucket.
+
+    Exceptions are retried with backoff; before a retry the order book is checked for the order's tag so a
+    request that reached the broker but lost its reply is not placed twice. A None reply from placeOrder is a
+    reject and is not retried. `on_done(order)` runs on a worker thread once the order is ACK or FAIL.
+    """
+    def __init__(self, broker, rate=RATE, burst=BURST, workers=4, retries=RETRIES, backoff=BACKOFF):
+        self.broker, self.retries, self.backoff = broker, retries, backoff
+        self.bucket = TokenBucket(rate, burst)
+        self.q = queue.Queue()
+        self.orders = {}
+        self.latency = deque(maxlen=2000)  # seconds, submit -> ack
+        self.sent = self.retried = self.failed = 0
+        self._stop = threading.Event()
+        self.threads = [threading.Thread(target=self._work, daemon=True, name=f"orders-{i}") for i in range(workers)]
+        for t in self.threads: t.start()
+
+    def submit(self, params, on_done=None):
+        params = dict(params)
+        tag = params.setdefault("ordertag", new_tag())
+        order = self.orders[tag] = Order(tag, params, on_done)
+        self.q.put(order)
+        return order
+
+    def _find(self, tag):
+        try:
+            self.bucket.acquire()
+            with perf.timer("order_book"): book = self.broker.orderBook() or {}
+            return next((o.get("orderid") for o in book.get("data") or [] if o.get("ordertag") == tag), None)
+        except Exception as e:
+            perf.error("order_book", e)
+            return None
+
+    def _send(self, order):
+        while True:
+            order.attempts += 1
+            if order.attempts > 1:
+                time.sleep(self.backoff * 2 ** (order.attempts - 2) * (0.5 + random.random()))
+                orderid = self._find(order.tag)
+                if orderid: return orderid, None
+            self.bucket.acquire()
+            self.sent += 1
+            try:
+                with perf.timer("place_order"): orderid = self.broker.placeOrder(order.params)
+                return orderid, None if orderid else "rejected"
+            except Exception as e:
+                perf.error("place_order", e)
+                if order.attempts > self.retries: return None, repr(e)
+                self.retried += 1
+
+    def _work(self):
+        while not self._stop.is_set():
+            try: order = self.q.get(timeout=0.5)
+            except queue.Empty: continue
+            if self._stop.is_set():  # taken off the queue while stop() was draining it
+                order.error = "gateway stopped"
+                self._finish(order)
+                continue
+            order.status = "SENT"
+            try: order.orderid, order.error = self._send(order)
+            except Exception as e:
+                perf.error("order_send", e)
+                order.orderid, order.error = None, repr(e)
+            self._finish(order)
+
+    def _finish(self, order):
+        if order.orderid:
+            order.status, order.acked = "ACK", time.perf_counter()
+            self.latency.append(order.latency)
+        else:
+            order.status = "FAIL"
+            self.failed += 1
+        order.done.set()
+        if order.on_done:
+            try: order.on_done(order)
+            except Exception as e: perf.error("order_callback", e)
+
+    def stop(self):
+        """Stop the workers; orders still queued fail through `on_done` so no caller waits on them forever."""
+        self._stop.set()
+        while True:
+            try: order = self.q.get_nowait()
+            except queue.Empty: break
+            order.error = "gateway stopped"
+            self._finish(order)
+
+    def stats(self):
+        lat = np.array(self.latency)
+        out = {"orders": len(self.orders), "sent": self.sent, "retried": self.retried, "failed": self.failed,
+               "queued": self.q.qsize(), "n": len(lat)}
+        if len(lat):
+            p50, p99 = np.percentile(lat, [50, 99]) * 1000
+            out.update(p50_ms=float(p50), p99_ms=float(p99), max_ms=float(lat.max() * 1000))
+        return out
+
+class MockBroker:
+    """Offline placeOrder/orderBook stand-in with latency, a per-second cap and transient failures.
+
+    `lost` is the fraction of calls that place the order but raise as if the reply timed out, which is what the
+    gateway's ordertag lookup guards against.
+    """
+    def __init__(self, latency=0.05, jitter=0.02, cap=20, fail=0.0, lost=0.0, reject=0.0, seed=0):
+        self.latency, self.jitter, self.cap = latency, jitter, cap
+        self.fail, self.lost, self.reject = fail, lost, reject
+        self.rng = random.Random(seed)
+        self.book, self.calls, self.throttled = [], deque(), 0
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def _call(self):
+        with self.lock:
+            now = time.monotonic()
+            while self.calls and now - self.calls[0] > 1.0: self.calls.popleft()
+            if len(self.calls) >= self.cap:
+                self.throttled += 1
+                raise TransientError("Access denied because of exceeding access rate")
+            self.calls.append(now)
+            r = self.rng.random()
+        time.sleep(self.latency + self.jitter * self.rng.random())
+        return r
+
+    def placeOrder(self, params):
+        r = self._call()
+        if r < self.fail: raise TransientError("Couldn't connect to server")
+        if r < self.fail + self.reject: return None
+        with self.lock:
+            orderid = f"{next(self._ids):015d}"
+            self.book.append({"orderid": orderid, "ordertag": params.get("ordertag"), "tradingsymbol": params.get("tradingsymbol"),
+                              "symboltoken": params.get("symboltoken"), "exchange": params.get("exchange"),
+                              "quantity": params.get("quantity"), "transactiontype": params.get("transactiontype"),
+                              "price": params.get("price", 0), "status": "complete"})
+        if r < self.fail + self.reject + self.lost: raise TransientError("Read timed out")
+        return orderid
+
+    def orderBook(self):
+        self._call()
+        with self.lock: return {"status": True, "data": list(self.book)}
+
+    def position(self):
+        """Net quantity per instrument from the filled orders, shaped like SmartAPI's position()."""
+        self._call()
+        net = {}
+        with self.lock:
+            for o in self.book:
+                p = net.setdefault(o['symboltoken'], {"tradingsymbol": o['tradingsymbol'], "symboltoken": o['symboltoken'],
+                                                      "exchange": o['exchange'], "netqty": 0, "buyavgprice": float(o['price'] or 0)})
+                p['netqty'] += int(o['quantity'] or 0) * (1 if o['transactiontype'] == "BUY" else -1)
+        return {"status": True, "data": [dict(p, netqty=str(p['netqty'])) for p in net.values()]}
@@ -0,0 +1,136 @@
+# --- PERF: process-wide stage timers, counters and log-bucket latency histograms, exported as Prometheus text ---
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ENABLED = os.environ.get("MISHR_PERF", "1") != "0"
+SUB_BITS = 3  # 8 buckets per power of two: any recorded value is within 12.5% of its bucket's bounds
+PORT = int(os.environ.get("MISHR_METRICS_PORT", "9108"))
+
+class Histogram:
+    """HDR-style histogram of nanosecond values: exponent plus SUB_BITS of mantissa picks the bucket."""
+    __slots__ = ("counts", "n", "total", "max")
+    def __init__(self):
+        self.counts, self.n, self.total, self.max = [0] * (64 << SUB_BITS), 0, 0, 0
+
+    def record(self, ns):
+        e = ns.bit_length() - 1
+        i = ns if e < SUB_BITS else ((e - SUB_BITS + 1) << SUB_BITS) | ((ns >> (e - SUB_BITS)) & ((1 << SUB_BITS) - 1))
+        self.counts[i] += 1
+        self.n += 1
+        self.total += ns
+        if ns > self.max: self.max = ns
+
+    @staticmethod
+    def upper(i):
+        """Largest value that lands in bucket i."""
+        if i < 1 << SUB_BITS: return i
+        e, m = (i >> SUB_BITS) + SUB_BITS - 1, i & ((1 << SUB_BITS) - 1)
+        return (((1 << SUB_BITS) | m) + 1 << (e - SUB_BITS)) - 1
+
+    def quantile(self, q):
+        if not self.n: return 0
+        rank, seen = q * self.n, 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= rank: return min(self.upper(i), self.max)
+        return self.max
+
+class _Timer:
+    __slots__ = ("hist", "t")
+    def __init__(self, hist): self.hist = hist
+    def __enter__(self):
+        self.t = time.perf_counter_ns()
+        return self
+    def __exit__(self, *exc):
+        self.hist.record(time.perf_counter_ns() - self.t)
+
+class _Null:
+    def __enter__(self): return self
+    def __exit__(self, *exc): pass
+
+NULL = _Null()
+
+class Registry:
+    def __init__(self):
+        self.hists, self.counters, self.errors, self.last_error = {}, {}, {}, {}
+        self.lock = threading.Lock()
+        self.started = time.time()
+
+    def _hist(self, stage):
+        h = self.hists.get(stage)
+        if h is None:
+            with self.lock: h = self.hists.setdefault(stage, Histogram())
+        return h
+
+    def timer(self, stage):
+        """`with perf.timer("stage"):` records the block's wall time; a shared no-op when disabled."""
+        return _Timer(self._hist(stage)) if ENABLED else NULL
+
+    def observe(self, stage, seconds):
+        if ENABLED: self._hist(stage).record(int(seconds * 1e9))
+
+    def count(self, name, n=1):
+        if ENABLED:
+            with self.lock: self.counters[name] = self.counters.get(name, 0) + n
+
+    def error(self, stage, exc=None):
+        """Count a handled failure instead of dropping it silently; always on, errors are rare."""
+        with self.lock:
+            self.errors[stage] = self.errors.get(stage, 0) + 1
+            if exc is not None: self.last_error[stage] = repr(exc)[:200]
+
+    def stats(self):
+        """{stages: [{stage, n, mean_ms, p50_ms, p90_ms, p99_ms, max_ms}], counters, errors: [{stage, n, last}]}"""
+        with self.lock: hists = dict(self.hists)
+        stages = [{"stage": s, "n": h.n, "mean_ms": h.total / h.n / 1e6 if h.n else 0.0,
+                   **{f"p{int(q * 100)}_ms": h.quantile(q) / 1e6 for q in (0.5, 0.9, 0.99)}, "max_ms": h.max / 1e6}
+                  for s, h in sorted(hists.items())]
+        return {"stages": stages, "counters": dict(self.counters),
+                "errors": [{"stage": s, "n": n, "last": self.last_error.get(s, "")} for s, n in sorted(self.errors.items())]}
+
+    def prometheus(self):
+        out = ["# HELP mishr_stage_seconds Wall time per pipeline stage.", "# TYPE mishr_stage_seconds histogram"]
+        with self.lock: hists = dict(self.hists)
+        for s, h in sorted(hists.items()):
+            cum = 0
+            for i, c in enumerate(h.counts):
+                if not c: continue
+                cum += c
+                out.append(f'mishr_stage_seconds_bucket{{stage="{s}",le="{h.upper(i) / 1e9:.9g}"}} {cum}')
+            out.append(f'mishr_stage_seconds_bucket{{stage="{s}",le="+Inf"}} {h.n}')
+            out.append(f'mishr_stage_seconds_sum{{stage="{s}"}} {h.total / 1e9:.9g}')
+            out.append(f'mishr_stage_seconds_count{{stage="{s}"}} {h.n}')
+        out += ["# HELP mishr_events_total Pipeline event counters.", "# TYPE mishr_events_total counter"]
+        out += [f'mishr_events_total{{name="{k}"}} {v}' for k, v in sorted(self.counters.items())]
+        out += ["# HELP mishr_errors_total Handled failures per stage.", "# TYPE mishr_errors_total counter"]
+        out += [f'mishr_errors_total{{stage="{k}"}} {v}' for k, v in sorted(self.errors.items())]
+        out += ["# TYPE mishr_uptime_seconds gauge", f"mishr_uptime_seconds {time.time() - self.started:.3f}"]
+        return "\n".join(out) + "\n"
+
+    def serve(self, port=PORT, host="127.0.0.1"):
+        """GET /metrics on a daemon thread; returns the server, or None if the port is taken."""
+        reg = self
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = reg.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            def log_message(self, *args): pass
+        try: server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            self.error("metrics_server", e)
+            return None
+        threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+        return server
+
+REGISTRY = Registry()
+timer, observe, count, error = REGISTRY.timer, REGISTRY.observe, REGISTRY.count, REGISTRY.error
+stats, prometheus, serve = REGISTRY.stats, REGISTRY.prometheus, REGISTRY.serve
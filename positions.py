@@ -0,0 +1,96 @@
+# --- POSITION BOOK: open positions keyed by instrument, array-backed marks and sorted SL/target triggers ---
+from bisect import bisect_left, bisect_right, insort
+import numpy as np
+
+class PositionBook:
+    """Slots hold entry/qty/ltp in numpy columns so mark-to-market is one vector expression.
+
+    Each instrument keeps its stop levels and target levels in two sorted lists; a new price only visits the
+    levels it crossed (stops at or above it, targets at or below it), whatever the number of positions.
+    """
+    def __init__(self, sl_pct=1.0, target_pct=2.0, capacity=32):
+        self.sl_pct, self.target_pct = sl_pct, target_pct
+        self.entry, self.qty, self.ltp = np.zeros(capacity), np.zeros(capacity), np.zeros(capacity)
+        self.live = np.zeros(capacity, dtype=bool)
+        self.meta = [None] * capacity  # slot -> {display, token, exch, type}
+        self.slots, self.tokens = {}, {}  # display -> slot, token -> display
+        self.stops, self.targets = {}, {}  # display -> sorted [(level, slot)]
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self): return len(self.slots)
+    def __contains__(self, display): return display in self.slots
+
+    def _grow(self):
+        n = len(self.entry)
+        for name in ("entry", "qty", "ltp", "live"):
+            col = getattr(self, name)
+            setattr(self, name, np.concatenate([col, np.zeros(n, dtype=col.dtype)]))
+        self.meta += [None] * n
+        self.free = list(range(2 * n - 1, n - 1, -1)) + self.free
+
+    def _arm(self, display, slot):
+        e = self.entry[slot]
+        insort(self.stops.setdefault(display, []), (e * (1 - self.sl_pct / 100), slot))
+        insort(self.targets.setdefault(display, []), (e * (1 + self.target_pct / 100), slot))
+
+    def open(self, display, entry, qty, type_="PAPER", token=None, exch=None):
+        if not self.free: self._grow()
+        slot = self.free.pop()
+        self.entry[slot], self.qty[slot], self.ltp[slot], self.live[slot] = entry, qty, entry, True
+        self.meta[slot] = {"display": display, "token": token, "exch": exch, "type": type_}
+        self.slots[display] = slot
+        if token: self.tokens[token] = display
+        self._arm(display, slot)
+        return slot
+
+    def close(self, slot):
+        """Free the slot; returns the position dict with its final pnl."""
+        pos = self.position(slot)
+        d = pos['display']
+        self.stops[d] = [x for x in self.stops.get(d, []) if x[1] != slot]
+        self.targets[d] = [x for x in self.targets.get(d, []) if x[1] != slot]
+        if self.slots.get(d) == slot:
+            del self.slots[d]
+            if pos['token'] and self.tokens.get(pos['token']) == d: del self.tokens[pos['token']]
+        self.live[slot], self.meta[slot] = False, None
+        self.free.append(slot)
+        return pos
+
+    def clear(self):
+        return [self.close(s) for s in list(self.slots.values())]
+
+    def mark(self, display, price):
+        """Set the instrument's price; returns the slots whose stop or target it crossed."""
+        slot = self.slots.get(display)
+        if slot is None or not price: return []
+        self.ltp[slot] = price
+        stops, targets = self.stops.get(display, ()), self.targets.get(display, ())
+        hit = [s for _, s in stops[bisect_left(stops, (price, -1)):]]
+        hit += [s for _, s in targets[:bisect_right(targets, (price, len(self.entry)))]]
+        return hit
+
+    def mark_token(self, token, price):
+        d = self.tokens.get(token)
+        return self.mark(d, price) if d is not None else []
+
+    def retarget(self, sl_pct, target_pct):
+        self.sl_pct, self.target_pct, self.stops, self.targets = sl_pct, target_pct, {}, {}
+        for d, slot in self.slots.items(): self._arm(d, slot)
+        return [s for d, slot in self.slots.items() for s in self.mark(d, self.ltp[slot])]
+
+    def pnl(self):
+        """Unrealized pnl per slot (zero for free slots)."""
+        return np.where(self.live, (self.ltp - self.entry) * self.qty, 0.0)
+
+    def unrealized(self):
+        return float(self.pnl().sum())
+
+    def position(self, slot):
+        return dict(self.meta[slot], entry=float(self.entry[slot]), qty=int(self.qty[slot]), ltp=float(self.ltp[slot]),
+                    pnl=float((self.ltp[slot] - self.entry[slot]) * self.qty[slot]))
+
+    def rows(self):
+        return [self.position(s) for s in self.slots.values()]
+
+    def subscriptions(self):
+        return {(m['exch'], m['token']) for m in (self.meta[s] for s in self.slots.values()) if m['token']}
@@ -0,0 +1,194 @@
+# --- MARKET REPLAY: recorded or synthetic 1m bars through the live engine on a simulated clock ---
+import argparse
+import os
+import tempfile
+import time
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+import barstore
+import clock
+import engine
+import instruments
+import logbook
+import marketdata
+import orders
+import synthetic
+import ticks
+
+class ReplaySource:
+    """yfinance stand-in: serves the bars in `frames` that have closed by the SimClock's time, nothing later."""
+    def __init__(self, frames, sim):
+        self.frames, self.sim = frames, sim
+
+    def fetch(self, code, interval, period="5d", start=None):
+        df = self.frames.get(code)
+        if df is None: return pd.DataFrame()
+        step = marketdata.INTERVAL_MIN.get(interval, 1)
+        if step > 1:
+            df = df.resample(f"{step}min").agg({"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}).dropna()
+        df = df[df.index + pd.Timedelta(minutes=step) <= pd.Timestamp(self.sim.ts, unit='s', tz='UTC')]
+        return df[df.index >= start] if start is not None else df
+
+    def fetch_many(self, codes, interval, period="5d", start=None):
+        out = {c: self.fetch(c, interval, period, start) for c in codes}
+        return {c: df for c, df in out.items() if not df.empty}
+
+class ReplayFeed:
+    """SmartWebSocketV2 stand-in: the replay pushes ticks into the table and the engine's on_tick, in order."""
+    def __init__(self, on_tick):
+        self.table, self.on_tick, self.tokens, self.connected = ticks.TickTable(), on_tick, [], True
+
+    def push(self, token, tick):
+        self.table.put(token, tick)
+        self.on_tick(token, tick)
+
+    def set_tokens(self, tokens): self.tokens = list(tokens)
+    def stop(self): self.connected = False
+
+class SimGateway:
+    """OrderGateway stand-in that places each order inline, so its ack reaches the engine on the next step
+    and a replay never depends on worker-thread timing."""
+    def __init__(self, broker):
+        self.broker, self.orders, self.failed = broker, {}, 0
+
+    def submit(self, params, on_done=None):
+        params = dict(params)
+        tag = params.setdefault("ordertag", f"rp{len(self.orders) + 1:018d}")
+        order = self.orders[tag] = orders.Order(tag, params, on_done)
+        order.attempts = 1
+        try: order.orderid = self.broker.placeOrder(params)
+        except Exception as e: order.error = repr(e)
+        if order.orderid: order.status, order.acked = "ACK", order.submitted
+        else:
+            order.status, order.error = "FAIL", order.error or "rejected"
+            self.failed += 1
+        order.done.set()
+        if on_done: on_done(order)
+        return order
+
+    def stop(self): pass
+
+    def stats(self):
+        return {"orders": len(self.orders), "sent": len(self.orders), "retried": 0, "failed": self.failed, "queued": 0, "n": 0}
+
+def recorded(store, codes, day, warmup_days=engine.LOOKBACK_DAYS):
+    """{code: 1m frame} from a BarStore: `day` plus the warm-up history before it."""
+    end = pd.Timestamp(day, tz=clock.IST) + pd.Timedelta(days=1)
+    out = {}
+    for c in codes:
+        df = store.read(c, "1m", since=end - pd.Timedelta(days=warmup_days + 1))
+        if not df.empty: out[c] = df[df.index < end]
+    return out
+
+def _secs(df):
+    return df.index.as_unit('s').asi8
+
+def paths(df, n):
+    """n intrabar prices per bar: open, then the nearer extreme, the other extreme, close (linear between)."""
+    o, h, l, c = (df[k].to_numpy(dtype='float64') for k in ("Open", "High", "Low", "Close"))
+    up = c >= o
+    pts = np.stack([o, np.where(up, l, h), np.where(up, h, l), c], axis=1)
+    x = np.linspace(0, 3, n) if n > 1 else np.array([3.0])
+    i = np.minimum(x.astype(int), 2)
+    return pts[:, i] + (pts[:, i + 1] - pts[:, i]) * (x - i)
+
+class Replay:
+    """One TradingEngine driven minute by minute through `day` of `frames` ({code: 1m OHLCV, warm-up included}).
+
+    The SimClock is installed for the run, so check_market_time, log stamps and expiry choice follow the
+    replayed day. Each bar becomes `ticks_per_bar` ticks on its EQUITY/MCX contract, every tick is followed by
+    `engine.step(now)`, and the bar itself is served by ReplaySource once it has closed: the same sync ->
+    signals -> entry/exit code as live, single-threaded, so two runs of the same input log the same lines.
+    `speed` paces simulated time at that multiple of wall time (0 = as fast as possible).
+    """
+    def __init__(self, frames, watchlist=None, day=None, instr=None, ticks_per_bar=4, speed=0.0, real=False, **settings):
+        self.frames, self.ticks_per_bar, self.speed, self.real, self.settings = frames, ticks_per_bar, speed, real, settings
+        self.watchlist = [dict(x) for x in (watchlist or engine.WATCHLIST) if x['code'] in frames]
+        last = max(df.index[-1] for df in frames.values())
+        self.day = pd.Timestamp(day or last.tz_convert(clock.IST).date(), tz=clock.IST)
+        self.instr = instr if instr is not None else instruments.InstrumentIndex(instruments.compact(synthetic.master(
+            0, start=self.day.date() - timedelta(days=1), names=[x['symbol'] for x in self.watchlist if x['type'] == "EQUITY"])))
+        self.engine = None
+
+    def _build(self, sim):
+        root = tempfile.mkdtemp(prefix="replay")
+        eng = engine.TradingEngine(self.instr, store=barstore.BarStore(os.path.join(root, "bars")),
+                                   source=ReplaySource(self.frames, sim), scan_every=60,
+                                   logs=logbook.LogBook(capacity=100000, root=os.path.join(root, "logs")))
+        eng.watchlist = self.watchlist
+        feed, broker = ReplayFeed(eng._on_tick), orders.MockBroker(latency=0.0, jitter=0.0, cap=10 ** 9)
+        with eng.lock: eng.api, eng.stream, eng.orders = broker, feed, SimGateway(broker)
+        eng.configure(real_trade_active=self.real, **self.settings)
+        return eng, feed
+
+    def run(self):
+        lo, hi = self.day.timestamp(), (self.day + pd.Timedelta(days=1)).timestamp()
+        minutes = sorted({int(t) for df in self.frames.values() for t in _secs(df) if lo <= t < hi})
+        if not minutes: raise ValueError(f"no bars on {self.day.date()}")
+        sim = clock.use(clock.SimClock(minutes[0]))
+        try:
+            eng, feed = self._build(sim)
+            self.engine = eng
+            priced = {}  # token -> (per-minute intrabar prices, volume) for rows that trade their own bars
+            for x in self.watchlist:
+                if x['type'] not in ("EQUITY", "MCX"): continue
+                tok = eng.get_angel_token(x['symbol'], type_=x['type'])[0]
+                df = self.frames[x['code']]
+                df = df[(_secs(df) >= lo) & (_secs(df) < hi)]
+                if tok and not df.empty:
+                    priced[tok] = dict(zip(_secs(df).tolist(),
+                                           zip(paths(df, self.ticks_per_bar).tolist(), df['Volume'].cumsum().tolist())))
+            eng.step(minutes[0])
+            eng.start_bot()
+            t0, n = time.perf_counter(), 0
+            for m in minutes + [minutes[-1] + 60]:
+                for j in range(self.ticks_per_bar):
+                    now = m + 60 * j / self.ticks_per_bar
+                    if self.speed:
+                        time.sleep(max(0.0, t0 + (now - minutes[0]) / self.speed - time.perf_counter()))
+                    sim.set(now)
+                    for tok, bars in priced.items():
+                        if m in bars:
+                            px, vol = bars[m]
+                            feed.push(tok, ticks.Tick(round(px[j], 2), int(vol), int(now * 1000), time.time()))
+                    eng.step(now)
+                    n += 1
+            elapsed = time.perf_counter() - t0
+            eng.stop()
+        finally:
+            clock.use(None)
+        return {"day": str(self.day.date()), "bars": len(minutes), "steps": n, "elapsed": elapsed,
+                "trades": sum(1 for r in eng.logbook.recent(eng.logbook.capacity) if r['event'] == "exit"),
+                "daily_pnl": round(eng.daily_pnl, 2), "unrealized": round(eng.book.unrealized(), 2),
+                "positions": eng.book.rows(), "logs": [logbook.line(r) for r in reversed(eng.logbook.recent(eng.logbook.capacity))]}
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay a trading day through the engine on a simulated clock.")
+    ap.add_argument("--day", help="IST date to replay (default: the last day in the data)")
+    ap.add_argument("--recorded", action="store_true", help="replay the bars the live bot stored instead of synthetic ones")
+    ap.add_argument("--speed", type=float, default=0.0, help="simulated seconds per wall second (0 = as fast as possible)")
+    ap.add_argument("--strategy", default="Sniper", help="strategy key or label")
+    ap.add_argument("--ticks", type=int, default=4, help="ticks per 1m bar")
+    ap.add_argument("--real", action="store_true", help="route entries through the order stand-in instead of PAPER")
+    ap.add_argument("--check", action="store_true", help="run twice and verify identical logs and P&L")
+    a = ap.parse_args()
+    watch = [dict(x) for x in engine.WATCHLIST]
+    if a.recorded:
+        frames = recorded(barstore.BarStore(), [x['code'] for x in watch], a.day or pd.Timestamp.now(tz=clock.IST).date())
+    else:
+        frames = synthetic.frames(watch, end=a.day or "2026-01-02")
+    runs = []
+    for _ in range(2 if a.check else 1):
+        r = Replay(frames, watch, a.day, ticks_per_bar=a.ticks, speed=a.speed, real=a.real, strategy_mode=a.strategy).run()
+        runs.append(r)
+        print(f"{r['day']}: {r['bars']} minutes, {r['steps']} steps in {r['elapsed']:.2f}s; {r['trades']} trades, "
+              f"realized {r['daily_pnl']:,.2f}, open {len(r['positions'])} ({r['unrealized']:,.2f}), {len(r['logs'])} log lines")
+    for line in runs[-1]['logs'][-10:]: print("  " + line)
+    if a.check:
+        same = all(runs[0][k] == runs[1][k] for k in ("logs", "daily_pnl", "unrealized", "positions"))
+        print("identical" if same else "runs differ")
+        if not same: raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
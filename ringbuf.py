@@ -0,0 +1,79 @@
+# --- RING BUFFERS: fixed-capacity struct-of-arrays bar + indicator history with zero-copy windows ---
+from operator import itemgetter
+import numpy as np
+
+PRICES = ("Open", "High", "Low", "Close", "Volume")
+INDICATORS = ("EMA9", "EMA21", "RSI", "VWAP", "SUPERT", "SUPERTl", "SUPERTd", "MACD", "MACDs", "MACDh", "VOL_AVG")
+# Five NSE sessions of each interval (375 minutes a session; 1h bars are 7 a session, the last one short).
+CAPACITY = {"1m": 1875, "3m": 625, "5m": 375, "15m": 125, "1h": 35}
+_values = itemgetter(*INDICATORS)
+ROW_BYTES = 8 + 8 * len(PRICES) + 4 * len(INDICATORS)  # int64 ts, float64 OHLCV, float32 indicators
+
+def ceiling(capacity=CAPACITY):
+    """Bytes one symbol's rings hold, for every interval in `capacity`; fixed at construction, never grows.
+
+    Each slot is stored twice (see BarRing), so 2 * capacity * ROW_BYTES: ~558 KB with the defaults.
+    """
+    return sum(2 * n * ROW_BYTES for n in capacity.values())
+
+class BarRing:
+    """The last `capacity` bars of one (symbol, interval), each column its own contiguous array.
+
+    Every push writes the slot and its mirror `capacity` further on, so the newest k rows are always one
+    contiguous slice of the doubled arrays: `view` hands out NumPy views with no copy and no wrap-around
+    stitching. A view stays valid until `capacity` more bars are pushed; use `copy` to keep a window longer.
+    One writer (the engine's decision thread); readers may view concurrently.
+    """
+    __slots__ = ("capacity", "n", "ts", "prices", "ind")
+    def __init__(self, capacity):
+        self.capacity, self.n = capacity, 0
+        self.ts = np.zeros(2 * capacity, dtype='int64')
+        self.prices = np.full((len(PRICES), 2 * capacity), np.nan)
+        self.ind = np.full((len(INDICATORS), 2 * capacity), np.nan, dtype='float32')
+
+    @property
+    def nbytes(self):
+        return self.ts.nbytes + self.prices.nbytes + self.ind.nbytes
+
+    def __len__(self):
+        return min(self.n, self.capacity)
+
+    def push(self, bar, values=None):
+        """Append one (ts, o, h, l, c, v) bar and the indicator values computed on it; a bar with the last
+        bar's timestamp replaces it."""
+        i = (self.n - 1) % self.capacity
+        if not self.n or self.ts[i] != bar[0]: i, self.n = self.n % self.capacity, self.n + 1
+        j = i + self.capacity
+        self.ts[i] = self.ts[j] = bar[0]
+        self.prices[:, i] = self.prices[:, j] = bar[1:]
+        try: self.ind[:, i] = self.ind[:, j] = _values(values) if values else np.nan
+        except KeyError: self.ind[:, i] = self.ind[:, j] = [values.get(k, np.nan) for k in INDICATORS]
+
+    def _window(self, k):
+        k = len(self) if k is None else min(k, len(self))
+        end = self.n % self.capacity + self.capacity
+        return end - k, end
+
+    def view(self, k=None):
+        """{"ts", "Open".., "EMA9"..: array} of the newest k bars (all held by default), oldest first; no copy."""
+        a, b = self._window(k)
+        out = {"ts": self.ts[a:b]}
+        out.update(zip(PRICES, self.prices[:, a:b]))
+        out.update(zip(INDICATORS, self.ind[:, a:b]))
+        return out
+
+    def copy(self, k=None):
+        return {c: v.copy() for c, v in self.view(k).items()}
+
+    def last(self):
+        """The newest bar as a plain dict, or None."""
+        if not self.n: return None
+        i = (self.n - 1) % self.capacity
+        out = {"ts": int(self.ts[i])}
+        out.update(zip(PRICES, self.prices[:, i].tolist()))
+        out.update(zip(INDICATORS, self.ind[:, i].tolist()))
+        return out
+
+def rings(capacity=CAPACITY):
+    """One symbol's rings, {interval: BarRing}."""
+    return {iv: BarRing(n) for iv, n in capacity.items()}
@@ -0,0 +1,154 @@
+# --- UNIVERSE SCREENER: every symbol's indicators advanced together over one symbol x time panel ---
+import numpy as np
+import pandas as pd
+import backtest
+import barstore
+import clock
+import strategies
+from bars import INTERVALS
+
+NAN = np.nan
+
+class PanelState:
+    """indicators.IndicatorState with every field an array over symbols; `update` takes one bar per symbol.
+
+    Symbols with no bar at a step (NaN close) keep their state, so each one seeds on its own first bars.
+    """
+    def __init__(self, n, ema_fast=9, ema_slow=21, rsi_len=14, st_len=10, st_mult=3.0,
+                 macd_fast=12, macd_slow=26, macd_signal=9, vol_len=20):
+        z = lambda v=0.0: np.full(n, v, dtype=float)
+        self.n_sym, self.st_mult, self.vol_len = n, st_mult, vol_len
+        # smoothers: name -> [length, alpha, count, acc, value]
+        self.sm = {k: [ln, a, z(), z(), z(NAN)] for k, ln, a in (
+            ("ema_f", ema_fast, 2 / (ema_fast + 1)), ("ema_s", ema_slow, 2 / (ema_slow + 1)), ("atr", st_len, 1 / st_len),
+            ("macd_f", macd_fast, 2 / (macd_fast + 1)), ("macd_s", macd_slow, 2 / (macd_slow + 1)),
+            ("macd_sig", macd_signal, 2 / (macd_signal + 1)))}
+        self.rsi_alpha, self.rsi_up, self.rsi_dn = 1 / rsi_len, z(NAN), z(NAN)
+        self.count, self.prev_close, self.session, self.pv, self.v = z(), z(NAN), z(-1), z(), z()
+        self.st_dir, self.st_lb, self.st_ub = z(1), z(NAN), z(NAN)
+        self.vols, self.vol_sum = np.zeros((vol_len, n)), z()
+        self.out = {}
+
+    def _smooth(self, key, x, m):
+        ln, a, cnt, acc, val = self.sm[key]
+        m = m & ~np.isnan(x)
+        cnt += m
+        acc += np.where(m & (cnt < ln), x, 0.0)
+        seed = m & (cnt == ln)
+        val[seed] = (acc[seed] + x[seed]) / ln
+        step = m & (cnt > ln)
+        val[step] += a * (x[step] - val[step])
+        return val.copy()
+
+    def update(self, ts, o, h, l, c, v):
+        m = ~np.isnan(c)
+        out = {"Open": o, "High": h, "Low": l, "Close": c, "Volume": v}
+        out["EMA9"], out["EMA21"] = self._smooth("ema_f", c, m), self._smooth("ema_s", c, m)
+        pc = self.prev_close
+        has = m & ~np.isnan(pc)
+        d = np.where(has, c - pc, 0.0)
+        for arr, x in ((self.rsi_up, np.maximum(d, 0)), (self.rsi_dn, -np.minimum(d, 0))):
+            first = has & np.isnan(arr)
+            arr[first] = x[first]
+            more = has & ~first
+            arr[more] += self.rsi_alpha * (x[more] - arr[more])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out["RSI"] = np.where(has, 100 * self.rsi_up / (self.rsi_up + self.rsi_dn), NAN)
+        tr = np.where(has, np.fmax(h - l, np.fmax(np.abs(h - pc), np.abs(pc - l))), h - l)
+        # VWAP, reset per IST day
+        day = (ts + clock.IST_OFFSET) // 86400
+        new = m & (self.session != day)
+        self.session[new], self.pv[new], self.v[new] = day, 0.0, 0.0
+        self.pv += np.where(m, (h + l + c) / 3 * v, 0.0)
+        self.v += np.where(m, v, 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out["VWAP"] = np.where(self.v > 0, self.pv / self.v, NAN)
+        # Supertrend
+        matr = self.st_mult * self._smooth("atr", tr, m)
+        hl2 = (h + l) / 2
+        lb, ub = hl2 - matr, hl2 + matr
+        seen = m & (self.count > 0)
+        with np.errstate(invalid='ignore'):
+            up, dn = seen & (c > self.st_ub), seen & ~(c > self.st_ub) & (c < self.st_lb)
+            hold = seen & ~up & ~dn
+            self.st_dir[up], self.st_dir[dn] = 1, -1
+            lb = np.where(hold & (self.st_dir > 0) & (lb < self.st_lb), self.st_lb, lb)
+            ub = np.where(hold & (self.st_dir < 0) & (ub > self.st_ub), self.st_ub, ub)
+        out["SUPERT"] = np.where(seen, np.where(self.st_dir > 0, lb, ub), NAN)
+        out["SUPERTl"] = np.where(seen & (self.st_dir > 0), lb, NAN)
+        self.st_lb, self.st_ub = np.where(m, lb, self.st_lb), np.where(m, ub, self.st_ub)
+        # MACD
+        macd = self._smooth("macd_f", c, m) - self._smooth("macd_s", c, m)
+        out["MACD"] = macd
+        out["MACDs"] = self._smooth("macd_sig", macd, m)
+        # Rolling volume mean over a per-symbol ring
+        slot = (self.count % self.vol_len).astype(int)
+        cols = np.flatnonzero(m)
+        self.vol_sum[cols] += v[cols] - self.vols[slot[cols], cols]
+        self.vols[slot[cols], cols] = v[cols]
+        out["VOL_AVG"] = np.where(self.count + 1 >= self.vol_len, self.vol_sum / self.vol_len, NAN)
+        self.count += m
+        self.prev_close = np.where(m, c, self.prev_close)
+        self.out = out
+        return out
+
+def universe(instr):
+    """Every NSE -EQ name in the instrument master as (symbol, yfinance code)."""
+    return [(name, f"{name}.NS") for name in sorted(instr.equities)] if instr is not None else []
+
+def panel(codes, interval="5m", bars=200, store=None, exch_type="EQUITY"):
+    """(ts, {open, high, low, close, volume} arrays of shape symbols x time) over the last `bars` shared stamps.
+
+    All symbols' 1m tails are concatenated and resampled in one pass, grouped by (symbol, session bucket).
+    """
+    store = store or barstore.BarStore()
+    size = INTERVALS[interval]
+    rec, sizes = store.tails(codes, "1m", bars * size // 60)
+    sid = np.repeat(np.arange(len(codes)), sizes)
+    o, _, inside = clock.session_arrays(exch_type, rec['ts'])
+    if not inside.all(): rec, sid, o = rec[inside], sid[inside], o[inside]
+    out = {k: np.full((len(codes), 0), NAN) for k in ('open', 'high', 'low', 'close', 'volume')}
+    if not len(rec): return np.zeros(0, dtype='int64'), out
+    start = o + (rec['ts'] - o) // size * size
+    idx = np.flatnonzero(np.r_[True, (start[1:] != start[:-1]) | (sid[1:] != sid[:-1])])
+    last = np.r_[idx[1:] - 1, len(rec) - 1]
+    agg = {"open": rec['open'][idx], "high": np.maximum.reduceat(rec['high'], idx), "low": np.minimum.reduceat(rec['low'], idx),
+           "close": rec['close'][last], "volume": np.add.reduceat(rec['volume'], idx)}
+    bts, bsid = start[idx], sid[idx]
+    stamps = np.unique(bts)[-bars:]
+    pos = np.searchsorted(stamps, bts)
+    ok = (pos < len(stamps)) & (stamps[np.minimum(pos, len(stamps) - 1)] == bts)
+    for k, vals in agg.items():
+        out[k] = np.full((len(codes), len(stamps)), NAN)
+        out[k][bsid[ok], pos[ok]] = vals[ok]
+    return stamps, out
+
+STRENGTH = {
+    "Sniper": lambda v: v['RSI'] - 50,
+    "Momentum": lambda v: v['Close'] / v['EMA9'] - 1,
+    "Supertrend": lambda v: v['Close'] / v['SUPERT'] - 1,
+    "Golden": lambda v: v['EMA9'] / v['EMA21'] - 1,
+    "VWAP": lambda v: v['Close'] / v['VWAP'] - 1,
+    "Volume": lambda v: v['Volume'] / v['VOL_AVG'],
+}
+
+def scan(codes, strategy, top=10, bars=200, store=None, exch_type="EQUITY", params=None):
+    """Top-N BUY and SELL candidates for one strategy as two frames (code, signal, strength, close)."""
+    s = strategies.get(strategy)
+    p = dict(backtest.PARAMS, **(params or {}))
+    stamps, pnl = panel(codes, s.interval, bars, store, exch_type)
+    state = PanelState(len(codes), p['ema_fast'], p['ema_slow'], p['rsi_len'], p['st_len'], p['st_mult'],
+                       p['macd_fast'], p['macd_slow'], p['macd_signal'], p['vol_len'])
+    for t, ts in enumerate(stamps.tolist()):
+        state.update(ts, *(pnl[k][:, t] for k in ('open', 'high', 'low', 'close', 'volume')))
+    v = state.out
+    if not v: return pd.DataFrame(), pd.DataFrame()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sig = backtest.RULES[s.key](v, p)
+        strength = STRENGTH[s.key](v)
+    live = ~np.isnan(pnl['close'][:, -1]) if len(stamps) else np.zeros(len(codes), bool)
+    df = pd.DataFrame({"code": codes, "sig": sig, "strength": strength, "close": v['Close'], "live": live})
+    df = df[df['live'] & np.isfinite(df['strength'])].drop(columns="live")
+    rank = df.assign(key=df['strength'].abs()).sort_values("key", ascending=False).drop(columns="key")
+    buy, sell = rank[rank['sig'] > 0].head(top), rank[rank['sig'] < 0].head(top)
+    return buy.assign(sig="BUY").reset_index(drop=True), sell.assign(sig="SELL").reset_index(drop=True)
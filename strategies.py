@@ -0,0 +1,61 @@
+# --- STRATEGY REGISTRY: each strategy declares its bar interval and the indicator features it reads ---
+import marketdata
+from indicators import IndicatorState
+
+def _sniper(v):
+    if v['EMA9'] > v['EMA21'] and v['RSI'] > 55: return "BUY"
+    if v['EMA9'] < v['EMA21'] and v['RSI'] < 45: return "SELL"
+    return "HOLD"
+
+def _momentum(v):
+    return "BUY" if v['Close'] > v['EMA9'] else "SELL"
+
+def _supertrend(v):
+    if v['SUPERT'] != v['SUPERT']: return "HOLD"  # ATR still warming up
+    return "BUY" if v['Close'] > v['SUPERTl'] else "SELL"
+
+def _golden(v):
+    return "BUY" if v['EMA9'] > v['EMA21'] else "SELL"
+
+def _vwap_macd(v):
+    if v['Close'] > v['VWAP'] and v['MACD'] > v['MACDs']: return "BUY"
+    if v['Close'] < v['VWAP'] and v['MACD'] < v['MACDs']: return "SELL"
+    return "HOLD"
+
+def _volume(v):
+    if v['Volume'] > v['VOL_AVG'] * 2: return "BUY" if v['Close'] > v['Open'] else "SELL"
+    return "HOLD"
+
+class Strategy:
+    def __init__(self, key, label, interval, features, rule):
+        self.key, self.label, self.interval, self.features, self.rule = key, label, interval, features, rule
+
+    def signal(self, values):
+        if not values or any(f not in values for f in self.features): return "HOLD"
+        return self.rule(values)
+
+STRATEGIES = [
+    Strategy("Sniper", "1. Sniper (1m) [Scalp]", "1m", ("EMA9", "EMA21", "RSI"), _sniper),
+    Strategy("Momentum", "2. Momentum (5m) [Trend]", "5m", ("Close", "EMA9"), _momentum),
+    Strategy("Supertrend", "3. Supertrend (Pro)", "5m", ("Close", "SUPERT", "SUPERTl"), _supertrend),
+    Strategy("Golden", "4. Golden Cross (Pro)", "5m", ("EMA9", "EMA21"), _golden),
+    Strategy("VWAP", "5. VWAP + MACD (High Acc)", "15m", ("Close", "VWAP", "MACD", "MACDs"), _vwap_macd),
+    Strategy("Volume", "6. Volume Shock", "5m", ("Open", "Close", "Volume", "VOL_AVG"), _volume),
+]
+LABELS = [s.label for s in STRATEGIES]
+
+def get(mode):
+    """Registry lookup by label or key; older session values like "1. Sniper (1m)" match on the key."""
+    for s in STRATEGIES:
+        if mode == s.label or s.key in mode: return s
+    return STRATEGIES[0]
+
+def intervals(strategies=STRATEGIES):
+    return sorted({s.interval for s in strategies}, key=lambda i: marketdata.INTERVAL_MIN[i])
+
+def evaluate(states, strategies=STRATEGIES):
+    """One shared indicator state per interval feeds every strategy: {interval: IndicatorState} -> {key: signal}."""
+    return {s.key: s.signal(states[s.interval].out if s.interval in states else None) for s in strategies}
+
+def new_states(strategies=STRATEGIES):
+    return {i: IndicatorState() for i in intervals(strategies)}
@@ -0,0 +1,81 @@
+# --- SYNTHETIC DATA: seeded offline stand-ins for the scrip master, stored 1m bars and tick tapes ---
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+import barstore
+import clock
+
+INDICES = [("NIFTY", 24000, 50, 75), ("BANKNIFTY", 52000, 100, 35), ("FINNIFTY", 23500, 50, 65)]
+COMMODITIES = ["CRUDEOIL", "GOLD", "SILVER", "NATURALGAS", "COPPER"]
+
+def master(n_equities=2000, seed=7, start=date(2026, 1, 1), names=()):
+    """Raw scrip-master records shaped like OpenAPIScripMaster.json: ~2 rows per equity, 12 weekly index
+    expiries of 121 strikes, 3 months of stock options for the first 200 names, 6 MCX futures each.
+    `names` adds equities (e.g. a real watchlist's symbols) after the synthetic ones."""
+    rng = np.random.default_rng(seed)
+    recs, tok = [], 1000
+    def rec(sym, name, seg, itype, exp="", strike=-1.0, lot=1):
+        nonlocal tok
+        tok += 1
+        return {"token": str(tok), "symbol": sym, "name": name, "expiry": exp, "strike": f"{strike * 100:.6f}",
+                "lotsize": str(lot), "instrumenttype": itype, "exch_seg": seg, "tick_size": "5.000000"}
+    for name in [f"STK{i:04d}" for i in range(n_equities)] + list(names):
+        recs.append(rec(f"{name}-EQ", name, "NSE", ""))
+        recs.append(rec(f"{name}-BE", name, "NSE", ""))
+    for name, spot, step, lot in INDICES:
+        for w in range(12):
+            d = start + timedelta(days=7 * w + int(rng.integers(0, 2)))
+            exp = d.strftime('%d%b%Y').upper()
+            tag = d.strftime('%d%b%y').upper()
+            for k in range(-60, 61):
+                strike = spot + k * step
+                for ot in ("CE", "PE"):
+                    recs.append(rec(f"{name}{tag}{strike}{ot}", name, "NFO", "OPTIDX", exp, strike, lot))
+            recs.append(rec(f"{name}{tag}FUT", name, "NFO", "FUTIDX", exp, lot=lot))
+    for i in range(min(200, n_equities)):
+        name = f"STK{i:04d}"
+        for m in range(3):
+            d = start + timedelta(days=30 * m + 25)
+            for k in range(-20, 21):
+                strike = 1000 + k * 10
+                for ot in ("CE", "PE"):
+                    recs.append(rec(f"{name}{d.strftime('%d%b%y').upper()}{strike}{ot}", name, "NFO", "OPTSTK",
+                                    d.strftime('%d%b%Y').upper(), strike))
+    for name in COMMODITIES:
+        for m in range(6):
+            d = start + timedelta(days=30 * m + 18)
+            recs.append(rec(f"{name}{d.strftime('%d%b%y').upper()}FUT", name, "MCX", "FUTCOM", d.strftime('%d%b%Y').upper()))
+    return recs
+
+def session_bars(years, seed, end="2026-01-02"):
+    """NSE-hours 1m random walk over weekdays as BAR records."""
+    days = pd.bdate_range(end=end, periods=max(1, int(years * 250)))
+    day0 = (days.values.astype('datetime64[s]').astype('int64') - clock.IST_OFFSET + 9 * 3600 + 15 * 60)
+    ts = (day0[:, None] + np.arange(375) * 60).ravel()
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.0008, len(ts))))
+    rec = np.empty(len(ts), dtype=barstore.BAR)
+    rec['ts'], rec['close'] = ts, close
+    rec['open'] = np.r_[close[0], close[:-1]]
+    wick = np.abs(rng.normal(0, 0.0004, (2, len(ts)))) * close
+    rec['high'] = np.maximum(rec['open'], close) + wick[0]
+    rec['low'] = np.minimum(rec['open'], close) - wick[1]
+    rec['volume'] = rng.integers(1_000, 50_000, len(ts)) * np.where(rng.random(len(ts)) < 0.01, 10, 1)  # rare shocks
+    return rec
+
+def tape(tokens, n, every=0.001, exch="NSE", seed=0):
+    """A ReplayServer tick tape: n (t, exch, token, ltp, volume) rows cycling over `tokens`, one per `every` s."""
+    rng = np.random.default_rng(seed)
+    walk = 100 * np.exp(np.cumsum(rng.normal(0, 0.0002, (n, len(tokens))), axis=0))
+    vol = np.cumsum(rng.integers(1, 500, n))
+    return [(i * every, exch, tokens[i % len(tokens)], round(float(walk[i, i % len(tokens)]), 2), int(vol[i])) for i in range(n)]
+
+def frames(watchlist, end="2026-01-02", days=5, seed=0):
+    """{code: 1m OHLCV frame} of `days` NSE sessions ending on `end` for each watchlist row, scaled to
+    500x the row's strike step (NIFTY ~25000, BANKNIFTY ~50000, RELIANCE ~500)."""
+    out = {}
+    for i, x in enumerate(watchlist):
+        rec = session_bars(days / 250, seed + i, end=end)
+        for col in ('open', 'high', 'low', 'close'): rec[col] *= 5 * x.get('step', 1)
+        out[x['code']] = barstore.to_frame(rec)
+    return out
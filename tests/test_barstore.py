@@ -0,0 +1,19 @@
+import barstore
+from marketdata import StubSource
+
+def test_append_overlap_keeps_latest_copy(tmp_path):
+    store, df = barstore.BarStore(str(tmp_path)), StubSource(bars=50).frame("A.NS", "1m")
+    assert store.append("A.NS", "1m", df.iloc[:30]) == 30
+    tail = df.iloc[29:].copy()
+    tail.iloc[0, tail.columns.get_loc("Close")] += 1.0  # the stored last bar was still forming
+    store.append("A.NS", "1m", tail)
+    out = store.read("A.NS", "1m")
+    assert len(out) == 50 and out['Close'].iloc[29] == tail['Close'].iloc[0]
+    assert store.gaps("A.NS", "1m") == []
+
+def test_sync_fetches_only_after_the_stored_tail(tmp_path):
+    store, src = barstore.BarStore(str(tmp_path)), StubSource(latency=0.0, bars=100)
+    store.append("A.NS", "1m", src.frame("A.NS", "1m").iloc[:90])
+    res = store.sync(["A.NS", "B.NS"], "1m", source=src)
+    assert len(res.frames["A.NS"]) == 11 and len(res.frames["B.NS"]) == 100  # from the stored tail; full for B
+    assert len(store.read("A.NS", "1m")) == 100 and store.last_ts("B.NS", "1m") == store.last_ts("A.NS", "1m")
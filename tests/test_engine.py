@@ -0,0 +1,90 @@
+import barstore
+import clock
+import engine
+import logbook
+import orders
+import pytest
+from replay import SimGateway
+
+NOW = 1767240000  # 2026-01-01 09:30 IST, NSE open
+
+@pytest.fixture
+def eng(tmp_path):
+    clock.use(clock.SimClock(NOW))
+    e = engine.TradingEngine(store=barstore.BarStore(str(tmp_path / "bars")), logs=logbook.LogBook(root=str(tmp_path / "logs")))
+    e.watchlist, e.stale, e.bot_active = [], False, True
+    yield e
+    clock.use(None)
+
+def _row(sig="BUY", price=100.0):
+    return {"code": "SBIN.NS", "display": "SBIN-EQ", "type": "EQUITY", "token": "3045", "exch": "NSE", "sig": sig, "price": price, "band": []}
+
+def _step(e, t):
+    clock.use(clock.SimClock(t))
+    return e.step(t)
+
+def _held(e, broker):
+    e.real_trade_active, e.orders = True, SimGateway(broker)
+    e.base = [_row()]
+    _step(e, NOW)  # BUY acked inline; the fill is applied on the next pass
+    _step(e, NOW + 1)
+
+def test_day_rollover_resets_pnl(eng):
+    _step(eng, NOW)
+    day, eng.daily_pnl = eng.day, -eng.max_loss
+    _step(eng, NOW + 86400)
+    assert eng.day == day + 1 and eng.daily_pnl == 0.0
+
+def test_max_loss_blocks_entries(eng):
+    eng.base, eng.daily_pnl = [_row()], -eng.max_loss
+    _step(eng, NOW)
+    assert "SBIN-EQ" not in eng.book and not eng.bot_active
+
+def test_real_exit_releases_on_ack(eng):
+    broker = orders.MockBroker(latency=0, jitter=0)
+    _held(eng, broker)
+    assert eng.book.meta[eng.book.slots["SBIN-EQ"]]['type'] == "REAL"
+    eng.base = [_row("HOLD", 90.0)]  # through the stop loss
+    _step(eng, NOW + 2)
+    assert [o['transactiontype'] for o in broker.book] == ["BUY", "SELL"]
+    assert "SBIN-EQ" in eng.book  # still held until the SELL's ack is processed
+    _step(eng, NOW + 3)
+    assert "SBIN-EQ" not in eng.book and eng.daily_pnl == pytest.approx(-500.0)
+
+def test_rejected_exit_is_resent(eng):
+    broker = orders.MockBroker(latency=0, jitter=0)
+    _held(eng, broker)
+    broker.reject = 1.0
+    eng.base = [_row("HOLD", 90.0)]
+    _step(eng, NOW + 2)
+    _step(eng, NOW + 3)
+    assert "SBIN-EQ" in eng.book and eng.daily_pnl == 0.0 and eng.orders.failed == 1
+    _step(eng, NOW + 4)  # not before EXIT_RETRY
+    assert eng.orders.failed == 1
+    broker.reject = 0.0
+    _step(eng, NOW + 3 + engine.EXIT_RETRY)
+    _step(eng, NOW + 4 + engine.EXIT_RETRY)
+    assert "SBIN-EQ" not in eng.book and eng.daily_pnl == pytest.approx(-500.0)
+
+def test_rejected_alert_exit_is_resent_after_breach(eng):
+    broker = orders.MockBroker(latency=0, jitter=0)
+    _held(eng, broker)
+    broker.reject, eng.daily_pnl, eng.max_loss = 1.0, -390.0, 400
+    eng.base = [_row("HOLD", 99.5)]  # above the stop loss; -25 open takes the day past max_loss
+    _step(eng, NOW + 2)
+    _step(eng, NOW + 3)
+    assert not eng.bot_active and "SBIN-EQ" in eng.book and eng.flatten == {"SBIN-EQ"} and eng.orders.failed == 1
+    broker.reject = 0.0
+    _step(eng, NOW + 3 + engine.EXIT_RETRY)  # resent with the bot stopped
+    _step(eng, NOW + 4 + engine.EXIT_RETRY)
+    assert [o['transactiontype'] for o in broker.book] == ["BUY", "SELL"]
+    assert "SBIN-EQ" not in eng.book and not eng.flatten and eng.daily_pnl == pytest.approx(-415.0)
+
+def test_reconcile_leaves_manual_positions_alone(eng):
+    broker = orders.MockBroker(latency=0, jitter=0)
+    for tag, tok, side in ((orders.new_tag(), "3045", "BUY"), ("manual1", "11536", "BUY"), (orders.new_tag(), "1594", "SELL")):
+        broker.placeOrder({"ordertag": tag, "tradingsymbol": tok, "symboltoken": tok, "exchange": "NSE", "quantity": "10",
+                           "transactiontype": side, "price": 100})
+    eng.api = broker
+    assert [(a, p['token']) for a, p in eng.reconcile()] == [("adopt", "3045"), ("skip", "11536"), ("skip", "1594")]
+    assert list(eng.book.slots) == ["3045"] and eng.book.qty[eng.book.slots["3045"]] == 10
@@ -0,0 +1,17 @@
+import threading
+import hub
+
+def test_subscription_version_moves_only_on_change():
+    h = hub.DataHub()
+    h.subscribe([("NSE", "3045"), ("NFO", "43210")])
+    h.subscribe(iter([("NFO", "43210"), ("NSE", "3045")]))
+    assert h.version == 1 and h.tokens() == {("NSE", "3045"), ("NFO", "43210")}
+    h.subscribe([("NSE", "3045")])
+    assert h.version == 2
+
+def test_wait_returns_the_published_version():
+    h = hub.DataHub()
+    assert h.wait(None) == 0 and h.wait(0, timeout=0.01) == 0
+    threading.Timer(0.05, h.publish, (7,)).start()
+    assert h.wait(0, timeout=5) == 7
+    assert h.stats()['published'] == 1
@@ -0,0 +1,20 @@
+import numpy as np
+import indicators
+from marketdata import StubSource
+
+def test_streaming_matches_batch():
+    df = StubSource(bars=400).frame("RELIANCE.NS", "1m")
+    ref = indicators.series(df)
+    state = indicators.IndicatorState()
+    state.update_frame(df.iloc[:250])
+    state.update_frame(df.iloc[240:])  # overlapping frame: bars before the last applied one are skipped
+    last = ref.iloc[-1]
+    for k, v in state.out.items():
+        if isinstance(v, float) and np.isnan(v): assert np.isnan(last[k]), k
+        else: assert last[k] == v, k
+
+def test_validate_against_pandas_ta():
+    import pytest
+    pytest.importorskip("pandas_ta")
+    for k, (err, nan_mismatch) in indicators.validate(StubSource(bars=400).frame("TCS.NS", "1m")).items():
+        assert err < 1e-6, k
@@ -0,0 +1,45 @@
+import journal
+
+DAY = 1767240000  # 2026-01-01 09:30 IST
+
+def _pos(display, qty=50):
+    return {"display": display, "entry": 100.0, "qty": qty, "type": "PAPER", "token": "1", "exch": "NSE", "ltp": 100.0}
+
+def test_recover_round_trip(tmp_path):
+    path = str(tmp_path / "journal.db")
+    j = journal.Journal(path, snap_every=4)
+    j.record("bot", {"active": True}, ts=DAY)
+    j.record("config", {"max_loss": 2000}, ts=DAY)
+    j.record("open", _pos("SBIN"), ts=DAY + 1)
+    j.record("open", _pos("TCS"), ts=DAY + 2)
+    j.flush()  # snapshot at seq 4
+    j.record("close", {"display": "SBIN", "pnl": -120.5}, ts=DAY + 3)
+    j.record("resize", {"display": "TCS", "qty": 25}, ts=DAY + 4)
+    j.stop()
+    j.db.close()
+    k = journal.Journal(path)
+    assert k.snapped == 4 and k.seq == 6  # newest snapshot plus the events after it
+    state = k.recover(ts=DAY + 5)
+    assert state['bot_active'] and state['settings'] == {"max_loss": 2000}
+    assert list(state['positions']) == ["TCS"] and state['positions']['TCS']['qty'] == 25
+    assert state['daily_pnl'] == -120.5
+    assert k.recover(ts=DAY + 86400)['daily_pnl'] == 0.0  # a restart on the next day starts a fresh P&L
+    assert [e[2] for e in k.events(kinds=("open", "close"))] == ["open", "open", "close"]
+
+def test_day_event_resets_pnl(tmp_path):
+    j = journal.Journal(str(tmp_path / "journal.db"))
+    j.record("close", {"display": "SBIN", "pnl": -300.0}, ts=DAY)
+    j.record("day", {"day": journal.day(DAY + 86400)}, ts=DAY + 86400)
+    j.record("close", {"display": "TCS", "pnl": 50.0}, ts=DAY + 86400)
+    assert j.recover(ts=DAY + 86400)['daily_pnl'] == 50.0
+    j.stop()
+
+def test_reconcile_adopts_only_the_bots_longs():
+    local = {"1": dict(_pos("SBIN"), type="REAL"), "2": dict(_pos("TCS"), type="REAL")}
+    broker = [{"tradingsymbol": "SBIN", "symboltoken": "1", "exchange": "NSE", "netqty": "50", "buyavgprice": "100"},
+              {"tradingsymbol": "TCS", "symboltoken": "2", "exchange": "NSE", "netqty": "-50", "buyavgprice": "0"},
+              {"tradingsymbol": "INFY", "symboltoken": "3", "exchange": "NSE", "netqty": "10", "buyavgprice": "1500"},
+              {"tradingsymbol": "HDFC", "symboltoken": "4", "exchange": "NSE", "netqty": "5", "buyavgprice": "1600"}]
+    diff = journal.reconcile(local, broker, ours={"1", "2", "3"})
+    assert [(a, p['display'], p['qty']) for a, p in diff] == [("drop", "TCS", 50), ("adopt", "INFY", 10),
+                                                              ("skip", "TCS", -50), ("skip", "HDFC", 5)]
@@ -0,0 +1,16 @@
+import marketdata
+
+def test_deadline_reports_slow_and_failed_codes():
+    src = marketdata.StubSource(latency=0.01, slow=("SLOW.NS",), slow_latency=2.0, fail=("BAD.NS",))
+    res = marketdata.fetch_bars(["A.NS", "B.NS", "SLOW.NS", "BAD.NS"], "1m", source=src, deadline=0.5)
+    assert sorted(res.frames) == ["A.NS", "B.NS"]
+    assert res.errors["SLOW.NS"] == "timeout" and "stub failure" in res.errors["BAD.NS"]
+    assert res.elapsed < 1.5  # the slow code is not awaited
+
+def test_delta_fetch_returns_only_new_bars():
+    src = marketdata.StubSource(latency=0.0)
+    full = src.frame("A.NS", "5m")
+    start = full.index[-10]
+    res = marketdata.fetch_bars(["A.NS", "B.NS"], "5m", source=src, chunk=2, starts={"A.NS": start})
+    assert len(res.frames["A.NS"]) == 10 and res.frames["A.NS"].index[0] == start
+    assert len(res.frames["B.NS"]) == src.bars
@@ -0,0 +1,14 @@
+import numpy as np
+import options
+
+def test_implied_vol_round_trip():
+    strike = np.array([90.0, 100.0, 110.0])
+    prem = options.price(100.0, strike, 0.1, 0.25, call=True)
+    assert np.allclose(options.implied_vol(prem, 100.0, strike, 0.1, call=True), 0.25, atol=1e-6)
+
+def test_implied_vol_nan_outside_bounds():
+    # below intrinsic, within tol of intrinsic, above the spot (a call) and a far OTM premium under tol
+    prem = np.array([5.0, 10.0 + 1e-9, 101.0, 1e-12])
+    strike = np.array([90.0, 90.0, 100.0, 200.0])
+    iv = options.implied_vol(prem, 100.0, strike, 0.05, call=True, rate=0.0)
+    assert np.isnan(iv).all()
@@ -0,0 +1,54 @@
+import threading
+import orders
+
+def _gateway(broker, **kw):
+    return orders.OrderGateway(broker, rate=1000, burst=1000, backoff=0.001, **kw)
+
+def _submit(gw, n=1):
+    done, ev = [], threading.Event()
+    def on_done(o):
+        done.append(o)
+        if len(done) == n: ev.set()
+    out = [gw.submit({"tradingsymbol": "SBIN-EQ", "quantity": "1", "transactiontype": "BUY"}, on_done) for _ in range(n)]
+    assert ev.wait(5)
+    return out, done
+
+def test_ack_calls_on_done():
+    gw = _gateway(orders.MockBroker(latency=0, jitter=0))
+    (order,), done = _submit(gw)
+    assert done == [order] and order.status == "ACK" and order.orderid and order.latency is not None
+    gw.stop()
+
+def test_lost_reply_is_not_placed_twice():
+    broker = orders.MockBroker(latency=0, jitter=0, lost=1.0)
+    gw = _gateway(broker)
+    (order,), _ = _submit(gw)
+    assert order.status == "ACK" and order.attempts == 2 and gw.retried == 1
+    assert [o['orderid'] for o in broker.book] == [order.orderid]
+    gw.stop()
+
+def test_retries_exhausted_fail_through_on_done():
+    broker = orders.MockBroker(latency=0, jitter=0, fail=1.0)
+    gw = _gateway(broker, retries=2)
+    (order,), done = _submit(gw)
+    assert done == [order] and order.status == "FAIL" and "Couldn't connect" in order.error
+    assert order.attempts == 3 and gw.failed == 1 and not broker.book
+    gw.stop()
+
+def test_reject_is_not_retried():
+    gw = _gateway(orders.MockBroker(latency=0, jitter=0, reject=1.0))
+    (order,), _ = _submit(gw)
+    assert order.status == "FAIL" and order.error == "rejected" and order.attempts == 1
+    gw.stop()
+
+def test_stop_fails_queued_orders():
+    gw = _gateway(orders.MockBroker(latency=0.2, jitter=0), workers=1)
+    done, ev = [], threading.Event()
+    def on_done(o):
+        done.append(o)
+        if len(done) == 5: ev.set()
+    sent = [gw.submit({"quantity": "1"}, on_done) for _ in range(5)]
+    gw.stop()
+    assert ev.wait(5)
+    assert {o.tag for o in done} == {o.tag for o in sent}
+    assert sum(o.error == "gateway stopped" for o in sent) >= 4
@@ -0,0 +1,20 @@
+import pytest
+import positions
+
+def test_marks_return_only_crossed_levels():
+    book = positions.PositionBook(sl_pct=1.0, target_pct=2.0, capacity=2)
+    a = book.open("SBIN-EQ", 100.0, 10, token="3045")
+    b = book.open("TCS-EQ", 200.0, 5, token="11536")
+    c = book.open("INFY-EQ", 50.0, 1)  # past capacity: the columns grow
+    assert book.mark("SBIN-EQ", 99.5) == [] and book.mark_token("3045", 98.9) == [a]
+    assert book.mark("TCS-EQ", 204.0) == [b] and book.mark("INFY-EQ", 50.2) == []
+    assert book.unrealized() == pytest.approx(-11.0 + 20.0 + 0.2)
+    p = book.close(a)
+    assert p['pnl'] == pytest.approx(-11.0) and "SBIN-EQ" not in book and book.mark_token("3045", 90.0) == []
+    assert sorted(book.slots.values()) == sorted([b, c])
+
+def test_retarget_rearms_and_reports_hits():
+    book = positions.PositionBook()
+    s = book.open("SBIN-EQ", 100.0, 10)
+    book.mark("SBIN-EQ", 99.5)
+    assert book.retarget(0.5, 2.0) == [s]
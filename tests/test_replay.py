@@ -0,0 +1,10 @@
+import engine
+import synthetic
+from replay import Replay
+
+def test_replay_is_deterministic():
+    watch = [dict(x) for x in engine.WATCHLIST]
+    frames = synthetic.frames(watch, end="2026-01-02")
+    a, b = (Replay(frames, watch, ticks_per_bar=2).run() for _ in range(2))
+    assert a['trades'] and a['logs']
+    for k in ("logs", "daily_pnl", "unrealized", "positions"): assert a[k] == b[k], k
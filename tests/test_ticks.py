@@ -0,0 +1,49 @@
+import socket
+import time
+import ticks
+
+def _wait(cond, timeout=10.0):
+    t = time.monotonic()
+    while not cond() and time.monotonic() - t < timeout: time.sleep(0.01)
+    return cond()
+
+def test_packet_round_trip():
+    token, tick = ticks.parse_packet(ticks.encode_packet("2885", 2456.35, volume=12345, ts=1700000000123))
+    assert (token, tick.ltp, tick.volume, tick.ts) == ("2885", 2456.35, 12345, 1700000000123)
+    token, tick = ticks.parse_packet(ticks.encode_packet("99926000", 24000.5, volume=7, ts=1, mode=ticks.LTP_MODE))
+    assert (token, tick.ltp, tick.volume) == ("99926000", 24000.5, 0)  # LTP packets carry no volume
+
+def test_stream_reconnects_and_resubscribes():
+    tape = [(i * 0.01, "NSE", str(1000 + i % 2), 100 + i * 0.05, i) for i in range(2000)]
+    srv = ticks.ReplayServer(tape, speed=1.0).start()
+    seen = []
+    stream = ticks.TickStream(url=srv.url, on_tick=lambda tok, t: seen.append(tok))
+    stream.set_tokens([("NSE", "1000")])
+    stream.start()
+    try:
+        assert _wait(lambda: len(seen) >= 5)
+        assert set(seen) == {"1000"}  # only the subscribed token is delivered
+        stream.ws.sock.sock.shutdown(socket.SHUT_RDWR)  # drop the link under the client, as a network failure would
+        assert _wait(lambda: stream.reconnects and stream.connected)
+        n = len(seen)
+        assert _wait(lambda: len(seen) > n + 5)  # the subscription was sent again on the new connection
+        stream.set_tokens([("NSE", "1000"), ("NSE", "1001")])
+        assert _wait(lambda: stream.table.get("1001") is not None)
+    finally:
+        stream.stop()
+        srv.shutdown()
+
+def test_stop_joins_the_run_thread():
+    tape = [(i * 0.01, "NSE", "1000", 100.0, i) for i in range(1000)]
+    srv = ticks.ReplayServer(tape, speed=1.0).start()
+    try:
+        for _ in range(5):  # close() from a foreign thread used to leave run_forever blocked now and then
+            stream = ticks.TickStream(url=srv.url)
+            stream.set_tokens([("NSE", "1000")])
+            stream.start()
+            assert _wait(lambda: stream.table.get("1000") is not None)
+            t = time.monotonic()
+            stream.stop()
+            assert not stream.is_alive() and time.monotonic() - t < 2.0
+    finally:
+        srv.shutdown()
@@ -0,0 +1,235 @@
+# --- TICK STREAM: Angel SmartStream (v2) client feeding a latest-tick table, plus a local replay server ---
+import base64
+import hashlib
+import json
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import namedtuple
+import perf
+
+STREAM_URL = "wss://smartapisocket.angelone.in/smart-stream"
+EXCHANGE_TYPES = {"NSE": 1, "NFO": 2, "BSE": 3, "BFO": 4, "MCX": 5, "NCX": 7, "CDS": 13}
+LTP_MODE, QUOTE_MODE = 1, 2
+HEARTBEAT = 10  # seconds; the server expects a text "ping" at least this often
+
+Tick = namedtuple("Tick", "ltp volume ts recv")
+
+def parse_packet(data):
+    """Binary SmartStream packet -> (token, Tick); prices arrive in paise, timestamps in epoch ms."""
+    mode = data[0]
+    token = data[2:27].split(b"\x00", 1)[0].decode()
+    ts, ltp = struct.unpack_from("<qq", data, 35)
+    volume = struct.unpack_from("<q", data, 67)[0] if mode >= QUOTE_MODE and len(data) >= 75 else 0
+    return token, Tick(ltp / 100.0, volume, ts, time.time())
+
+def encode_packet(token, ltp, volume=0, ts=None, exch_type=1, mode=QUOTE_MODE, seq=0):
+    """Inverse of parse_packet (LTP or QUOTE layout) used by the replay server."""
+    buf = bytearray(123 if mode >= QUOTE_MODE else 51)
+    buf[0], buf[1] = mode, exch_type
+    buf[2:2 + len(token)] = token.encode()
+    struct.pack_into("<qqq", buf, 27, seq, int(ts if ts is not None else time.time() * 1000), int(round(ltp * 100)))
+    if mode >= QUOTE_MODE: struct.pack_into("<q", buf, 67, int(volume))
+    return bytes(buf)
+
+class TickTable:
+    """token -> Tick. The stream thread replaces whole tuples, so readers never lock and never see a torn tick."""
+    def __init__(self):
+        self.ticks = {}
+
+    def put(self, token, tick): self.ticks[token] = tick
+    def get(self, token): return self.ticks.get(token)
+
+    def ltp(self, token):
+        t = self.ticks.get(token)
+        return t.ltp if t else 0.0
+
+class TickStream(threading.Thread):
+    """Background SmartStream client: subscribes once, reconnects with backoff and resubscribes everything."""
+    def __init__(self, headers=None, url=STREAM_URL, mode=QUOTE_MODE, table=None, on_tick=None):
+        super().__init__(daemon=True, name="tick-stream")
+        self.url, self.headers, self.mode = url, headers or {}, mode
+        self.table, self.on_tick = table or TickTable(), on_tick
+        self.tokens = set()  # {(exch, token)}
+        self.ws, self.connected, self.reconnects = None, False, 0
+        self._stop_evt, self._lock = threading.Event(), threading.Lock()
+
+    @classmethod
+    def from_smartapi(cls, api, **kw):
+        headers = {"Authorization": f"Bearer {api.access_token}", "x-api-key": api.api_key,
+                   "x-client-code": api.userId, "x-feed-token": api.feed_token}
+        return cls(headers, **kw)
+
+    def _request(self, action, tokens):
+        by_exch = {}
+        for exch, tok in tokens: by_exch.setdefault(EXCHANGE_TYPES.get(exch, 1), []).append(tok)
+        return json.dumps({"correlationID": "mishralgo", "action": action,
+                           "params": {"mode": self.mode, "tokenList": [{"exchangeType": e, "tokens": t} for e, t in by_exch.items()]}})
+
+    def _send(self, action, tokens):
+        ws = self.ws
+        if tokens and ws is not None and self.connected:
+            try: ws.send(self._request(action, tokens))
+            except Exception as e: perf.error("ws_send", e)
+
+    def set_tokens(self, tokens):
+        """Replace the subscription set; only the difference is sent over a live connection."""
+        tokens = {(e, str(t)) for e, t in tokens if t}
+        with self._lock:
+            add, drop = tokens - self.tokens, self.tokens - tokens
+            self.tokens = tokens
+        self._send(1, add)
+        self._send(0, drop)
+
+    def _on_open(self, ws):
+        if self._stop_evt.is_set(): return ws.close()  # stop() came in during the handshake
+        self.connected = True
+        self._send(1, set(self.tokens))
+        threading.Thread(target=self._heartbeat, args=(ws,), daemon=True).start()
+
+    def _heartbeat(self, ws):
+        while self.connected and self.ws is ws and not self._stop_evt.wait(HEARTBEAT):
+            try: ws.send("ping")
+            except Exception as e:
+                perf.error("ws_ping", e)
+                return
+
+    def _on_message(self, ws, msg):
+        if isinstance(msg, str): return  # "pong" / control replies
+        try: token, tick = parse_packet(msg)
+        except Exception as e:
+            perf.error("tick_parse", e)
+            return
+        perf.count("ticks")
+        self.table.put(token, tick)
+        if self.on_tick: self.on_tick(token, tick)
+
+    def _on_close(self, ws, *args):
+        self.connected = False
+
+    def run(self):
+        import websocket
+        backoff = 1.0
+        while not self._stop_evt.is_set():
+            self.ws = websocket.WebSocketApp(self.url, header=self.headers, on_open=self._on_open,
+                                             on_message=self._on_message, on_close=self._on_close,
+                                             on_error=lambda ws, e: None)
+            started = time.time()
+            self.ws.run_forever()
+            self.connected = False
+            if self._stop_evt.is_set(): break
+            self.reconnects += 1
+            if time.time() - started > 30: backoff = 1.0
+            self._stop_evt.wait(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def stop(self, timeout=5.0):
+        """Stop and wait for the run thread. close() from this thread can close the socket under run_forever and
+        leave it blocked in select; a shutdown wakes it and it tears the connection down itself."""
+        self._stop_evt.set()
+        self.connected = False
+        ws = self.ws
+        if ws is not None:
+            ws.keep_running = False
+            try:
+                sock = ws.sock and ws.sock.sock
+                if sock is not None: sock.shutdown(socket.SHUT_RDWR)
+            except OSError: pass  # already disconnected
+        if self.is_alive() and threading.current_thread() is not self: self.join(timeout)
+
+# --- LOCAL STAND-IN SERVER ---
+_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+def _recv_exact(sock, n):
+    buf = b""
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk: raise ConnectionError("closed")
+        buf += chunk
+    return buf
+
+def _recv_frame(sock):
+    b0, b1 = _recv_exact(sock, 2)
+    n = b1 & 0x7F
+    if n == 126: n = struct.unpack(">H", _recv_exact(sock, 2))[0]
+    elif n == 127: n = struct.unpack(">Q", _recv_exact(sock, 8))[0]
+    mask = _recv_exact(sock, 4) if b1 & 0x80 else b"\x00" * 4
+    payload = bytes(c ^ mask[i % 4] for i, c in enumerate(_recv_exact(sock, n)))
+    return b0 & 0x0F, payload
+
+def _frame(payload, opcode):
+    n = len(payload)
+    head = bytes([0x80 | opcode])
+    if n < 126: head += bytes([n])
+    elif n < 65536: head += bytes([126]) + struct.pack(">H", n)
+    else: head += bytes([127]) + struct.pack(">Q", n)
+    return head + payload
+
+class ReplayServer(socketserver.ThreadingTCPServer):
+    """Speaks enough of SmartStream for TickStream: handshake, subscribe/unsubscribe, ping/pong, binary ticks.
+
+    `ticks` is a list of (offset_seconds, exch, token, ltp, volume); each connection replays the ticks of the
+    tokens it has subscribed to at `speed`x (0 = as fast as possible).
+    """
+    daemon_threads = allow_reuse_address = True
+
+    def __init__(self, ticks, host="127.0.0.1", port=0, speed=1.0):
+        self.ticks, self.speed = sorted(ticks), speed
+        super().__init__((host, port), _ReplayHandler)
+
+    @property
+    def url(self):
+        return f"ws://{self.server_address[0]}:{self.server_address[1]}/smart-stream"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True, name="replay-server").start()
+        return self
+
+class _ReplayHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        sock = self.request
+        head = b""
+        while b"\r\n\r\n" not in head: head += sock.recv(1024)
+        key = next(l.split(b":", 1)[1].strip() for l in head.split(b"\r\n") if l.lower().startswith(b"sec-websocket-key"))
+        accept = base64.b64encode(hashlib.sha1(key + _GUID.encode()).digest()).decode()
+        sock.sendall(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        subs, lock, done, ready = set(), threading.Lock(), threading.Event(), threading.Event()
+        threading.Thread(target=self._pump, args=(sock, subs, lock, done, ready), daemon=True).start()
+        try:
+            while True:
+                op, payload = _recv_frame(sock)
+                if op == 0x8:  # echo the close so the client's close() returns instead of timing out
+                    with lock: sock.sendall(_frame(payload[:2], 0x8))
+                    break
+                if op == 0x9:
+                    with lock: sock.sendall(_frame(payload, 0xA))
+                elif op == 0x1 and payload == b"ping":
+                    with lock: sock.sendall(_frame(b"pong", 0x1))
+                elif op == 0x1:
+                    req = json.loads(payload)
+                    toks = {(g["exchangeType"], t) for g in req["params"]["tokenList"] for t in g["tokens"]}
+                    if req["action"] == 1: subs |= toks
+                    else: subs -= toks
+                    ready.set()
+        except (ConnectionError, OSError, ValueError): pass
+        finally: done.set()
+
+    def _pump(self, sock, subs, lock, done, ready):
+        ready.wait()  # replay starts with the first subscription
+        speed, t0 = self.server.speed, time.time()
+        for seq, (offset, exch, token, ltp, volume) in enumerate(self.server.ticks):
+            if done.is_set(): return
+            if speed: done.wait(max(0.0, t0 + offset / speed - time.time()))
+            et = EXCHANGE_TYPES.get(exch, 1)
+            if (et, token) not in subs: continue
+            try:
+                with lock: sock.sendall(_frame(encode_packet(token, ltp, volume, exch_type=et, seq=seq), 0x2))
+            except OSError: return
+
+def load_ticks(path):
+    """Recorded ticks, one JSON object per line: {"t": offset_s, "exch": "NSE", "token": "2885", "ltp": .., "vol": ..}."""
+    with open(path) as f:
+        return [(r["t"], r["exch"], str(r["token"]), r["ltp"], r.get("vol", 0)) for r in map(json.loads, f) if r]